@@ -0,0 +1,47 @@
+"""add indicator rollups
+
+Revision ID: a3f1c2d4e5b6
+Revises: 723a082fb815
+Create Date: 2026-10-19 09:12:03.412518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c2d4e5b6'
+down_revision: Union[str, Sequence[str], None] = '723a082fb815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('indicator_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('source_id', sa.Integer(), nullable=False),
+    sa.Column('zone_id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('unit', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('min_value', sa.Float(), nullable=False),
+    sa.Column('max_value', sa.Float(), nullable=False),
+    sa.Column('sum_value', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['source_id'], ['sources.id'], ),
+    sa.ForeignKeyConstraint(['zone_id'], ['zones.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('zone_id', 'source_id', 'type', 'unit', 'day', name='uq_indicator_rollups_series_day')
+    )
+    op.create_index(op.f('ix_indicator_rollups_id'), 'indicator_rollups', ['id'], unique=False)
+    op.create_index(op.f('ix_indicator_rollups_day'), 'indicator_rollups', ['day'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_indicator_rollups_day'), table_name='indicator_rollups')
+    op.drop_index(op.f('ix_indicator_rollups_id'), table_name='indicator_rollups')
+    op.drop_table('indicator_rollups')
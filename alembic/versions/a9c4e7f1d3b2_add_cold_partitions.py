@@ -0,0 +1,46 @@
+"""add cold partitions manifest
+
+Revision ID: a9c4e7f1d3b2
+Revises: f3a8d2c7b9e1
+Create Date: 2026-10-19 21:26:44.517093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c4e7f1d3b2'
+down_revision: Union[str, Sequence[str], None] = 'f3a8d2c7b9e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cold_partitions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('min_id', sa.Integer(), nullable=False),
+    sa.Column('max_id', sa.Integer(), nullable=False),
+    sa.Column('min_timestamp', sa.DateTime(), nullable=False),
+    sa.Column('max_timestamp', sa.DateTime(), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('path')
+    )
+    op.create_index(op.f('ix_cold_partitions_id'), 'cold_partitions', ['id'], unique=False)
+    op.create_index(op.f('ix_cold_partitions_type'), 'cold_partitions', ['type'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_cold_partitions_type'), table_name='cold_partitions')
+    op.drop_index(op.f('ix_cold_partitions_id'), table_name='cold_partitions')
+    op.drop_table('cold_partitions')
@@ -0,0 +1,50 @@
+"""add latest_indicators table
+
+Revision ID: b5d1e8a3c7f2
+Revises: a9c4e7f1d3b2
+Create Date: 2026-10-19 23:41:52.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d1e8a3c7f2'
+down_revision: Union[str, Sequence[str], None] = 'a9c4e7f1d3b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('latest_indicators',
+    sa.Column('zone_id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('indicator_id', sa.Integer(), nullable=False),
+    sa.Column('source_id', sa.Integer(), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('unit', sa.String(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['source_id'], ['sources.id'], ),
+    sa.ForeignKeyConstraint(['zone_id'], ['zones.id'], ),
+    sa.PrimaryKeyConstraint('zone_id', 'type')
+    )
+    op.create_index(op.f('ix_latest_indicators_type'), 'latest_indicators', ['type'], unique=False)
+    # Dernière mesure valide de chaque série déjà en base (même date : id le plus grand)
+    op.execute(
+        "INSERT INTO latest_indicators "
+        "(zone_id, type, indicator_id, source_id, value, unit, timestamp) "
+        "SELECT zone_id, type, id, source_id, value, unit, timestamp FROM ("
+        "SELECT *, row_number() OVER ("
+        "PARTITION BY zone_id, type ORDER BY timestamp DESC, id DESC) AS rank "
+        "FROM indicators WHERE quality_flag = 0) WHERE rank = 1"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_latest_indicators_type'), table_name='latest_indicators')
+    op.drop_table('latest_indicators')
@@ -0,0 +1,44 @@
+"""add ingested files
+
+Revision ID: c4d8e1f2a9b7
+Revises: b7e2d9a1c3f4
+Create Date: 2026-10-19 16:05:12.481337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8e1f2a9b7'
+down_revision: Union[str, Sequence[str], None] = 'b7e2d9a1c3f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ingested_files',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('mtime', sa.Float(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('dataset', sa.String(), nullable=False),
+    sa.Column('inserted', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.Integer(), nullable=False),
+    sa.Column('ingested_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('sha256')
+    )
+    op.create_index(op.f('ix_ingested_files_id'), 'ingested_files', ['id'], unique=False)
+    op.create_index(op.f('ix_ingested_files_path'), 'ingested_files', ['path'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_ingested_files_path'), table_name='ingested_files')
+    op.drop_index(op.f('ix_ingested_files_id'), table_name='ingested_files')
+    op.drop_table('ingested_files')
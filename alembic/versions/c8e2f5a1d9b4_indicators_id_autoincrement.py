@@ -0,0 +1,41 @@
+"""indicators.id AUTOINCREMENT
+
+Revision ID: c8e2f5a1d9b4
+Revises: b5d1e8a3c7f2
+Create Date: 2026-10-20 10:12:37.402915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e2f5a1d9b4'
+down_revision: Union[str, Sequence[str], None] = 'b5d1e8a3c7f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite ne sait pas ajouter AUTOINCREMENT à une table existante : on la recrée
+    with op.batch_alter_table('indicators', recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+        pass
+    # Le compteur repart au-delà des ids déjà archivés dans le stockage froid
+    op.execute(
+        "DELETE FROM sqlite_sequence WHERE name = 'indicators'"
+    )
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) "
+        "SELECT 'indicators', max("
+        "coalesce((SELECT max(id) FROM indicators), 0), "
+        "coalesce((SELECT max(max_id) FROM cold_partitions), 0))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('indicators', recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+        pass
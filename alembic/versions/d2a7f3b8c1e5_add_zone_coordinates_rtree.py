@@ -0,0 +1,58 @@
+"""add zone coordinates and rtree index
+
+Revision ID: d2a7f3b8c1e5
+Revises: c4d8e1f2a9b7
+Create Date: 2026-10-19 17:42:31.208164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7f3b8c1e5'
+down_revision: Union[str, Sequence[str], None] = 'c4d8e1f2a9b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('zones', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('zones', sa.Column('longitude', sa.Float(), nullable=True))
+    op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS zone_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)")
+    op.execute("""
+    CREATE TRIGGER IF NOT EXISTS zones_rtree_insert AFTER INSERT ON zones
+    WHEN NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL
+    BEGIN
+        INSERT INTO zone_rtree VALUES (NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);
+    END
+    """)
+    op.execute("""
+    CREATE TRIGGER IF NOT EXISTS zones_rtree_update AFTER UPDATE OF latitude, longitude ON zones
+    BEGIN
+        DELETE FROM zone_rtree WHERE id = OLD.id;
+        INSERT INTO zone_rtree
+        SELECT NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude
+        WHERE NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL;
+    END
+    """)
+    op.execute("""
+    CREATE TRIGGER IF NOT EXISTS zones_rtree_delete AFTER DELETE ON zones
+    BEGIN
+        DELETE FROM zone_rtree WHERE id = OLD.id;
+    END
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS zones_rtree_delete")
+    op.execute("DROP TRIGGER IF EXISTS zones_rtree_update")
+    op.execute("DROP TRIGGER IF EXISTS zones_rtree_insert")
+    op.execute("DROP TABLE IF EXISTS zone_rtree")
+    with op.batch_alter_table('zones') as batch_op:
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
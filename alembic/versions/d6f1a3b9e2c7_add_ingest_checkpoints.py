@@ -0,0 +1,32 @@
+"""add ingest checkpoints
+
+Revision ID: d6f1a3b9e2c7
+Revises: c8e2f5a1d9b4
+Create Date: 2026-10-20 14:05:18.663104
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6f1a3b9e2c7'
+down_revision: Union[str, Sequence[str], None] = 'c8e2f5a1d9b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ingest_checkpoints',
+    sa.Column('journal', sa.String(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('journal')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('ingest_checkpoints')
@@ -0,0 +1,36 @@
+"""indicator_rollups flagged count
+
+Revision ID: e4b9c2f7a1d5
+Revises: d6f1a3b9e2c7
+Create Date: 2026-10-21 09:41:18.226107
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b9c2f7a1d5'
+down_revision: Union[str, Sequence[str], None] = 'd6f1a3b9e2c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('indicator_rollups') as batch_op:
+        batch_op.add_column(sa.Column('flagged', sa.Integer(), server_default='0', nullable=False))
+        batch_op.alter_column('min_value', existing_type=sa.Float(), nullable=True)
+        batch_op.alter_column('max_value', existing_type=sa.Float(), nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Journées sans mesure valide : pas de min / max à conserver
+    op.execute("DELETE FROM indicator_rollups WHERE min_value IS NULL")
+    with op.batch_alter_table('indicator_rollups') as batch_op:
+        batch_op.alter_column('max_value', existing_type=sa.Float(), nullable=False)
+        batch_op.alter_column('min_value', existing_type=sa.Float(), nullable=False)
+        batch_op.drop_column('flagged')
@@ -0,0 +1,92 @@
+"""add normalized names and zone search index
+
+Revision ID: e6b1c9d4f2a8
+Revises: d2a7f3b8c1e5
+Create Date: 2026-10-19 19:03:47.915402
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b1c9d4f2a8'
+down_revision: Union[str, Sequence[str], None] = 'd2a7f3b8c1e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _normalize_name(name: str) -> str:
+    # Copie de app.models.normalize_name au moment de la migration
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", name)).strip().casefold()
+
+
+def _fill_normalized_names(table: str) -> None:
+    """
+    Renseigne normalized_name ; en cas de doublon (même nom à la casse près),
+    seule la ligne de plus petit id le reçoit (les autres restent à NULL).
+    """
+    conn = op.get_bind()
+    seen = set()
+    for row_id, name in conn.execute(sa.text(f"SELECT id, name FROM {table} ORDER BY id")):
+        normalized = _normalize_name(name)
+        if normalized in seen:
+            print(f"[migration] {table} {row_id} ({name!r}) : nom en double, normalized_name laissé vide")
+            continue
+        seen.add(normalized)
+        conn.execute(
+            sa.text(f"UPDATE {table} SET normalized_name = :normalized WHERE id = :id"),
+            {"normalized": normalized, "id": row_id},
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('zones', 'sources'):
+        op.add_column(table, sa.Column('normalized_name', sa.String(), nullable=True))
+        _fill_normalized_names(table)
+        op.create_index(op.f(f'ix_{table}_normalized_name'), table, ['normalized_name'], unique=True)
+
+    op.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS zone_search USING fts5(
+        name, content='zones', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """)
+    op.execute("""
+    CREATE TRIGGER IF NOT EXISTS zones_search_insert AFTER INSERT ON zones
+    BEGIN
+        INSERT INTO zone_search(rowid, name) VALUES (NEW.id, NEW.name);
+    END
+    """)
+    op.execute("""
+    CREATE TRIGGER IF NOT EXISTS zones_search_update AFTER UPDATE OF name ON zones
+    BEGIN
+        INSERT INTO zone_search(zone_search, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+        INSERT INTO zone_search(rowid, name) VALUES (NEW.id, NEW.name);
+    END
+    """)
+    op.execute("""
+    CREATE TRIGGER IF NOT EXISTS zones_search_delete AFTER DELETE ON zones
+    BEGIN
+        INSERT INTO zone_search(zone_search, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+    END
+    """)
+    # Indexe les zones existantes
+    op.execute("INSERT INTO zone_search(zone_search) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS zones_search_delete")
+    op.execute("DROP TRIGGER IF EXISTS zones_search_update")
+    op.execute("DROP TRIGGER IF EXISTS zones_search_insert")
+    op.execute("DROP TABLE IF EXISTS zone_search")
+    for table in ('sources', 'zones'):
+        op.drop_index(op.f(f'ix_{table}_normalized_name'), table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('normalized_name')
@@ -0,0 +1,52 @@
+"""add indicator quality flag and quarantine table
+
+Revision ID: f3a8d2c7b9e1
+Revises: e6b1c9d4f2a8
+Create Date: 2026-10-19 20:12:08.334719
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8d2c7b9e1'
+down_revision: Union[str, Sequence[str], None] = 'e6b1c9d4f2a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Les mesures existantes sont considérées valides (quality_flag = 0)
+    op.add_column('indicators', sa.Column('quality_flag', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_indicators_type_quality_flag', 'indicators', ['type', 'quality_flag'], unique=False)
+    op.create_table('indicator_quarantine',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('source_id', sa.Integer(), nullable=False),
+    sa.Column('zone_id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('unit', sa.String(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('metadata', sa.Text(), nullable=True),
+    sa.Column('quality_flag', sa.Integer(), nullable=False),
+    sa.Column('dataset', sa.String(), nullable=False),
+    sa.Column('line', sa.Integer(), nullable=True),
+    sa.Column('quarantined_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['source_id'], ['sources.id'], ),
+    sa.ForeignKeyConstraint(['zone_id'], ['zones.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_indicator_quarantine_id'), 'indicator_quarantine', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_indicator_quarantine_id'), table_name='indicator_quarantine')
+    op.drop_table('indicator_quarantine')
+    op.drop_index('ix_indicators_type_quality_flag', table_name='indicators')
+    with op.batch_alter_table('indicators') as batch_op:
+        batch_op.drop_column('quality_flag')
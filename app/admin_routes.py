@@ -0,0 +1,28 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends
+
+from . import schemas, slow_queries
+from .auth import get_current_admin
+from .models import User
+
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["admin"],
+)
+
+
+@router.get("/slow-queries", response_model=List[schemas.SlowQuery])
+def list_slow_queries(
+    limit: Optional[int] = None,
+    current_user: User = Depends(get_current_admin),
+):
+    """
+    GET /api/admin/slow-queries
+
+    Dernières requêtes SQL ayant dépassé ECOTRACK_SLOW_QUERY_MS (les plus
+    récentes d'abord), avec leurs paramètres et le plan EXPLAIN QUERY PLAN.
+    Réservé aux administrateurs.
+    """
+    return slow_queries.recent(limit)
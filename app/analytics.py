@@ -0,0 +1,335 @@
+import calendar
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Integer, cast, func
+from sqlalchemy.orm import Session
+
+from . import cache, tiering
+from .models import ColdPartition, Indicator
+
+logger = logging.getLogger(__name__)
+
+# Dossier du miroir colonnaire (à côté de ecotrack.db)
+ANALYTICS_DIR = Path("./analytics")
+# Nombre de lignes lues par requête lors d'un rafraîchissement
+REFRESH_CHUNK = 200_000
+
+COLUMNS = {
+    "id": np.int64,
+    "zone_id": np.int32,
+    "source_id": np.int32,
+    "type_code": np.int32,
+    "ts": np.int64,
+    "value": np.float64,
+    "quality_flag": np.int8,
+}
+
+
+def to_epoch(dt: datetime) -> int:
+    """
+    Convertit une date en secondes depuis epoch, comme strftime('%s') côté SQLite
+    (les dates naïves sont considérées en UTC).
+    """
+    if dt.tzinfo is not None:
+        return int(dt.timestamp())
+    return calendar.timegm(dt.timetuple())
+
+
+class ColumnarMirror:
+    """
+    Copie colonnaire (tableaux NumPy) de la table `indicators`, pour les agrégations lourdes.
+
+    Le miroir est rattrapé de façon incrémentale (lignes d'id > dernier id connu)
+    avant chaque requête : les tableaux en mémoire ont une capacité qui double au
+    besoin et les fichiers `<colonne>.bin` ne reçoivent que les lignes ajoutées,
+    un rafraîchissement coûte donc O(lignes nouvelles). Le miroir est reconstruit
+    entièrement si des lignes ont été supprimées ou modifiées : la version
+    cache.REWRITES (table data_versions, partagée avec les scripts et les autres
+    workers) est enregistrée dans meta.json avec le miroir.
+    """
+
+    def __init__(self, directory: Path = ANALYTICS_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._buffers: Dict[str, np.ndarray] = {
+            name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()
+        }
+        self.size = 0
+        # Lignes déjà écrites dans les fichiers .bin
+        self._saved = 0
+        self.types: list[str] = []
+        self.type_index: Dict[str, int] = {}
+        self.min_id: Optional[int] = None
+        self.last_id = 0
+        self.rewrites: Optional[int] = None
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {name: buffer[:self.size] for name, buffer in self._buffers.items()}
+
+    def _append(self, chunk: Dict[str, np.ndarray]) -> None:
+        needed = self.size + len(chunk["id"])
+        for name, buffer in self._buffers.items():
+            if needed > len(buffer):
+                grown = np.empty(max(needed, 2 * len(buffer), 1024), dtype=buffer.dtype)
+                grown[:self.size] = buffer[:self.size]
+                self._buffers[name] = buffer = grown
+            buffer[self.size:needed] = chunk[name]
+        self.size = needed
+
+    # --- persistance ---
+
+    def _load(self) -> None:
+        meta_path = self.directory / "meta.json"
+        if not meta_path.exists():
+            return
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            rows = meta["rows"]
+            columns = {
+                name: np.fromfile(self.directory / f"{name}.bin", dtype=dtype, count=rows)
+                for name, dtype in COLUMNS.items()
+            }
+            if any(len(array) != rows for array in columns.values()):
+                raise ValueError("fichiers plus courts que meta.json")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Miroir colonnaire illisible, reconstruction : %s", e)
+            return
+        self._append(columns)
+        self._saved = rows
+        self.types = meta["types"]
+        self.type_index = {t: i for i, t in enumerate(self.types)}
+        self.min_id = meta["min_id"]
+        self.last_id = meta["last_id"]
+        self.rewrites = meta["rewrites"]
+
+    def _save(self) -> None:
+        """
+        Ajoute aux fichiers les lignes pas encore écrites, puis remplace meta.json
+        (qui fait foi : des octets en trop après une écriture interrompue sont
+        ignorés au chargement et écrasés au prochain ajout).
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for name, array in self.columns.items():
+            path = self.directory / f"{name}.bin"
+            start = self._saved if path.exists() else 0
+            with open(path, "r+b" if start else "wb") as f:
+                f.seek(start * array.itemsize)
+                f.truncate()
+                f.write(array[start:].tobytes())
+        meta = {
+            "types": self.types,
+            "min_id": self.min_id,
+            "last_id": self.last_id,
+            "rewrites": self.rewrites,
+            "rows": self.size,
+        }
+        tmp_path = self.directory / "meta.json.tmp"
+        tmp_path.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp_path, self.directory / "meta.json")
+        self._saved = self.size
+
+    # --- rafraîchissement ---
+
+    def _type_code(self, type_: str) -> int:
+        code = self.type_index.get(type_)
+        if code is None:
+            code = len(self.types)
+            self.types.append(type_)
+            self.type_index[type_] = code
+        return code
+
+    def _append_since(self, db: Session, last_id: int) -> int:
+        appended = 0
+        ts = cast(func.strftime("%s", Indicator.timestamp), Integer)
+        while True:
+            rows = (
+                db.query(
+                    Indicator.id,
+                    Indicator.zone_id,
+                    Indicator.source_id,
+                    Indicator.type,
+                    ts,
+                    Indicator.value,
+                    Indicator.quality_flag,
+                )
+                .filter(Indicator.id > last_id)
+                .order_by(Indicator.id)
+                .limit(REFRESH_CHUNK)
+                .all()
+            )
+            if not rows:
+                break
+
+            ids, zone_ids, source_ids, types, stamps, values, flags = zip(*rows)
+            self._append({
+                "id": np.array(ids, dtype=np.int64),
+                "zone_id": np.array(zone_ids, dtype=np.int32),
+                "source_id": np.array(source_ids, dtype=np.int32),
+                "type_code": np.array([self._type_code(t) for t in types], dtype=np.int32),
+                "ts": np.array(stamps, dtype=np.int64),
+                "value": np.array(values, dtype=np.float64),
+                "quality_flag": np.array(flags, dtype=np.int8),
+            })
+            last_id = int(ids[-1])
+            appended += len(rows)
+
+        self.last_id = last_id
+        return appended
+
+    def refresh(self, db: Session) -> int:
+        """
+        Met le miroir à jour avec la base et retourne le nombre de lignes ajoutées.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+
+            rewrites = cache.data_version(cache.REWRITES)
+            # Deux requêtes : SQLite ne lit une seule ligne de l'index que pour un min() ou un max() seul
+            min_id = db.query(func.min(Indicator.id)).scalar()
+            max_id = db.query(func.max(Indicator.id)).scalar()
+            changed = rewrites != self.rewrites or min_id != self.min_id
+            if changed or (max_id or 0) < self.last_id:
+                # Suppressions / modifications : on repart de zéro
+                self._reset()
+                self.rewrites = rewrites
+                changed = True
+            self.min_id = min_id
+
+            appended = 0
+            if max_id is not None and max_id != self.last_id:
+                appended = self._append_since(db, self.last_id)
+            if appended or changed:
+                self._save()
+            return appended
+
+    # --- requêtes ---
+
+    def _snapshot(self) -> Tuple[Dict[str, np.ndarray], Dict[str, int]]:
+        """
+        Colonnes et codes de type à un instant donné : un refresh() concurrent
+        remplace ou agrandit les tableaux, mais ne modifie pas les lignes déjà
+        visibles dans ces vues.
+        """
+        with self._lock:
+            return self.columns, self.type_index
+
+    @staticmethod
+    def _mask(
+        cols: Dict[str, np.ndarray],
+        type_index: Dict[str, int],
+        type: Optional[str] = None,
+        zone_id: Optional[int] = None,
+        zone_ids: Optional[Sequence[int]] = None,
+        source_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        exclude_flagged: bool = False,
+        after_id: int = 0,
+    ) -> Optional[np.ndarray]:
+        mask = np.ones(len(cols["id"]), dtype=bool)
+        if type:
+            code = type_index.get(type)
+            if code is None:
+                return None
+            mask &= cols["type_code"] == code
+        if zone_id:
+            mask &= cols["zone_id"] == zone_id
+        if zone_ids is not None:
+            mask &= np.isin(cols["zone_id"], np.asarray(zone_ids, dtype=np.int64))
+        if source_id:
+            mask &= cols["source_id"] == source_id
+        if date_from:
+            mask &= cols["ts"] >= to_epoch(date_from)
+        if date_to:
+            mask &= cols["ts"] <= to_epoch(date_to)
+        if exclude_flagged:
+            mask &= cols["quality_flag"] == 0
+        if after_id:
+            mask &= cols["id"] > after_id
+        return mask
+
+    def select(self, columns: Sequence[str], **filters: Any) -> Dict[str, np.ndarray]:
+        """
+        Colonnes `columns` des lignes filtrées (mêmes filtres que list_indicators,
+        plus after_id), pour les séries calculées sur le miroir.
+        """
+        cols, type_index = self._snapshot()
+        mask = self._mask(cols, type_index, **filters)
+        if mask is None:
+            return {name: cols[name][:0] for name in columns}
+        return {name: cols[name][mask] for name in columns}
+
+    def stats(self, **filters: Any) -> Dict[str, Any]:
+        values = self.select(["value"], **filters)["value"]
+        if not len(values):
+            return {"count": 0, "min_value": None, "max_value": None, "avg_value": None}
+        return {
+            "count": int(len(values)),
+            "min_value": float(values.min()),
+            "max_value": float(values.max()),
+            "avg_value": float(values.mean()),
+        }
+
+
+mirror = ColumnarMirror()
+
+
+def stats(partitions: List[ColdPartition], **filters: Any) -> Dict[str, Any]:
+    """
+    Stats du miroir (table chaude) complétées par les fichiers froids de
+    `partitions` qui concernent la requête (voir tiering.cold_partitions).
+    """
+    result = mirror.stats(**filters)
+    selected = tiering.matching_partitions(
+        partitions, filters.get("type"), filters.get("date_from"), filters.get("date_to")
+    )
+    if not selected:
+        return result
+    cold = tiering.cold_stats(
+        selected,
+        zone_id=filters.get("zone_id"),
+        source_id=filters.get("source_id"),
+        date_from=filters.get("date_from"),
+        date_to=filters.get("date_to"),
+        exclude_flagged=filters.get("exclude_flagged", False),
+    )
+    return tiering.merge_stats(result, cold.get(()))
+
+
+def indicator_stats(
+    db: Session,
+    type: Optional[str] = None,
+    zone_id: Optional[int] = None,
+    source_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    exclude_flagged: bool = False,
+) -> Dict[str, Any]:
+    """
+    Même contrat que crud.indicator_stats (stockage froid compris), calculé
+    sur le miroir colonnaire.
+    """
+    mirror.refresh(db)
+    return stats(
+        tiering.cold_partitions(db, type, date_from, date_to),
+        type=type,
+        zone_id=zone_id,
+        source_id=source_id,
+        date_from=date_from,
+        date_to=date_to,
+        exclude_flagged=exclude_flagged,
+    )
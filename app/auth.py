@@ -1,14 +1,12 @@
 from datetime import datetime, timedelta
 from typing import Optional
 
-import bcrypt
-from jose import JWTError, jwt
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from .database import get_db
-from . import schemas, crud
+from . import config, crud, schemas
 from .models import User
 
 
@@ -24,11 +22,17 @@ router = APIRouter(tags=["auth"])
 
 
 
+# bcrypt et jose sont importés à la première utilisation (démarrage plus rapide)
+
 def hash_password(password: str) -> str:
+    import bcrypt
+
     return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    import bcrypt
+
     return bcrypt.checkpw(
         plain_password.encode("utf-8"),
         hashed_password.encode("utf-8"),
@@ -37,6 +41,8 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.utcnow() + (
         expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -50,7 +56,8 @@ def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
 ) -> User:
-    
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials.",
@@ -84,8 +91,20 @@ def register(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
             detail="Email already registered.",
         )
 
+    # Le rôle admin n'est jamais choisi par le client : il est réservé
+    # aux emails listés dans ECOTRACK_ADMIN_EMAILS
+    if user_in.email.strip().lower() in config.ADMIN_EMAILS:
+        role = "admin"
+    elif user_in.role in (None, "", "user"):
+        role = "user"
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Role cannot be chosen at registration.",
+        )
+
     hashed_pw = hash_password(user_in.password)
-    user = crud.create_user(db, user_in, hashed_pw)
+    user = crud.create_user(db, user_in.model_copy(update={"role": role}), hashed_pw)
     return user
 
 
@@ -112,3 +131,12 @@ def login(
 @router.get("/me", response_model=schemas.UserRead)
 def read_me(current_user: User = Depends(get_current_user)):
     return current_user
+
+
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin role required.",
+        )
+    return current_user
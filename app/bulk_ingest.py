@@ -0,0 +1,394 @@
+import cProfile
+import glob
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from dataclasses import dataclass, field
+from itertools import chain
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from . import importer, locks, quality
+from .import_files import READ_ERRORS, is_supported, iter_csv_streams
+from .import_profile import NO_PROFILE, ImportProfile, top_errors
+from .models import IngestedFile
+
+logger = logging.getLogger(__name__)
+
+# Lots parsés d'avance par worker (file bornée entre un worker et l'écriture)
+WORKER_QUEUE_DEPTH = 8
+HASH_CHUNK = 1 << 20
+
+
+def discover(patterns: Iterable[str]) -> List[Path]:
+    """
+    Fichiers importables (.csv, .csv.gz, .csv.zst, .zip) désignés par des motifs
+    glob ("data/FR_E2_*.csv.gz", "data/**/*") ou des dossiers (parcourus
+    récursivement). Triés, sans doublon.
+    """
+    found = set()
+    for pattern in patterns:
+        if Path(pattern).is_dir():
+            candidates: Iterable[Path] = Path(pattern).rglob("*")
+        else:
+            candidates = (Path(p) for p in glob.glob(pattern, recursive=True))
+        for candidate in candidates:
+            if candidate.is_file() and is_supported(candidate.name):
+                found.add(candidate.resolve())
+    return sorted(found)
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# --- parsing (processus workers) ---
+
+def file_messages(
+    path: Path,
+    dataset: Optional[str] = None,
+    profile=NO_PROFILE,
+    parser: Optional[str] = None,
+) -> Iterator[tuple]:
+    """
+    Lit et parse un fichier ; produit les messages consommés par l'écriture :
+    ("hash", sha256), puis ("batch", format, membre, lignes parsées, erreurs)
+    ou ("rejected", membre, message) par CSV, et enfin ("done",) ou ("failed", message).
+
+    Le format de chaque CSV est reconnu à sa ligne d'en-tête, sauf si `dataset`
+    est imposé ; parser : moteur de parsing (voir importer.parse_batches).
+    """
+    try:
+        yield ("hash", file_sha256(path))
+        with open(path, "rb") as raw:
+            for member, text in iter_csv_streams(raw, path.name):
+                lines = iter(text)
+                header = next(lines, None)
+                if header is None:
+                    yield ("rejected", member, "Fichier vide")
+                    continue
+                spec = importer.DATASETS[dataset] if dataset else importer.detect_dataset(header)
+                if spec is None:
+                    yield ("rejected", member, "Format non reconnu (en-têtes inattendus)")
+                    continue
+                try:
+                    reader = importer.open_reader(spec, chain([header], lines))
+                except ValueError as e:
+                    yield ("rejected", member, str(e))
+                    continue
+                for parsed, errors in importer.parse_batches(spec, reader, profile, parser):
+                    yield ("batch", spec.name, member, parsed, errors)
+    except (ValueError, *READ_ERRORS) as e:
+        yield ("failed", str(e))
+        return
+    yield ("done",)
+
+
+def _worker(files: List[Tuple[int, str]], dataset: Optional[str], parser: Optional[str], out, cancelled) -> None:
+    """
+    Processus de parsing : traite ses fichiers dans l'ordre et envoie les
+    messages dans `out`, préfixés par l'index du fichier. `cancelled` contient
+    l'index d'un fichier que l'écriture a abandonné (doublon) : on passe au suivant.
+    """
+    for index, path in files:
+        for message in file_messages(Path(path), dataset, parser=parser):
+            if cancelled.value == index:
+                out.put((index, ("done",)))
+                break
+            out.put((index, message))
+
+
+# --- écriture (processus principal) ---
+
+@dataclass
+class FileResult:
+    path: Path
+    status: str                 # ingested, skipped (déjà ingéré), duplicate (même contenu), changed, failed
+    datasets: List[str] = field(default_factory=list)
+    inserted: int = 0
+    flagged: int = 0
+    errors: int = 0
+    top_errors: List[Dict[str, Any]] = field(default_factory=list)
+    rejected: List[str] = field(default_factory=list)
+    message: str = ""
+    profile: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class IngestProgress:
+    files_total: int = 0
+    files_done: int = 0
+    skipped: int = 0
+    failed: int = 0
+    rows: int = 0
+    errors: int = 0
+    current: str = ""
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+class _FileFailed(Exception):
+    pass
+
+
+class DirectoryIngestor:
+    """
+    Ingestion d'un ensemble de fichiers : `workers` processus parsent les
+    fichiers en parallèle et alimentent une écriture unique et sérialisée
+    (une transaction par fichier, sous le verrou d'écriture).
+
+    Les fichiers déjà présents dans `ingested_files` (même chemin, taille et
+    date de modification, ou même empreinte SHA-256) sont ignorés, sauf avec
+    force=True. Un fichier déjà ingéré dont le contenu a changé (ex. fichier
+    quotidien complété) est refusé : le réimporter dupliquerait ses premières
+    lignes ; force=True le réimporte en entier. workers=0 : tout se fait dans le processus courant, ce qui
+    permet le profilage par étape (profile) et cProfile (pstats_dir).
+    Le contrôle qualité (qc) est partagé par tous les fichiers de l'exécution :
+    les statistiques de chaque série continuent d'un fichier à l'autre.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        workers: int = 0,
+        dataset: Optional[str] = None,
+        force: bool = False,
+        on_progress: Optional[Callable[[IngestProgress], None]] = None,
+        profile: bool = False,
+        pstats_dir: Optional[Path] = None,
+        parser: Optional[str] = None,
+        qc: Optional[quality.QualityControl] = None,
+    ):
+        self.db = db
+        self.workers = 0 if profile or pstats_dir else workers
+        self.dataset = dataset
+        self.force = force
+        self.profile = profile or pstats_dir is not None
+        self.pstats_dir = pstats_dir
+        self.parser = parser
+        self.qc = qc or quality.QualityControl(db=db)
+        self.on_progress = on_progress or (lambda progress: None)
+        self.progress = IngestProgress()
+
+    # --- fichiers déjà ingérés ---
+
+    def _already_ingested(self, path: Path, stat: os.stat_result) -> bool:
+        return self.db.query(IngestedFile.id).filter(
+            IngestedFile.path == str(path),
+            IngestedFile.size == stat.st_size,
+            IngestedFile.mtime == stat.st_mtime,
+        ).first() is not None
+
+    def _known_hash(self, sha256: str) -> Optional[str]:
+        return self.db.query(IngestedFile.path).filter(IngestedFile.sha256 == sha256).scalar()
+
+    def _previous_ingestion(self, path: Path) -> Optional[IngestedFile]:
+        return self.db.query(IngestedFile).filter(IngestedFile.path == str(path)).first()
+
+    # --- écriture d'un fichier ---
+
+    def write_file(self, path: Path, messages: Iterable[tuple], profile=NO_PROFILE) -> FileResult:
+        """
+        Consomme les messages d'un fichier (voir file_messages) et le commite
+        avec sa ligne `ingested_files`, ou rien en cas d'échec.
+        """
+        stat = path.stat()
+        result = FileResult(path=path, status="ingested")
+        errors: List[Dict[str, Any]] = []
+        resolver = importer.NameResolver(self.db)
+        flagged_before = self.qc.flagged
+        sha256 = None
+        self.progress.current = path.name
+        try:
+            with locks.write_lock():
+                for message in messages:
+                    kind = message[0]
+                    if kind == "hash":
+                        sha256 = message[1]
+                        known = self._known_hash(sha256)
+                        if known and not self.force:
+                            if known == str(path):
+                                # Fichier seulement touché : on note sa date pour ne plus le relire
+                                self.db.query(IngestedFile).filter(IngestedFile.sha256 == sha256).update(
+                                    {"size": stat.st_size, "mtime": stat.st_mtime}
+                                )
+                                self.db.commit()
+                                result.status = "skipped"
+                            else:
+                                result.status, result.message = "duplicate", f"même contenu que {known}"
+                            return result
+                        previous = self._previous_ingestion(path)
+                        if previous is not None and not known and not self.force:
+                            result.status = "changed"
+                            result.message = (
+                                f"contenu modifié depuis son ingestion du {previous.ingested_at:%Y-%m-%d %H:%M} "
+                                f"({previous.inserted} lignes) : --force pour le réimporter en entier"
+                            )
+                            return result
+                    elif kind == "batch":
+                        _, dataset, member, parsed, parse_errors = message
+                        spec = importer.DATASETS[dataset]
+                        if dataset not in result.datasets:
+                            result.datasets.append(dataset)
+                        written, write_errors = importer.write_batch(spec, self.db, parsed, resolver, profile, self.qc)
+                        batch_errors = [{"file": member, **e} for e in (*parse_errors, *write_errors)]
+                        errors.extend(batch_errors)
+                        result.inserted += written
+                        self.progress.rows += written
+                        self.progress.errors += len(batch_errors)
+                        self.on_progress(self.progress)
+                    elif kind == "rejected":
+                        result.rejected.append(f"{message[1]} : {message[2]}")
+                    elif kind == "failed":
+                        raise _FileFailed(message[1])
+                    elif kind == "done":
+                        break
+
+                if not result.datasets:
+                    raise _FileFailed("; ".join(result.rejected) or "Aucun CSV importable")
+
+                if self.force:
+                    self.db.query(IngestedFile).filter(
+                        (IngestedFile.sha256 == sha256) | (IngestedFile.path == str(path))
+                    ).delete()
+                self.db.add(IngestedFile(
+                    path=str(path),
+                    size=stat.st_size,
+                    mtime=stat.st_mtime,
+                    sha256=sha256,
+                    dataset=",".join(result.datasets),
+                    inserted=result.inserted,
+                    errors=len(errors),
+                ))
+                with profile.stage("commit"):
+                    self.db.commit()
+        except (_FileFailed, SQLAlchemyError) as e:
+            self.db.rollback()
+            # Les lignes du fichier sont annulées : on les retire de la progression
+            self.progress.rows -= result.inserted
+            self.progress.errors -= len(errors)
+            result.status, result.message, result.inserted = "failed", str(e), 0
+            return result
+
+        result.errors = len(errors)
+        result.flagged = self.qc.flagged - flagged_before
+        result.top_errors = top_errors(errors)
+        if profile is not NO_PROFILE:
+            result.profile = profile.report({"inserted": result.inserted, "errors": errors})
+        return result
+
+    def _ingest_in_process(self, path: Path) -> FileResult:
+        if not self.profile:
+            return self.write_file(path, file_messages(path, self.dataset, parser=self.parser))
+
+        profile = ImportProfile()
+        profiler = cProfile.Profile() if self.pstats_dir else None
+        if profiler is not None:
+            profiler.enable()
+        try:
+            return self.write_file(path, file_messages(path, self.dataset, profile, self.parser), profile)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self.pstats_dir.mkdir(parents=True, exist_ok=True)
+                profiler.dump_stats(str(self.pstats_dir / f"{path.name.split('.')[0]}.pstats"))
+
+    # --- orchestration ---
+
+    def _finish(self, result: FileResult) -> FileResult:
+        self.progress.files_done += 1
+        if result.status in ("skipped", "duplicate"):
+            self.progress.skipped += 1
+        elif result.status in ("failed", "changed"):
+            self.progress.failed += 1
+        self.on_progress(self.progress)
+        return result
+
+    def run(self, paths: List[Path]) -> List[FileResult]:
+        self.progress = IngestProgress(files_total=len(paths))
+        results: List[FileResult] = []
+        todo: List[Path] = []
+        for path in paths:
+            if not self.force and self._already_ingested(path, path.stat()):
+                results.append(self._finish(FileResult(path=path, status="skipped")))
+            else:
+                todo.append(path)
+
+        if self.workers <= 0:
+            for path in todo:
+                results.append(self._finish(self._ingest_in_process(path)))
+            return results
+
+        # Répartition fixe : le fichier i est parsé par le worker i % N. Chaque
+        # worker traite ses fichiers dans l'ordre, l'écriture les consomme dans
+        # l'ordre global : les N workers parsent en avance pendant qu'on écrit.
+        ctx = multiprocessing.get_context("spawn")
+        workers = min(self.workers, len(todo))
+        channels = []
+        for w in range(workers):
+            assigned = [(i, str(path)) for i, path in enumerate(todo) if i % workers == w]
+            out = ctx.Queue(maxsize=WORKER_QUEUE_DEPTH)
+            cancelled = ctx.Value("i", -1)
+            process = ctx.Process(
+                target=_worker,
+                args=(assigned, self.dataset, self.parser, out, cancelled),
+                name=f"ingest-parse-{w}",
+                daemon=True,
+            )
+            process.start()
+            channels.append((process, out, cancelled))
+
+        try:
+            for index, path in enumerate(todo):
+                process, out, cancelled = channels[index % workers]
+                messages = _receive(index, process, out)
+                result = self.write_file(path, messages)
+                if result.status in ("skipped", "duplicate", "changed"):
+                    # Inutile de finir le parsing : on vide les messages restants
+                    cancelled.value = index
+                for _ in messages:
+                    pass
+                results.append(self._finish(result))
+        finally:
+            for process, out, _ in channels:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+        return results
+
+
+def _receive(index: int, process, out) -> Iterator[tuple]:
+    """
+    Messages du fichier `index` envoyés par `process`, jusqu'à "done" / "failed".
+    """
+    while True:
+        try:
+            file_index, message = out.get(timeout=1.0)
+        except queue.Empty:
+            if not process.is_alive():
+                yield ("failed", f"worker arrêté (code {process.exitcode})")
+                return
+            continue
+        if file_index != index:
+            # Reste d'un fichier abandonné par ce même worker
+            continue
+        yield message
+        if message[0] in ("done", "failed"):
+            return
@@ -0,0 +1,154 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .database import engine
+from .models import DataVersion, Indicator, Source, Zone
+
+# Clés de version particulières (en plus d'une clé par type d'indicateur)
+ALL = "*"
+ZONES = "zones"
+SOURCES = "sources"
+# Incrémentée quand des lignes existantes sont modifiées ou supprimées
+REWRITES = "rewrites"
+
+
+
+def data_version(key: str = ALL) -> int:
+    """
+    Compteur de version des données : change dès qu'une écriture
+    concernant `key` (type d'indicateur, "zones", "sources"...) est commitée.
+
+    Le compteur est lu dans la table `data_versions`, incrémentée dans la
+    transaction d'écriture : les workers, mais aussi les scripts lancés à côté
+    de l'API (init.py, retention.py, tiering.py), invalident les mêmes caches.
+    """
+    with engine.connect() as conn:
+        version = conn.execute(
+            select(DataVersion.version).where(DataVersion.key == key)
+        ).scalar()
+    return version or 0
+
+
+def etag(key: str, *parts: str) -> str:
+    """
+    ETag faible d'une réponse : dépend de la version des données `key`
+    et des paramètres de la requête (chemin, query string...).
+    """
+    raw = "|".join((key, str(data_version(key)), *parts))
+    return 'W/"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
+
+
+# --- suivi automatique des écritures via l'ORM ---
+
+def _changed_keys(session: Session) -> set:
+    return session.info.setdefault("changed_data_keys", set())
+
+
+def mark_changed(session: Session, keys: Iterable[str]) -> None:
+    """
+    Signale des écritures faites hors ORM (insert/delete SQLAlchemy Core) :
+    les versions seront incrémentées au prochain commit de la session.
+    """
+    _changed_keys(session).update(keys)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context) -> None:
+    keys = _changed_keys(session)
+    for obj in session.new:
+        if isinstance(obj, Indicator):
+            keys.add(obj.type)
+        elif isinstance(obj, Zone):
+            keys.add(ZONES)
+        elif isinstance(obj, Source):
+            keys.add(SOURCES)
+
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Indicator):
+            history = inspect(obj).attrs.type.history
+            keys.update(t for t in (obj.type, *history.deleted) if t)
+            keys.add(REWRITES)
+        elif isinstance(obj, Zone):
+            keys.add(ZONES)
+        elif isinstance(obj, Source):
+            keys.add(SOURCES)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session: Session) -> None:
+    # Flush d'abord pour connaître toutes les écritures de la transaction
+    session.flush()
+    keys = session.info.get("changed_data_keys")
+    if not keys:
+        return
+    stmt = sqlite_insert(DataVersion).values(
+        [{"key": key, "version": 1} for key in sorted(set(keys) | {ALL})]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["key"],
+        set_={"version": DataVersion.version + 1},
+    )
+    session.execute(stmt)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_changes(session: Session) -> None:
+    session.info.pop("changed_data_keys", None)
+
+
+class LRUCache:
+    """
+    Petit cache LRU thread-safe pour les résultats calculés.
+
+    Avec `max_weight`, la taille totale est aussi bornée : `weigh(value)`
+    (ex. nombre de points d'une série) est évalué à chaque set() et les
+    entrées les plus anciennes sont évincées au-delà de la limite.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        max_weight: Optional[int] = None,
+        weigh: Optional[Callable[[Any], int]] = None,
+    ):
+        self.maxsize = maxsize
+        self.max_weight = max_weight
+        self._weigh = weigh or (lambda value: 1)
+        self._data: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        weight = self._weigh(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._weight -= old[1]
+            self._data[key] = (value, weight)
+            self._weight += weight
+            while self._data and (
+                len(self._data) > self.maxsize
+                or (self.max_weight is not None and self._weight > self.max_weight)
+            ):
+                _, (_, evicted) = self._data.popitem(last=False)
+                self._weight -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._weight = 0
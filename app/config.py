@@ -0,0 +1,104 @@
+import os
+from pathlib import Path
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# --- Démarrage ---
+
+# Crée les tables manquantes au démarrage (désactiver sur les réplicas en
+# lecture seule ou quand le schéma est géré par Alembic)
+CREATE_SCHEMA = _env_bool("ECOTRACK_CREATE_SCHEMA", True)
+
+
+# Mode debug : en-têtes X-Query-Count / Server-Timing sur chaque réponse
+DEBUG = _env_bool("ECOTRACK_DEBUG")
+
+
+# --- Comptes ---
+
+# Emails (séparés par des virgules) qui reçoivent le rôle admin à l'inscription ;
+# /register refuse un rôle admin demandé par le client pour tout autre email
+ADMIN_EMAILS = frozenset(
+    email.strip().lower()
+    for email in os.getenv("ECOTRACK_ADMIN_EMAILS", "").split(",")
+    if email.strip()
+)
+
+
+# --- Imports CSV ---
+
+# Moteur de parsing des imports : "rows" (ligne à ligne) ou "columnar"
+# (conversions vectorisées NumPy par blocs, plus rapide sur les gros fichiers)
+IMPORT_PARSER = os.getenv("ECOTRACK_IMPORT_PARSER", "rows").strip().lower()
+
+# Contrôle qualité des mesures importées (voir app/quality.py) : "flag"
+# (insérées avec un quality_flag), "quarantine" (écartées dans la table
+# indicator_quarantine) ou "off"
+IMPORT_QC = os.getenv("ECOTRACK_IMPORT_QC", "flag").strip().lower()
+# Écart à la moyenne de la série (en écarts-types) au-delà duquel une mesure est aberrante
+IMPORT_QC_MAX_ZSCORE = float(os.getenv("ECOTRACK_IMPORT_QC_MAX_ZSCORE", "6"))
+# Nombre de mesures d'une série (zone, type) avant d'appliquer ce seuil
+IMPORT_QC_MIN_SAMPLES = int(os.getenv("ECOTRACK_IMPORT_QC_MIN_SAMPLES", "30"))
+# Dernières mesures valides en base qui amorcent les statistiques d'une série (0 = aucune)
+IMPORT_QC_HISTORY = int(os.getenv("ECOTRACK_IMPORT_QC_HISTORY", "500"))
+
+
+# --- Stockage froid (tiering.py) ---
+
+# Les mesures plus anciennes que HOT_DAYS jours sont déplacées dans des
+# fichiers Parquet compressés sous COLD_DIR (paquet optionnel pyarrow)
+HOT_DAYS = int(os.getenv("ECOTRACK_HOT_DAYS", "30"))
+COLD_DIR = Path(os.getenv("ECOTRACK_COLD_DIR", "./cold"))
+
+
+# --- Moyennes glissantes (/api/indicators/rolling) ---
+
+# Nombre total de points (résultats + fenêtres) gardés en cache pour prolonger
+# les séries glissantes ; les séries les moins récemment demandées sont évincées
+ROLLING_CACHE_MAX_POINTS = int(os.getenv("ECOTRACK_ROLLING_CACHE_MAX_POINTS", "1000000"))
+
+
+# --- Journal des requêtes SQL lentes ---
+
+# Seuil au-delà duquel une requête SQL est journalisée (millisecondes, 0 = désactivé)
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("ECOTRACK_SLOW_QUERY_MS", "200"))
+# Nombre de requêtes lentes gardées en mémoire pour /api/admin/slow-queries
+SLOW_QUERY_LOG_SIZE = int(os.getenv("ECOTRACK_SLOW_QUERY_LOG_SIZE", "100"))
+# Capture du plan d'exécution (EXPLAIN QUERY PLAN) des SELECT lents
+SLOW_QUERY_EXPLAIN = _env_bool("ECOTRACK_SLOW_QUERY_EXPLAIN", True)
+
+
+# --- Ingestion différée (write-behind) de POST /api/indicators ---
+
+# Si activé, POST /api/indicators répond 202 dès que la mesure est écrite
+# dans le journal local ; l'insertion en base est faite par lots.
+WRITE_BEHIND_ENABLED = _env_bool("ECOTRACK_WRITE_BEHIND")
+WRITE_BEHIND_WAL_PATH = Path(os.getenv("ECOTRACK_WAL_PATH", "./ecotrack-ingest.wal"))
+# Un lot est commité toutes les FLUSH_MS millisecondes ou dès BATCH_ROWS lignes
+WRITE_BEHIND_FLUSH_MS = int(os.getenv("ECOTRACK_WAL_FLUSH_MS", "50"))
+WRITE_BEHIND_BATCH_ROWS = int(os.getenv("ECOTRACK_WAL_BATCH_ROWS", "2000"))
+# Nombre max de mesures acceptées mais pas encore en base (au-delà : 503)
+WRITE_BEHIND_QUEUE_SIZE = int(os.getenv("ECOTRACK_WAL_QUEUE_SIZE", "20000"))
+# Temps d'attente max d'une place dans la file avant de refuser
+WRITE_BEHIND_ENQUEUE_TIMEOUT = float(os.getenv("ECOTRACK_WAL_ENQUEUE_TIMEOUT", "0.5"))
+# fsync du journal avant d'acquitter (désactiver = plus rapide mais pas durable)
+WRITE_BEHIND_FSYNC = _env_bool("ECOTRACK_WAL_FSYNC", True)
+
+
+# --- Déploiement multi-workers (uvicorn --workers N, plusieurs machines sur un même disque) ---
+
+# Active la coordination entre processus : verrou fichier pour les écritures
+# en masse, un journal d'ingestion par worker. (Les versions des données sont
+# toujours partagées via la table `data_versions`.)
+MULTI_WORKER = _env_bool("ECOTRACK_MULTI_WORKER")
+WRITE_LOCK_PATH = Path(os.getenv("ECOTRACK_WRITE_LOCK_PATH", "./ecotrack.db.lock"))
+# Attente max d'un verrou SQLite avant "database is locked" (millisecondes)
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("ECOTRACK_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+# /readyz répond 503 si l'ingestion différée a plus de mesures en attente
+READY_MAX_PENDING = int(os.getenv("ECOTRACK_READY_MAX_PENDING", "10000"))
@@ -1,9 +1,15 @@
-from typing import Optional
+import math
+import re
+from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from . import schemas
-from .models import User,Zone, Source, Indicator
+from . import schemas, cache, geo, pubsub, tiering
+from .models import User,Zone, Source, Indicator, LatestIndicator, QuarantinedIndicator, normalize_name, zone_search
 from datetime import datetime
-from sqlalchemy import func
+from sqlalchemy import and_, func, insert, or_, select, text, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+# Nombre max de mots pris en compte par GET /api/zones/search
+ZONE_SEARCH_MAX_WORDS = 8
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
@@ -24,6 +30,8 @@ def create_zone(db: Session, zone_in: schemas.ZoneCreate) -> Zone:
     zone = Zone(
         name=zone_in.name,
         postal_code=zone_in.postal_code,
+        latitude=zone_in.latitude,
+        longitude=zone_in.longitude,
     )
     db.add(zone)
     db.commit()
@@ -35,7 +43,34 @@ def get_zone(db: Session, zone_id: int) -> Optional[Zone]:
     return db.query(Zone).filter(Zone.id == zone_id).first()
 
 
-def list_zones(db: Session) -> list[Zone]:
+def get_zone_by_name(db: Session, name: str) -> Optional[Zone]:
+    return db.query(Zone).filter(Zone.normalized_name == normalize_name(name)).first()
+
+
+def search_zones(db: Session, q: str, limit: int = 10) -> list[Zone]:
+    """
+    Recherche des zones par nom (index FTS5 `zone_search`) : chaque mot de `q`
+    est un préfixe ("saint eti" trouve "Saint-Étienne"), sans tenir compte
+    des accents ni de la casse. Meilleurs résultats d'abord (bm25), puis les
+    noms les plus courts.
+    """
+    words = re.findall(r"\w+", q)[:ZONE_SEARCH_MAX_WORDS]
+    if not words:
+        return []
+    match = " ".join(f'"{word}"*' for word in words)
+    query = (
+        select(Zone)
+        .join(zone_search, zone_search.c.rowid == Zone.id)
+        .where(text("zone_search MATCH :match"))
+        .order_by(zone_search.c.rank, func.length(Zone.name), Zone.id)
+        .limit(limit)
+    )
+    return list(db.scalars(query, {"match": match}))
+
+
+def list_zones(db: Session, bbox: Optional[geo.BBox] = None) -> list[Zone]:
+    if bbox is not None:
+        return geo.zones_in_bbox(db, bbox)
     return db.query(Zone).all()
 
 
@@ -51,6 +86,10 @@ def create_source(db: Session, source_in: schemas.SourceCreate) -> Source:
     return source
 
 
+def get_source_by_name(db: Session, name: str) -> Optional[Source]:
+    return db.query(Source).filter(Source.normalized_name == normalize_name(name)).first()
+
+
 def get_source(db: Session, source_id: int) -> Optional[Source]:
     return db.query(Source).filter(Source.id == source_id).first()
 
@@ -66,14 +105,199 @@ def create_indicator(db: Session, indicator_in: schemas.IndicatorCreate) -> Indi
         value=indicator_in.value,
         unit=indicator_in.unit,
         timestamp=indicator_in.timestamp,
-        extra_metadata=indicator_in.metadata,
+        extra_metadata=indicator_in.extra_metadata,
     )
     db.add(indicator)
+    db.flush()
+    update_latest(db, Indicator.id == indicator.id)
     db.commit()
     db.refresh(indicator)
     return indicator
 
 
+def bulk_create_indicators(
+    db: Session,
+    items: list[tuple[int, schemas.IndicatorCreate]],
+    commit: bool = True,
+) -> dict[str, Any]:
+    """
+    Insère un lot d'indicateurs (index, payload) :
+    - écarte les valeurs non finies (NaN, Infinity),
+    - vérifie les zone_id / source_id en une requête ensembliste chacun,
+    - insère toutes les lignes valides en un seul executemany.
+
+    Retourne {"inserted": n, "errors": [{"index": i, "error": ...}]}.
+    Avec commit=False, l'appelant regroupe plusieurs lots dans la même transaction.
+    """
+    errors: list[dict[str, Any]] = []
+    if not items:
+        return {"inserted": 0, "errors": errors}
+
+    zone_ids = {item.zone_id for _, item in items}
+    source_ids = {item.source_id for _, item in items}
+    known_zones = {row[0] for row in db.query(Zone.id).filter(Zone.id.in_(zone_ids))}
+    known_sources = {row[0] for row in db.query(Source.id).filter(Source.id.in_(source_ids))}
+
+    rows = []
+    for index, item in items:
+        if not math.isfinite(item.value):
+            # NaN serait stocké en NULL : refusé par la contrainte NOT NULL pour tout le lot
+            errors.append({"index": index, "error": "Value must be a finite number"})
+        elif item.zone_id not in known_zones:
+            errors.append({"index": index, "error": "Zone not found"})
+        elif item.source_id not in known_sources:
+            errors.append({"index": index, "error": "Source not found"})
+        else:
+            rows.append(item.model_dump())
+
+    insert_indicator_rows(db, rows)
+    if commit:
+        db.commit()
+
+    return {"inserted": len(rows), "errors": errors}
+
+
+def insert_indicator_rows(db: Session, rows: list[dict[str, Any]]) -> None:
+    """
+    Insère des lignes d'indicateurs déjà validées en un seul executemany (sans commit).
+
+    Comme les insertions passent par SQLAlchemy Core, les versions des données
+    et la diffusion aux abonnés du flux SSE sont signalées explicitement.
+    """
+    if not rows:
+        return
+    # Les lignes insérées ont des ids plus grands (report dans latest_indicators)
+    last_id = db.query(func.max(Indicator.id)).scalar() or 0
+    room = pubsub.pending_room(db)
+    if room:
+        # On récupère les ids pour diffuser les mesures aux abonnés après commit
+        ids = db.execute(
+            insert(Indicator).returning(Indicator.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        pubsub.queue_messages(db, [
+            {"id": id_, **row, "timestamp": row["timestamp"].isoformat()}
+            for id_, row in zip(ids[:room], rows[:room])
+        ])
+        pubsub.queue_counts(db, rows[room:])
+    else:
+        db.execute(insert(Indicator), rows)
+        # Abonnés présents mais transaction déjà pleine : seulement des compteurs
+        pubsub.queue_counts(db, rows)
+    update_latest(db, Indicator.id > last_id)
+    cache.mark_changed(db, {row["type"] for row in rows})
+
+
+_LATEST_COLUMNS = ("zone_id", "type", "indicator_id", "source_id", "value", "unit", "timestamp")
+
+
+def update_latest(db: Session, *criteria) -> None:
+    """
+    Reporte dans latest_indicators les mesures valides qui vérifient `criteria`
+    (ex. Indicator.id > dernier id avant un lot) : une seule requête
+    INSERT ... SELECT (row_number() par zone, type), en ne remplaçant une valeur
+    connue que par une mesure plus récente (même date : id le plus grand).
+    """
+    # Ligne la plus récente de chaque série, départagée par id à date égale
+    ranked = (
+        select(
+            Indicator.zone_id,
+            Indicator.type,
+            Indicator.id,
+            Indicator.source_id,
+            Indicator.value,
+            Indicator.unit,
+            Indicator.timestamp,
+            func.row_number().over(
+                partition_by=(Indicator.zone_id, Indicator.type),
+                order_by=(Indicator.timestamp.desc(), Indicator.id.desc()),
+            ).label("rank"),
+        )
+        .where(Indicator.quality_flag == 0, *criteria)
+        .subquery()
+    )
+    latest = select(
+        ranked.c.zone_id,
+        ranked.c.type,
+        ranked.c.id,
+        ranked.c.source_id,
+        ranked.c.value,
+        ranked.c.unit,
+        ranked.c.timestamp,
+    ).where(ranked.c.rank == 1)
+    stmt = sqlite_insert(LatestIndicator).from_select(_LATEST_COLUMNS, latest)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["zone_id", "type"],
+        set_={column: stmt.excluded[column] for column in _LATEST_COLUMNS[2:]},
+        where=or_(
+            stmt.excluded.timestamp > LatestIndicator.timestamp,
+            and_(
+                stmt.excluded.timestamp == LatestIndicator.timestamp,
+                stmt.excluded.indicator_id > LatestIndicator.indicator_id,
+            ),
+        ),
+    )
+    db.execute(stmt)
+
+
+def refresh_latest(db: Session, zone_id: int, type: str, indicator_id: int) -> None:
+    """
+    Après modification / suppression de la mesure `indicator_id` : si c'était
+    la dernière de sa série, on recherche la précédente dans `indicators`.
+    """
+    deleted = db.query(LatestIndicator).filter(
+        LatestIndicator.zone_id == zone_id,
+        LatestIndicator.type == type,
+        LatestIndicator.indicator_id == indicator_id,
+    ).delete()
+    if deleted:
+        update_latest(db, Indicator.zone_id == zone_id, Indicator.type == type)
+
+
+def list_latest(db: Session, type: Optional[str] = None, zone_ids: Optional[List[int]] = None) -> List[LatestIndicator]:
+    """
+    Dernière mesure de chaque série, par clé primaire (zone, type) ou par type :
+    coût proportionnel au nombre de séries renvoyées.
+    """
+    query = db.query(LatestIndicator)
+    if type:
+        query = query.filter(LatestIndicator.type == type)
+    if zone_ids is not None:
+        query = query.filter(LatestIndicator.zone_id.in_(zone_ids))
+    return query.order_by(LatestIndicator.zone_id, LatestIndicator.type).all()
+
+
+def recent_values(db: Session, zone_id: int, type: str, limit: int) -> List[float]:
+    """
+    `limit` dernières valeurs valides (quality_flag = 0) de la série (zone, type),
+    qui amorcent le contrôle qualité d'un import. Une série sans mesure valide
+    (absente de latest_indicators) ne coûte qu'une lecture par clé.
+    """
+    latest = db.get(LatestIndicator, (zone_id, type))
+    if latest is None:
+        return []
+    rows = (
+        db.query(Indicator.value)
+        .filter(
+            Indicator.zone_id == zone_id,
+            Indicator.type == type,
+            Indicator.quality_flag == 0,
+            Indicator.timestamp <= latest.timestamp,
+        )
+        .order_by(Indicator.timestamp.desc())
+        .limit(limit)
+        .all()
+    )
+    return [value for (value,) in rows]
+
+
+def insert_quarantine_rows(db: Session, rows: list[dict[str, Any]]) -> None:
+    """
+    Insère les mesures écartées par le contrôle qualité d'un import (sans commit).
+    """
+    if rows:
+        db.execute(insert(QuarantinedIndicator), rows)
+
+
 def get_indicator(db: Session, indicator_id: int) -> Optional[Indicator]:
     return db.query(Indicator).filter(Indicator.id == indicator_id).first()
 
@@ -87,13 +311,23 @@ def list_indicators(
     date_to: Optional[datetime] = None,
     skip: int = 0,
     limit: int = 100,
-) -> list[Indicator]:
+    near: Optional[Tuple[float, float, float]] = None,
+) -> list[Any]:
+    """
+    Mesures filtrées. Si la période recoupe le stockage froid (voir app/tiering.py),
+    les mesures archivées (dictionnaires, ids plus anciens) viennent d'abord,
+    puis celles de la table chaude, par id croissant.
+    near=(lat, lon, rayon en km) : seulement les zones proches du point.
+    """
     query = db.query(Indicator)
 
     if type:
         query = query.filter(Indicator.type == type)
     if zone_id:
         query = query.filter(Indicator.zone_id == zone_id)
+    if near is not None:
+        # Sous-requête sur l'index spatial, pas de liste d'ids en paramètres
+        query = query.filter(Indicator.zone_id.in_(geo.near_zone_ids(*near)))
     if source_id:
         query = query.filter(Indicator.source_id == source_id)
     if date_from:
@@ -101,7 +335,24 @@ def list_indicators(
     if date_to:
         query = query.filter(Indicator.timestamp <= date_to)
 
-    return query.offset(skip).limit(limit).all()
+    partitions = tiering.cold_partitions(db, type, date_from, date_to)
+    if not partitions:
+        return query.offset(skip).limit(limit).all()
+
+    cold_rows, cold_count = tiering.list_cold(
+        partitions,
+        skip,
+        limit,
+        zone_id=zone_id,
+        zone_ids=list(db.scalars(geo.near_zone_ids(*near))) if near is not None else None,
+        source_id=source_id,
+        date_from=date_from,
+        date_to=date_to,
+    )
+    if len(cold_rows) >= limit:
+        return cold_rows
+    hot_rows = query.order_by(Indicator.id).offset(max(skip - cold_count, 0)).limit(limit - len(cold_rows)).all()
+    return cold_rows + hot_rows
 
 def indicator_stats(
     db: Session,
@@ -110,11 +361,13 @@ def indicator_stats(
     source_id: Optional[int] = None,
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
+    exclude_flagged: bool = False,
 ):
     """
     Retourne des stats agrégées sur les indicateurs :
     - count, min(value), max(value), avg(value)
-    avec les mêmes filtres que list_indicators.
+    avec les mêmes filtres que list_indicators
+    (exclude_flagged : sans les mesures signalées par le contrôle qualité).
     """
     query = db.query(
         func.count(Indicator.id),
@@ -133,16 +386,119 @@ def indicator_stats(
         query = query.filter(Indicator.timestamp >= date_from)
     if date_to:
         query = query.filter(Indicator.timestamp <= date_to)
+    if exclude_flagged:
+        query = query.filter(Indicator.quality_flag == 0)
 
     count, min_value, max_value, avg_value = query.one()
 
     # On renvoie un dict compatible avec IndicatorStats
-    return {
+    stats = {
         "count": count or 0,
         "min_value": min_value,
         "max_value": max_value,
         "avg_value": avg_value,
     }
+
+    # Mesures archivées dans le stockage froid, si la période les concerne
+    partitions = tiering.cold_partitions(db, type, date_from, date_to)
+    if partitions:
+        cold = tiering.cold_stats(
+            partitions,
+            zone_id=zone_id,
+            source_id=source_id,
+            date_from=date_from,
+            date_to=date_to,
+            exclude_flagged=exclude_flagged,
+        )
+        stats = tiering.merge_stats(stats, cold.get(()))
+    return stats
+
+
+def stats_batch_groups(queries: List[dict]) -> List[List[int]]:
+    """
+    Regroupe les jeux de filtres (dicts au format de indicator_stats) qui
+    peuvent être calculés par une même requête GROUP BY : mêmes source,
+    période et exclude_flagged, et mêmes critères renseignés parmi type / zone_id.
+    Retourne les positions des requêtes de chaque groupe.
+    """
+    groups: Dict[tuple, List[int]] = {}
+    for i, q in enumerate(queries):
+        key = (
+            q.get("source_id"), q.get("date_from"), q.get("date_to"), bool(q.get("exclude_flagged")),
+            bool(q.get("type")), bool(q.get("zone_id")),
+        )
+        groups.setdefault(key, []).append(i)
+    return list(groups.values())
+
+
+def grouped_indicator_stats(db: Session, queries: List[dict], positions: List[int]) -> Dict[int, dict]:
+    """
+    Stats de plusieurs requêtes d'un même groupe (voir stats_batch_groups) en
+    une seule requête : GROUP BY type, zone_id restreint aux cellules demandées.
+    Retourne {position: stats au format de indicator_stats}.
+    """
+    first = queries[positions[0]]
+    columns = []
+    if first.get("type"):
+        columns.append(Indicator.type)
+    if first.get("zone_id"):
+        columns.append(Indicator.zone_id)
+
+    def cell(q: dict) -> tuple:
+        return tuple(q[c.key] for c in columns)
+
+    query = db.query(
+        *columns,
+        func.count(Indicator.id),
+        func.min(Indicator.value),
+        func.max(Indicator.value),
+        func.avg(Indicator.value),
+    )
+    if first.get("source_id"):
+        query = query.filter(Indicator.source_id == first["source_id"])
+    if first.get("date_from"):
+        query = query.filter(Indicator.timestamp >= first["date_from"])
+    if first.get("date_to"):
+        query = query.filter(Indicator.timestamp <= first["date_to"])
+    if first.get("exclude_flagged"):
+        query = query.filter(Indicator.quality_flag == 0)
+
+    cells = {cell(queries[i]) for i in positions}
+    if len(columns) == 2:
+        query = query.filter(tuple_(*columns).in_(cells))
+    elif columns:
+        query = query.filter(columns[0].in_([c[0] for c in cells]))
+
+    found = {}
+    for row in query.group_by(*columns).all() if columns else [query.one()]:
+        count, min_value, max_value, avg_value = row[len(columns):]
+        found[tuple(row[:len(columns)])] = {
+            "count": count or 0,
+            "min_value": min_value,
+            "max_value": max_value,
+            "avg_value": avg_value,
+        }
+
+    empty = {"count": 0, "min_value": None, "max_value": None, "avg_value": None}
+    results = {i: found.get(cell(queries[i]), empty) for i in positions}
+
+    # Mesures archivées dans le stockage froid, si la période les concerne
+    partitions = tiering.cold_partitions(db, None, first.get("date_from"), first.get("date_to"))
+    if first.get("type"):
+        types = {c[0] for c in cells}
+        partitions = [p for p in partitions if p.type in types]
+    if partitions:
+        cold = tiering.cold_stats(
+            partitions,
+            group_by=[c.key for c in columns],
+            zone_ids=[c[-1] for c in cells] if first.get("zone_id") else None,
+            source_id=first.get("source_id"),
+            date_from=first.get("date_from"),
+            date_to=first.get("date_to"),
+            exclude_flagged=first.get("exclude_flagged"),
+        )
+        results = {i: tiering.merge_stats(stats, cold.get(cell(queries[i]))) for i, stats in results.items()}
+    return results
     
 def update_indicator(
     db: Session,
@@ -153,18 +509,25 @@ def update_indicator(
     Met à jour seulement les champs fournis dans indicator_in.
     """
     data = indicator_in.model_dump(exclude_unset=True)
+    zone_id, type_ = indicator.zone_id, indicator.type
 
     for field, value in data.items():
         if hasattr(indicator, field):
             setattr(indicator, field, value)
 
     db.add(indicator)
+    db.flush()
+    refresh_latest(db, zone_id, type_, indicator.id)
+    update_latest(db, Indicator.id == indicator.id)
     db.commit()
     db.refresh(indicator)
     return indicator
 
 
 def delete_indicator(db: Session, indicator: Indicator) -> None:
+    zone_id, type_, indicator_id = indicator.zone_id, indicator.type, indicator.id
     db.delete(indicator)
+    db.flush()
+    refresh_latest(db, zone_id, type_, indicator_id)
     db.commit()
 
@@ -1,6 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from . import config
+
 SQLALCHEMY_DATABASE_URL = "sqlite:///./ecotrack.db"
 
 engine = create_engine(
@@ -8,6 +10,22 @@ engine = create_engine(
     connect_args={"check_same_thread": False}
 )
 
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # Journal WAL : les lectures ne sont plus bloquées par une écriture
+    # (indispensable avec plusieurs workers), et attente au lieu d'échouer
+    # quand un autre processus écrit.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+    # Distance exacte des requêtes ?near= (voir geo.near_zone_ids)
+    from .geo import sql_haversine_km
+
+    dbapi_connection.create_function("haversine_km", 4, sql_haversine_km, deterministic=True)
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -0,0 +1,148 @@
+import math
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from .models import Zone, zone_rtree
+
+# Rayon moyen de la Terre (km), pour la distance orthodromique
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# Rayon max accepté par ?near=...&radius=
+MAX_RADIUS_KM = 500.0
+
+# (ouest, sud, est, nord) en degrés
+BBox = Tuple[float, float, float, float]
+
+
+def _floats(raw: str, count: int, name: str) -> List[float]:
+    try:
+        values = [float(part) for part in raw.split(",")]
+    except ValueError:
+        values = []
+    if len(values) != count or not all(math.isfinite(v) for v in values):
+        raise ValueError(f"{name} doit contenir {count} nombres séparés par des virgules")
+    return values
+
+
+def parse_bbox(raw: str) -> BBox:
+    """
+    "ouest,sud,est,nord" (longitudes / latitudes WGS84, ordre GeoJSON).
+    ouest > est : la boîte traverse l'antiméridien.
+    """
+    west, south, east, north = _floats(raw, 4, "bbox")
+    if not (-180 <= west <= 180 and -180 <= east <= 180 and -90 <= south <= north <= 90):
+        raise ValueError("bbox hors limites (longitudes -180..180, latitudes -90..90, sud <= nord)")
+    return west, south, east, north
+
+
+def parse_point(raw: str) -> Tuple[float, float]:
+    """
+    "lat,lon" en degrés WGS84.
+    """
+    lat, lon = _floats(raw, 2, "near")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError("near hors limites (latitude -90..90, longitude -180..180)")
+    return lat, lon
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def sql_haversine_km(lat1, lon1, lat2, lon2) -> Optional[float]:
+    """
+    haversine_km pour la fonction SQL du même nom (NULL si une coordonnée manque).
+    """
+    if None in (lat1, lon1, lat2, lon2):
+        return None
+    return haversine_km(lat1, lon1, lat2, lon2)
+
+
+def bbox_around(lat: float, lon: float, radius_km: float) -> BBox:
+    """
+    Boîte englobant le cercle de rayon `radius_km` autour du point
+    (toutes longitudes près des pôles ; ouest > est au-delà de l'antiméridien).
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    south, north = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+    cos_lat = math.cos(math.radians(max(abs(south), abs(north))))
+    if north >= 90 or south <= -90 or cos_lat <= 0:
+        return -180.0, south, 180.0, north
+    dlon = radius_km / (KM_PER_DEGREE * cos_lat)
+    if dlon >= 180:
+        return -180.0, south, 180.0, north
+    west, east = lon - dlon, lon + dlon
+    if west < -180:
+        west += 360
+    if east > 180:
+        east -= 360
+    return west, south, east, north
+
+
+def _intersects(min_lat, max_lat, min_lon, max_lon, bbox: BBox):
+    """
+    Filtre SQL : la boîte [min_lat, max_lat] x [min_lon, max_lon] coupe `bbox`.
+    """
+    west, south, east, north = bbox
+    lat_filter = and_(min_lat <= north, max_lat >= south)
+    if west <= east:
+        return and_(lat_filter, min_lon <= east, max_lon >= west)
+    # Traverse l'antiméridien : deux intervalles de longitude
+    return and_(lat_filter, or_(max_lon >= west, min_lon <= east))
+
+
+def zones_in_bbox(db: Session, bbox: BBox) -> List[Zone]:
+    """
+    Zones localisées dans la boîte, trouvées via l'index R*Tree.
+    L'index stocke des flottants 32 bits arrondis vers l'extérieur : le filtre
+    exact sur zones.latitude / longitude élimine les faux positifs en bordure.
+    """
+    rtree = zone_rtree.c
+    query = (
+        select(Zone)
+        .join(zone_rtree, rtree.id == Zone.id)
+        .where(_intersects(rtree.min_lat, rtree.max_lat, rtree.min_lon, rtree.max_lon, bbox))
+        .where(_intersects(Zone.latitude, Zone.latitude, Zone.longitude, Zone.longitude, bbox))
+        .order_by(Zone.id)
+    )
+    return list(db.scalars(query))
+
+
+def near_zone_ids(lat: float, lon: float, radius_km: float) -> Select:
+    """
+    Requête des ids des zones à moins de `radius_km` du point : boîte
+    englobante via l'index R*Tree, puis distance exacte (fonction SQL
+    haversine_km, déclarée sur chaque connexion par app/database.py).
+    S'utilise en sous-requête (zone_id IN (SELECT ...)) : un grand rayon ne
+    produit pas une liste de paramètres au-delà de la limite de SQLite.
+    """
+    rtree = zone_rtree.c
+    return (
+        select(Zone.id)
+        .join(zone_rtree, rtree.id == Zone.id)
+        .where(_intersects(rtree.min_lat, rtree.max_lat, rtree.min_lon, rtree.max_lon, bbox_around(lat, lon, radius_km)))
+        .where(func.haversine_km(lat, lon, Zone.latitude, Zone.longitude) <= radius_km)
+    )
+
+
+def parse_coordinate(raw: Optional[object], limit: float) -> Optional[float]:
+    """
+    Coordonnée optionnelle d'un CSV (degrés, virgule décimale acceptée) :
+    None si vide, invalide ou hors de [-limit, limit].
+    """
+    if raw is None:
+        return None
+    text = str(raw).strip().replace(",", ".")
+    if not text:
+        return None
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    return value if -limit <= value <= limit else None
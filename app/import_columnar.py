@@ -0,0 +1,250 @@
+import time
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .geo import parse_coordinate
+from .importer import IMPORT_BATCH_ROWS, DatasetSpec, _row_error, parse_row
+
+# Parsing colonnaire des CSV (parser="columnar") : les lignes sont lues par
+# blocs, puis chaque colonne utile est convertie d'un coup avec NumPy (dates,
+# nombres à virgule décimale, champs vides). Des masques marquent les lignes
+# que la voie vectorisée ne sait pas traiter ; celles-ci repassent par
+# parse_row, ce qui garantit exactement les mêmes mesures et les mêmes
+# messages d'erreur (par ligne) que le parsing ligne à ligne.
+
+# Caractères (points de code) reconnus par les conversions vectorisées
+_ZERO, _NINE = ord("0"), ord("9")
+_DOT, _PLUS, _MINUS = ord("."), ord("+"), ord("-")
+
+
+def _codes(values: np.ndarray, width: int) -> np.ndarray:
+    """
+    Matrice (lignes x caractères) des points de code de `values`,
+    complétée par des 0 jusqu'à au moins `width` caractères.
+    """
+    if values.dtype.itemsize // 4 < width:
+        values = values.astype(f"<U{width}")
+    return values.view(np.uint32).reshape(len(values), values.dtype.itemsize // 4).astype(np.int64)
+
+
+def parse_values(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Équivalent vectorisé de clean_float sur des chaînes déjà nettoyées (strip).
+    Retourne (valeurs, masque des lignes converties) ; vide -> 0.0.
+    Seules les écritures décimales simples ([+-]chiffres[,.]chiffres) sont
+    converties ici, le reste (exposants, "nan", valeurs invalides) est laissé à clean_float.
+    """
+    text = np.char.replace(values, ",", ".")
+    lengths = np.char.str_len(text)
+    codes = _codes(text, 1)
+    digit = (codes >= _ZERO) & (codes <= _NINE)
+    dot = codes == _DOT
+    sign = (codes == _PLUS) | (codes == _MINUS)
+
+    ok = (
+        ((digit | dot | sign).sum(axis=1) == lengths)
+        & digit.any(axis=1)
+        & (dot.sum(axis=1) <= 1)
+        & ~sign[:, 1:].any(axis=1)
+    )
+    result = np.zeros(len(values))
+    result[ok] = text[ok].astype(np.float64)
+    return result, ok | (lengths == 0)
+
+
+def parse_timestamps(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Équivalent vectorisé de parse_timestamp pour les formats courants, sur
+    des chaînes déjà nettoyées : AAAA-MM-JJ[ T]HH:MM:SS, AAAA/MM/JJ HH:MM:SS,
+    JJ/MM/AAAA HH:MM:SS, JJ-MM-AAAA HH:MM:SS et les dates seules AAAA-MM-JJ,
+    JJ/MM/AAAA, JJ-MM-AAAA. Retourne (datetime64[s], masque des lignes converties).
+    """
+    lengths = np.char.str_len(values)
+    codes = _codes(values, 19)[:, :19]
+    digits = codes - _ZERO
+    is_digit = (digits >= 0) & (digits <= 9)
+
+    def all_digits(positions: List[int]) -> np.ndarray:
+        return is_digit[:, positions].all(axis=1)
+
+    def char(position: int, chars: str) -> np.ndarray:
+        return np.isin(codes[:, position], [ord(c) for c in chars])
+
+    def number(start: int, width: int) -> np.ndarray:
+        result = np.zeros(len(values), dtype=np.int64)
+        for position in range(start, start + width):
+            result = result * 10 + digits[:, position]
+        return result
+
+    date_only = lengths == 10
+    with_time = (lengths == 19) & all_digits([11, 12, 14, 15, 17, 18]) & char(13, ":") & char(16, ":")
+    ymd = all_digits([0, 1, 2, 3, 5, 6, 8, 9])
+    dmy = all_digits([0, 1, 3, 4, 6, 7, 8, 9])
+
+    # AAAA-MM-JJ (ISO, avec ou sans heure) / AAAA/MM/JJ HH:MM:SS
+    iso = ymd & char(4, "-") & char(7, "-") & (date_only | (with_time & char(10, " T")))
+    ymd_slash = ymd & char(4, "/") & char(7, "/") & with_time & char(10, " ")
+    # JJ/MM/AAAA, JJ-MM-AAAA (avec ou sans heure)
+    french = (
+        dmy
+        & ((char(2, "/") & char(5, "/")) | (char(2, "-") & char(5, "-")))
+        & (date_only | (with_time & char(10, " ")))
+    )
+    year_first = iso | ymd_slash
+
+    year = np.where(year_first, number(0, 4), number(6, 4))
+    month = np.where(year_first, number(5, 2), number(3, 2))
+    day = np.where(year_first, number(8, 2), number(0, 2))
+    hour, minute, second = (np.where(with_time, number(start, 2), 0) for start in (11, 14, 17))
+
+    ok = (
+        (year_first | french)
+        & (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1)
+        & (hour <= 23) & (minute <= 59) & (second <= 59)
+    )
+    # Valeurs neutres sur les lignes rejetées (pas de date hors limites)
+    year, month, day = np.where(ok, year, 1970), np.where(ok, month, 1), np.where(ok, day, 1)
+    month_start = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    first_day = month_start.astype("datetime64[D]")
+    days_in_month = ((month_start + 1).astype("datetime64[D]") - first_day).astype(np.int64)
+    ok &= day <= days_in_month
+
+    timestamps = (first_day + (day - 1)).astype("datetime64[s]") + (hour * 3600 + minute * 60 + second)
+    return timestamps, ok
+
+
+def parse_coordinates(values: np.ndarray, limit: float) -> List[Optional[float]]:
+    """
+    Équivalent vectorisé de parse_coordinate (vide, invalide ou hors limites -> None).
+    """
+    numbers, ok = parse_values(values)
+    valid = ok & (np.char.str_len(values) > 0) & (np.abs(numbers) <= limit)
+    result = [number if keep else None for number, keep in zip(numbers.tolist(), valid.tolist())]
+    for i in np.flatnonzero(~ok).tolist():
+        # Écritures non décimales (exposant...) : conversion ligne à ligne
+        result[i] = parse_coordinate(values[i], limit)
+    return result
+
+
+def _as_dict(fieldnames: List[str], row: List[str]) -> Dict[Any, Any]:
+    # Même dictionnaire que csv.DictReader (colonnes en trop / manquantes)
+    result: Dict[Any, Any] = dict(zip(fieldnames, row))
+    if len(row) > len(fieldnames):
+        result[None] = row[len(fieldnames):]
+    else:
+        for name in fieldnames[len(row):]:
+            result[name] = None
+    return result
+
+
+def _parse_block(
+    spec: DatasetSpec,
+    fieldnames: List[str],
+    first_line: int,
+    rows: List[List[str]],
+    profile,
+) -> Tuple[List[tuple], List[Dict[str, Any]]]:
+    index = {name: i for i, name in enumerate(fieldnames)}
+    regular = [i for i, row in enumerate(rows) if len(row) == len(fieldnames)]
+    regular_rows = [rows[i] for i in regular]
+    # Chaque colonne utile n'est extraite et nettoyée qu'une fois par bloc
+    cleaned: Dict[Optional[str], np.ndarray] = {}
+
+    def column(name: Optional[str]) -> np.ndarray:
+        if name not in cleaned:
+            if name is None or name not in index:
+                cleaned[name] = np.full(len(regular_rows), "")
+            else:
+                position = index[name]
+                cleaned[name] = np.char.strip(np.array([row[position] for row in regular_rows], dtype=str))
+        return cleaned[name]
+
+    ok = np.ones(len(regular_rows), dtype=bool)
+    for columns, _ in spec.empty_checks:
+        for name in columns:
+            ok &= np.char.str_len(column(name)) > 0
+    with profile.stage("parse_timestamp", calls=len(regular_rows)):
+        timestamps, ts_ok = parse_timestamps(column(spec.timestamp_column))
+    with profile.stage("clean_float", calls=len(regular_rows)):
+        raw_values = column(spec.value_column)
+        values, value_ok = parse_values(raw_values)
+        missing = np.char.str_len(raw_values) == 0
+    ok &= ts_ok & value_ok
+
+    # Une entrée par ligne du bloc : (ligne, ligne brute, mesure) ou erreur
+    results: List[Any] = [None] * len(rows)
+    good = np.flatnonzero(ok)
+    if len(good):
+        sources = column(spec.source_column)[good].tolist()
+        zones = column(spec.zone_column)[good].tolist()
+        types = [spec.fixed_type] * len(good) if spec.fixed_type else column(spec.type_column)[good].tolist()
+        units = column(spec.unit_column)[good].tolist()
+        latitudes = longitudes = [None] * len(good)
+        if spec.latitude_column:
+            latitudes = parse_coordinates(column(spec.latitude_column)[good], 90)
+        if spec.longitude_column:
+            longitudes = parse_coordinates(column(spec.longitude_column)[good], 180)
+        # Dictionnaire par ligne seulement si le format renvoie la ligne avec
+        # les erreurs ; sinon `metadata` ne reçoit que les colonnes qu'il lit
+        full_rows = spec.keep_row_in_errors or spec.metadata_columns is None
+        metadata_positions = [(name, index[name]) for name in spec.metadata_columns or () if name in index]
+        for i, source, zone, type_, unit, timestamp, value, is_missing, latitude, longitude in zip(
+            good.tolist(), sources, zones, types, units,
+            timestamps[good].astype(object), values[good].tolist(), missing[good].tolist(), latitudes, longitudes,
+        ):
+            raw = regular_rows[i]
+            if full_rows:
+                row = dict(zip(fieldnames, raw))
+            else:
+                row = {name: raw[position] for name, position in metadata_positions}
+            results[regular[i]] = (first_line + regular[i], row if spec.keep_row_in_errors else None, {
+                "source": source,
+                "zone": zone,
+                "type": type_,
+                "value": value,
+                "missing_value": is_missing,
+                "unit": unit or spec.default_unit,
+                "timestamp": timestamp,
+                "extra_metadata": spec.metadata(row),
+                "latitude": latitude,
+                "longitude": longitude,
+            })
+
+    # Lignes non reconnues par la voie vectorisée : parsing ligne à ligne
+    fallback = [regular[i] for i in np.flatnonzero(~ok).tolist()]
+    fallback += [i for i, row in enumerate(rows) if len(row) != len(fieldnames)]
+    for i in fallback:
+        row = _as_dict(fieldnames, rows[i])
+        try:
+            item = parse_row(spec, row, profile)
+            results[i] = (first_line + i, row if spec.keep_row_in_errors else None, item)
+        except Exception as e:
+            results[i] = _row_error(spec, first_line + i, e, row)
+
+    parsed = [entry for entry in results if isinstance(entry, tuple)]
+    errors = [entry for entry in results if isinstance(entry, dict)]
+    return parsed, errors
+
+
+def parse_batches_columnar(spec: DatasetSpec, reader, profile) -> Iterator[tuple]:
+    """
+    Équivalent de parse_batches par blocs de IMPORT_BATCH_ROWS lignes.
+    `reader` est le csv.DictReader renvoyé par open_reader (en-têtes déjà lus) :
+    on lit directement son csv.reader sous-jacent, sans dictionnaire par ligne.
+    """
+    fieldnames = list(reader.fieldnames or [])
+    raw = reader.reader
+    line = 2
+    while True:
+        start = time.perf_counter()
+        chunk = list(islice(raw, IMPORT_BATCH_ROWS))
+        if not chunk:
+            return
+        # Les lignes vides sont ignorées (et non numérotées), comme par DictReader
+        rows = [row for row in chunk if row]
+        profile.add("decode", time.perf_counter() - start, calls=len(rows))
+        if rows:
+            yield _parse_block(spec, fieldnames, line, rows, profile)
+            line += len(rows)
@@ -0,0 +1,133 @@
+import gzip
+import io
+import zipfile
+import zlib
+from pathlib import Path
+from typing import IO, Any, BinaryIO, Callable, Dict, Iterator, List, Tuple
+
+# Signatures des formats compressés (premiers octets du fichier)
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+ZIP_MAGIC = b"PK\x03\x04"
+
+# Extensions acceptées par les routes d'import et init.py
+SUPPORTED_SUFFIXES = (".csv", ".csv.gz", ".csv.zst", ".zip")
+# Taille du tampon de lecture devant les flux décompressés
+READ_BUFFER = 1 << 20
+# Erreurs de lecture d'un fichier corrompu / mal encodé (réponse 400 côté API)
+READ_ERRORS = (UnicodeDecodeError, EOFError, OSError, zlib.error, zipfile.BadZipFile)
+
+
+def is_supported(filename: str) -> bool:
+    return filename.lower().endswith(SUPPORTED_SUFFIXES)
+
+
+def _open_zstd(raw: BinaryIO) -> BinaryIO:
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("Fichier .zst : le paquet optionnel 'zstandard' n'est pas installé.")
+    return zstandard.ZstdDecompressor().stream_reader(raw, read_size=READ_BUFFER, closefd=False)
+
+
+def _peek(raw: BinaryIO, size: int = 4) -> Tuple[BinaryIO, bytes]:
+    """
+    Lit les premiers octets sans les consommer (le flux n'est pas forcément seekable).
+    """
+    if hasattr(raw, "peek"):
+        return raw, raw.peek(size)[:size]
+    if raw.seekable():
+        position = raw.tell()
+        magic = raw.read(size)
+        raw.seek(position)
+        return raw, magic
+    raw = io.BufferedReader(raw, buffer_size=READ_BUFFER)
+    return raw, raw.peek(size)[:size]
+
+
+def _text(raw: BinaryIO) -> IO[str]:
+    # newline="" : le module csv gère lui-même les fins de ligne (\r\n compris)
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+
+
+def iter_csv_streams(raw: BinaryIO, filename: str) -> Iterator[Tuple[str, IO[str]]]:
+    """
+    Produit (nom, flux texte) pour chaque CSV contenu dans `raw` :
+    CSV brut, gzip, zstd, ou archive zip (un flux par membre .csv / .csv.gz / .csv.zst).
+
+    La décompression se fait en flux, sans fichier temporaire ; le format est
+    reconnu à ses premiers octets (l'extension de `filename` ne sert qu'aux noms).
+    Un zip doit être lu depuis un fichier seekable (fichier disque, upload).
+    """
+    raw, magic = _peek(raw)
+
+    if magic.startswith(ZIP_MAGIC):
+        if not raw.seekable():
+            raise ValueError(f"{filename} : une archive zip doit être lue depuis un fichier.")
+        with zipfile.ZipFile(raw) as archive:
+            members = [
+                info for info in archive.infolist()
+                if not info.is_dir() and info.filename.lower().endswith(SUPPORTED_SUFFIXES[:3])
+            ]
+            for info in members:
+                with archive.open(info) as member:
+                    yield from iter_csv_streams(member, info.filename)
+        return
+
+    if magic.startswith(GZIP_MAGIC):
+        stream: BinaryIO = gzip.GzipFile(fileobj=raw, mode="rb")
+    elif magic.startswith(ZSTD_MAGIC):
+        stream = _open_zstd(raw)
+    else:
+        stream = raw
+
+    text = _text(stream)
+    try:
+        yield Path(filename).name, text
+    finally:
+        # Ne ferme pas `raw` : il appartient à l'appelant (upload, membre de zip...)
+        text.detach()
+        if stream is not raw:
+            stream.close()
+
+
+def import_file(
+    import_fn: Callable[..., Dict[str, Any]],
+    db,
+    raw: BinaryIO,
+    filename: str,
+    profile=None,
+) -> Dict[str, Any]:
+    """
+    Importe tous les CSV de `raw` (éventuellement compressé / archive zip) avec `import_fn`.
+
+    Pour un seul CSV, le résultat est celui de `import_fn` (ValueError si le
+    fichier est refusé). Pour une archive de plusieurs CSV, chaque fichier est
+    commité séparément : les compteurs sont additionnés, chaque erreur porte
+    le nom de son fichier et "files" détaille le résultat par fichier (un
+    fichier refusé, ex. colonnes manquantes, n'empêche pas les autres).
+    """
+    files: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    inserted = 0
+    single = None
+
+    for name, text in iter_csv_streams(raw, filename):
+        try:
+            result = import_fn(db, text, profile=profile)
+        except ValueError as e:
+            files.append({"file": name, "inserted": 0, "errors": 0, "rejected": str(e)})
+            single = e
+            continue
+        single = result
+        inserted += result["inserted"]
+        errors.extend({"file": name, **error} for error in result["errors"])
+        files.append({"file": name, "inserted": result["inserted"], "errors": len(result["errors"])})
+
+    if not files:
+        raise ValueError("Aucun fichier CSV dans l'archive.")
+    if len(files) == 1:
+        if isinstance(single, ValueError):
+            raise single
+        return single
+    return {"inserted": inserted, "errors": errors, "files": files}
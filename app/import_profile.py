@@ -0,0 +1,171 @@
+import cProfile
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+# Étapes mesurées, dans l'ordre du pipeline d'import
+STAGES = ("decode", "parse_timestamp", "clean_float", "lookups", "add", "commit", "wait_parse")
+# Nombre de catégories d'erreurs rapportées
+TOP_ERRORS = 10
+
+
+class ImportProfile:
+    """
+    Temps passé par étape d'un import CSV (profile=true).
+
+    - decode : lecture du fichier et découpage CSV (une mesure par ligne lue)
+    - parse_timestamp / clean_float : conversions
+    - lookups : résolution des zones / sources (get_or_create_*)
+    - add : insertion en base par lots (executemany)
+    - commit : commit final
+    - wait_parse : attente, côté écriture, des lots du thread de parsing
+    decode / parse_timestamp / clean_float tournent sur le thread de parsing,
+    en parallèle des écritures : la somme des étapes peut dépasser le total.
+    Avec `inline` (posé par run_profiled sous cProfile, qui ne suit que le
+    thread qui l'a activé), le parsing reste sur le thread appelant.
+    Le reste (validations, métadonnées) apparaît dans `other_seconds`.
+    Le temps total court depuis la création du profil : le créer avant de
+    lire le fichier pour inclure la réception de l'upload.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.seconds: Dict[str, float] = {name: 0.0 for name in STAGES}
+        self.calls: Dict[str, int] = {name: 0 for name in STAGES}
+        self.inline = False
+
+    def add(self, stage: str, seconds: float, calls: int = 1) -> None:
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+        self.calls[stage] = self.calls.get(stage, 0) + calls
+
+    @contextmanager
+    def stage(self, name: str, calls: int = 1) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, calls)
+
+    def rows(self, reader: Iterable[Any], stage: str = "decode") -> Iterator[Any]:
+        """
+        Itère sur `reader` en comptant le temps d'attente de chaque élément dans `stage`.
+        """
+        iterator = iter(reader)
+        while True:
+            start = time.perf_counter()
+            try:
+                row = next(iterator)
+            except StopIteration:
+                self.add(stage, time.perf_counter() - start, calls=0)
+                return
+            self.add(stage, time.perf_counter() - start)
+            yield row
+
+    def report(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        total_seconds = time.perf_counter() - self.started
+        rows = result["inserted"] + len(result["errors"])
+        stages = {}
+        for name, seconds in self.seconds.items():
+            calls = self.calls[name]
+            stages[name] = {
+                "seconds": round(seconds, 4),
+                "calls": calls,
+                "per_second": round(calls / seconds, 1) if seconds and calls else None,
+                "share": round(seconds / total_seconds, 3) if total_seconds else None,
+            }
+        return {
+            "total_seconds": round(total_seconds, 4),
+            "rows": rows,
+            "rows_per_second": round(rows / total_seconds, 1) if total_seconds else None,
+            "stages": stages,
+            "other_seconds": round(max(0.0, total_seconds - sum(self.seconds.values())), 4),
+            "top_errors": top_errors(result["errors"]),
+        }
+
+
+class _NoProfile:
+    """
+    Profil inactif (cas par défaut) : aucune mesure, surcoût négligeable.
+    """
+
+    _stage = nullcontext()
+    inline = False
+
+    def add(self, stage: str, seconds: float, calls: int = 1) -> None:
+        pass
+
+    def stage(self, name: str, calls: int = 1):
+        return self._stage
+
+    def rows(self, reader: Iterable[Any], stage: str = "decode") -> Iterable[Any]:
+        return reader
+
+
+NO_PROFILE = _NoProfile()
+
+
+def error_category(message: str) -> str:
+    """
+    Regroupe les messages d'erreur qui ne diffèrent que par la valeur fautive :
+    "Format de date inconnu : 'abc'" -> "Format de date inconnu".
+    """
+    category = message.split(" : ", 1)[0].split("\n", 1)[0].strip()
+    return category[:120] or "Erreur inconnue"
+
+
+def top_errors(errors: Iterable[Dict[str, Any]], limit: int = TOP_ERRORS) -> list:
+    counts = Counter(error_category(str(e.get("error", ""))) for e in errors)
+    return [{"error": category, "count": count} for category, count in counts.most_common(limit)]
+
+
+def run_profiled(
+    import_fn: Callable[..., Dict[str, Any]],
+    db,
+    file_obj,
+    profile: Optional[ImportProfile] = None,
+    pstats_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Lance `import_fn(db, file_obj, profile=...)` et ajoute le rapport
+    par étape au résultat (clé "profile").
+
+    Si `pstats_path` est donné, l'import tourne aussi sous cProfile et les
+    statistiques sont écrites dans ce fichier (lisible avec pstats / snakeviz).
+    cProfile ralentit l'exécution : les temps par étape sont alors gonflés.
+    """
+    profile = profile or ImportProfile()
+    profiler = cProfile.Profile() if pstats_path else None
+
+    if profiler is not None:
+        # Parsing sur ce thread : sinon decode / parse_timestamp / clean_float
+        # manqueraient aux statistiques cProfile
+        profile.inline = True
+        profiler.enable()
+    try:
+        result = import_fn(db, file_obj, profile=profile)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(pstats_path)
+
+    result["profile"] = profile.report(result)
+    return result
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """
+    Rapport lisible pour la ligne de commande.
+    """
+    lines = [
+        f"total {report['total_seconds']:.3f} s, {report['rows']} lignes "
+        f"({report['rows_per_second'] or 0:.0f} lignes/s)"
+    ]
+    for name, stage in report["stages"].items():
+        share = (stage["share"] or 0) * 100
+        rate = f"{stage['per_second']:.0f}/s" if stage["per_second"] else "-"
+        lines.append(f"  {name:<16} {stage['seconds']:>9.3f} s {share:5.1f} %  {stage['calls']:>9} appels  {rate}")
+    lines.append(f"  {'autre':<16} {report['other_seconds']:>9.3f} s")
+    for error in report["top_errors"]:
+        lines.append(f"  erreur x{error['count']} : {error['error']}")
+    return "\n".join(lines)
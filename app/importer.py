@@ -1,15 +1,20 @@
 import csv
 import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from typing import IO, List, Dict, Any, Optional
+from typing import IO, List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
 
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
-from .models import Indicator, Zone, Source
+from . import config, crud, metrics, quality
+from .geo import parse_coordinate
+from .import_profile import NO_PROFILE, ImportProfile
+from .models import Zone, Source, normalize_name
 
-# Configuration basique du logging pour voir les erreurs dans la console
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def parse_timestamp(raw: str) -> datetime:
@@ -78,12 +83,24 @@ def normalize_csv_headers(fieldnames: List[str]) -> List[str]:
 
 # --- FONCTIONS DB ---
 
-def get_or_create_zone(db: Session, name: str) -> Zone:
+def get_or_create_zone(
+    db: Session,
+    name: str,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+) -> Zone:
     name = name.strip()
-    zone = db.query(Zone).filter(Zone.name == name).first()
+    if latitude is None or longitude is None:
+        latitude = longitude = None
+    # Index unique sur le nom normalisé : "Metz", "METZ " -> même zone
+    zone = db.query(Zone).filter(Zone.normalized_name == normalize_name(name)).first()
     if zone:
+        if zone.latitude is None and latitude is not None:
+            # Première source qui donne la position de la zone (index spatial via trigger)
+            zone.latitude, zone.longitude = latitude, longitude
+            db.flush()
         return zone
-    zone = Zone(name=name, postal_code=None)
+    zone = Zone(name=name, postal_code=None, latitude=latitude, longitude=longitude)
     db.add(zone)
     # On utilise flush() pour avoir l'ID sans commiter définitivement la transaction globale
     db.flush() 
@@ -97,7 +114,7 @@ def get_or_create_source(
     url: Optional[str] = "",
 ) -> Source:
     name = name.strip()
-    source = db.query(Source).filter(Source.name == name).first()
+    source = db.query(Source).filter(Source.normalized_name == normalize_name(name)).first()
     if source:
         return source
     source = Source(name=name, description=description or "", url=url or "")
@@ -106,233 +123,471 @@ def get_or_create_source(
     db.refresh(source)
     return source
 
-# --- IMPORT GENERIC ---
+# --- PIPELINE D'IMPORT ---
+#
+# lecture CSV -> parsing (thread dédié) -> file bornée -> résolution zone/source -> écriture
+#
+# Le parsing (décodage, dates, nombres) tourne dans un thread et prépare des
+# lots pendant que la session écrit les précédents (executemany). La file
+# entre les deux est bornée : un parsing plus rapide que la base ne fait pas
+# grossir la mémoire. Tout l'import reste dans une seule transaction.
+
+# Nombre de lignes parsées envoyées ensemble à l'écriture
+IMPORT_BATCH_ROWS = 2000
+# Nombre max de lots parsés d'avance (file entre parsing et écriture)
+PIPELINE_DEPTH = 4
+# Moteurs de parsing : "rows" (csv.DictReader, ligne à ligne) ou
+# "columnar" (blocs convertis avec NumPy, voir app.import_columnar)
+PARSERS = ("rows", "columnar")
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """
+    Description d'un format de CSV importable : séparateur, colonnes et règles
+    de conversion. Un nouveau format se branche en déclarant un DatasetSpec
+    et en appelant run_import, sans recopier la boucle d'import.
+    """
+    name: str                           # label des métriques (ecotrack_import_*)
+    label: str                          # nom du format dans les messages d'erreur
+    delimiter: str
+    required_columns: frozenset
+    source_column: str
+    zone_column: str
+    timestamp_column: str
+    value_column: str
+    type_column: Optional[str] = None
+    fixed_type: Optional[str] = None    # type constant (ex. "atmo_index")
+    unit_column: Optional[str] = None
+    default_unit: str = ""
+    # Colonnes optionnelles de position de la zone (degrés WGS84)
+    latitude_column: Optional[str] = None
+    longitude_column: Optional[str] = None
+    # (colonnes, message) : erreur si l'une des colonnes est vide
+    empty_checks: Tuple[Tuple[Tuple[str, ...], str], ...] = ()
+    metadata: Callable[[Dict[str, Any]], Optional[str]] = lambda row: None
+    # Colonnes lues par `metadata` (None : inconnues, la ligne entière lui est passée)
+    metadata_columns: Optional[Tuple[str, ...]] = None
+    source_description: Callable[[str], str] = lambda name: ""
+    keep_row_in_errors: bool = False    # renvoie la ligne brute avec l'erreur
+    # Valeurs négatives signalées par le contrôle qualité (sinon : selon l'unité)
+    non_negative: bool = False
+    db_error_prefix: str = "Erreur DB"
+
+
+def _cell(row: Dict[str, Any], column: Optional[str]) -> str:
+    return (row.get(column) or "").strip() if column else ""
+
+
+def parse_row(spec: DatasetSpec, row: Dict[str, Any], profile=NO_PROFILE) -> Dict[str, Any]:
+    """
+    Convertit une ligne CSV en mesure (noms de zone/source pas encore résolus).
+    Lève ValueError avec un message lisible si la ligne est invalide.
+    """
+    for columns, message in spec.empty_checks:
+        if not all(_cell(row, column) for column in columns):
+            raise ValueError(message)
+
+    with profile.stage("parse_timestamp"):
+        ts = parse_timestamp(row.get(spec.timestamp_column))
+    with profile.stage("clean_float"):
+        raw_value = row.get(spec.value_column)
+        value = clean_float(raw_value)
+
+    return {
+        "source": _cell(row, spec.source_column),
+        "zone": _cell(row, spec.zone_column),
+        "type": spec.fixed_type or _cell(row, spec.type_column),
+        "value": value,
+        "missing_value": raw_value is None or not str(raw_value).strip(),
+        "unit": _cell(row, spec.unit_column) or spec.default_unit,
+        "timestamp": ts,
+        "extra_metadata": spec.metadata(row),
+        "latitude": parse_coordinate(row.get(spec.latitude_column), 90) if spec.latitude_column else None,
+        "longitude": parse_coordinate(row.get(spec.longitude_column), 180) if spec.longitude_column else None,
+    }
 
-def import_indicators_from_csv(
-    db: Session,
-    file_obj: IO[str],
-) -> Dict[str, Any]:
-    
-    # Lecture initiale pour nettoyer les headers
-    reader = csv.DictReader(file_obj, delimiter=",") # Par défaut virgule
-    
+
+def _row_error(spec: DatasetSpec, line: int, error: Exception, row: Dict[str, Any]) -> Dict[str, Any]:
+    entry = {"line": line, "error": str(error)}
+    if spec.keep_row_in_errors:
+        entry["row"] = row
+    return entry
+
+
+def open_reader(spec: DatasetSpec, lines: Iterable[str]) -> csv.DictReader:
+    """
+    Lecteur CSV au format `spec` ; lève ValueError si des colonnes obligatoires manquent.
+    """
+    reader = csv.DictReader(lines, delimiter=spec.delimiter)
     # Normalisation des headers (hack pour modifier le fieldnames du reader à la volée)
     if reader.fieldnames:
         reader.fieldnames = normalize_csv_headers(reader.fieldnames)
 
-    required_cols = {"source_name", "zone_name", "type", "value", "unit", "timestamp"}
-    missing = required_cols - set(reader.fieldnames or [])
+    missing = set(spec.required_columns) - set(reader.fieldnames or [])
     if missing:
-        raise ValueError(f"Colonnes manquantes (CSV Générique) : {missing}")
+        raise ValueError(f"Colonnes manquantes ({spec.label}) : {missing}")
+    return reader
 
-    inserted = 0
-    errors: List[Dict[str, Any]] = []
 
-    for idx, row in enumerate(reader, start=2):
-        try:
-            # Extraction et nettoyage
-            source_name = row.get("source_name", "").strip()
-            zone_name = row.get("zone_name", "").strip()
-            type_ = row.get("type", "").strip()
-            
-            # Validations
-            if not source_name: raise ValueError("source_name vide")
-            if not zone_name: raise ValueError("zone_name vide")
-            if not type_: raise ValueError("type vide")
-
-            # Conversions
-            value = clean_float(row.get("value"))
-            ts = parse_timestamp(row.get("timestamp"))
-            unit = row.get("unit", "").strip()
-            metadata = row.get("metadata", None)
-
-            # Logique DB
-            source = get_or_create_source(db, source_name)
-            zone = get_or_create_zone(db, zone_name)
-
-            indicator = Indicator(
-                source_id=source.id,
-                zone_id=zone.id,
-                type=type_,
-                value=value,
-                unit=unit,
-                timestamp=ts,
-                extra_metadata=metadata,
-            )
-            db.add(indicator)
-            inserted += 1
+def parse_batches(
+    spec: DatasetSpec,
+    reader: Iterable[Dict[str, Any]],
+    profile=NO_PROFILE,
+    parser: Optional[str] = None,
+) -> Iterator[tuple]:
+    """
+    Étapes lecture + parsing : produit des lots (lignes parsées, erreurs).
+    Chaque ligne parsée est (numéro de ligne, ligne brute, mesure) ; la ligne
+    brute n'est gardée que si le format la renvoie avec les erreurs.
+
+    parser : "rows" ou "columnar" (défaut : config.IMPORT_PARSER) ; les deux
+    produisent les mêmes mesures et les mêmes erreurs. Le moteur colonnaire
+    a besoin du csv.DictReader d'open_reader.
+    """
+    parser = parser or config.IMPORT_PARSER
+    if parser not in PARSERS:
+        raise ValueError(f"Moteur de parsing inconnu : {parser!r} (valeurs : {', '.join(PARSERS)})")
+    if parser == "columnar" and isinstance(reader, csv.DictReader):
+        from .import_columnar import parse_batches_columnar
 
+        yield from parse_batches_columnar(spec, reader, profile)
+        return
+
+    parsed: List[tuple] = []
+    errors: List[Dict[str, Any]] = []
+    for line, row in enumerate(profile.rows(reader), start=2):
+        try:
+            item = parse_row(spec, row, profile)
+            parsed.append((line, row if spec.keep_row_in_errors else None, item))
         except Exception as e:
             # On capture l'erreur mais on continue le fichier
-            errors.append({"line": idx, "error": str(e), "row": row})
+            errors.append(_row_error(spec, line, e, row))
+        if len(parsed) >= IMPORT_BATCH_ROWS:
+            yield parsed, errors
+            parsed, errors = [], []
+    if parsed or errors:
+        yield parsed, errors
 
-    # Commit final de toutes les lignes valides
-    try:
-        db.commit()
-    except SQLAlchemyError as e:
-        db.rollback()
-        raise ValueError(f"Erreur base de données lors du commit : {str(e)}")
 
-    return {"inserted": inserted, "errors": errors}
+_DONE = object()
 
-# --- IMPORT FR_E2 ---
 
-def import_fr_e2_dataset(
+def _threaded(iterable: Iterable[Any], maxsize: int) -> Iterator[Any]:
+    """
+    Exécute `iterable` dans un thread ; les éléments passent par une file bornée.
+    Les exceptions du thread sont relancées chez le consommateur ; si le
+    consommateur s'arrête en route, le thread est arrêté proprement.
+    """
+    items: "queue.Queue[tuple]" = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item: tuple) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            put((_DONE, e))
+            return
+        put((_DONE, None))
+
+    thread = threading.Thread(target=produce, name="import-parse", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+class NameResolver:
+    """
+    Résout les noms de source / zone en ids (get_or_create_*), avec un cache
+    par import : une requête par nom distinct au lieu d'une par ligne.
+    À recréer après un rollback (les ids créés dans la transaction sont perdus).
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.sources: Dict[str, int] = {}
+        self.zones: Dict[str, int] = {}
+        # Zones dont la position est connue (inutile de la renseigner à nouveau)
+        self.located: set = set()
+
+    def source_id(self, name: str, description: str = "") -> int:
+        source_id = self.sources.get(name)
+        if source_id is None:
+            source = get_or_create_source(self.db, name=name, description=description)
+            source_id = self.sources[name] = source.id
+        return source_id
+
+    def zone_id(self, name: str, latitude: Optional[float] = None, longitude: Optional[float] = None) -> int:
+        zone_id = self.zones.get(name)
+        located = latitude is not None and longitude is not None
+        if zone_id is None or (located and name not in self.located):
+            zone = get_or_create_zone(self.db, name, latitude, longitude)
+            zone_id = self.zones[name] = zone.id
+            if zone.latitude is not None:
+                self.located.add(name)
+        return zone_id
+
+
+def write_batch(
+    spec: DatasetSpec,
+    db: Session,
+    parsed: List[tuple],
+    resolver: NameResolver,
+    profile=NO_PROFILE,
+    qc: Optional[quality.QualityControl] = None,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Étapes résolution + contrôle qualité + écriture d'un lot parsé (sans commit).
+    Retourne (lignes insérées, erreurs de résolution) ; les lignes mises en
+    quarantaine par `qc` ne sont pas comptées comme insérées.
+    """
+    errors: List[Dict[str, Any]] = []
+    rows = []
+    quarantined = []
+    check = qc.check if qc is not None and qc.enabled else None
+    with profile.stage("lookups", calls=len(parsed)):
+        for line, row, item in parsed:
+            try:
+                source_id = resolver.source_id(item["source"], spec.source_description(item["source"]))
+                zone_id = resolver.zone_id(item["zone"], item["latitude"], item["longitude"])
+            except Exception as e:
+                errors.append(_row_error(spec, line, e, row))
+                continue
+            flags = 0
+            if check is not None:
+                non_negative = spec.non_negative or quality.is_concentration(item["unit"])
+                flags = check(zone_id, item["type"], item["value"], item["missing_value"], non_negative)
+            measure = {
+                "source_id": source_id,
+                "zone_id": zone_id,
+                "type": item["type"],
+                "value": item["value"],
+                "unit": item["unit"],
+                "timestamp": item["timestamp"],
+                "extra_metadata": item["extra_metadata"],
+                "quality_flag": flags,
+            }
+            if flags and qc.quarantine:
+                quarantined.append({**measure, "dataset": spec.name, "line": line})
+            else:
+                rows.append(measure)
+    with profile.stage("add", calls=len(rows) + len(quarantined)):
+        crud.insert_indicator_rows(db, rows)
+        crud.insert_quarantine_rows(db, quarantined)
+    return len(rows), errors
+
+
+def run_import(
+    spec: DatasetSpec,
     db: Session,
     file_obj: IO[str],
+    profile: Optional[ImportProfile] = None,
+    parser: Optional[str] = None,
+    qc: Optional[quality.QualityControl] = None,
 ) -> Dict[str, Any]:
-    
-    # Attention : le fichier FR_E2 utilise souvent le point-virgule
-    reader = csv.DictReader(file_obj, delimiter=";")
-    
-    if reader.fieldnames:
-        reader.fieldnames = normalize_csv_headers(reader.fieldnames)
+    """
+    Importe un CSV au format `spec` et commite toutes les lignes valides
+    (parser : moteur de parsing, voir parse_batches ; qc : contrôle qualité,
+    par défaut selon ECOTRACK_IMPORT_QC, séries amorcées par leur historique en base).
 
-    required_cols = {
-        "Date de début", "Organisme", "Zas", 
-        "Polluant", "valeur", "unité de mesure"
-    }
-    missing = required_cols - set(reader.fieldnames or [])
-    if missing:
-        raise ValueError(f"Colonnes manquantes (FR_E2) : {missing}")
+    Retourne {"inserted": n, "flagged": n, "errors": [{"line": ..., "error": ...}, ...]}
+    (flagged : mesures signalées, insérées avec un quality_flag ou mises en quarantaine).
+    Lève ValueError si des colonnes obligatoires manquent ou si l'écriture échoue.
+    """
+    start = time.perf_counter()
+    profile = profile or NO_PROFILE
+    reader = open_reader(spec, file_obj)
 
     inserted = 0
     errors: List[Dict[str, Any]] = []
+    resolver = NameResolver(db)
+    qc = qc or quality.QualityControl(db=db)
 
-    for idx, row in enumerate(reader, start=2):
-        try:
-            ts = parse_timestamp(row.get("Date de début"))
-            
-            source_name = (row.get("Organisme") or "").strip()
-            zone_name = (row.get("Zas") or "").strip()
-            type_ = (row.get("Polluant") or "").strip()
-
-            if not source_name or not zone_name:
-                raise ValueError("Organisme ou Zas vide")
-            if not type_:
-                raise ValueError("Polluant vide")
-
-            # Utilisation de clean_float pour gérer la virgule française
-            value = clean_float(row.get("valeur"))
-            
-            unit = (row.get("unité de mesure") or "").strip() or "µg/m³"
-
-            # Métadonnées
-            nom_site = row.get("nom site", "")
-            type_implant = row.get("type d'implantation", "")
-            type_influence = row.get("type d'influence", "")
-            metadata = (
-                f"nom_site={nom_site}; type_implantation={type_implant}; "
-                f"type_influence={type_influence}"
-            )
-
-            source = get_or_create_source(
-                db,
-                name=source_name,
-                description=f"Mesures horaires {source_name}",
-            )
-            zone = get_or_create_zone(db, zone_name)
-
-            indicator = Indicator(
-                source_id=source.id,
-                zone_id=zone.id,
-                type=type_,
-                value=value,
-                unit=unit,
-                timestamp=ts,
-                extra_metadata=metadata,
-            )
-            db.add(indicator)
-            inserted += 1
-
-        except Exception as e:
-            errors.append({"line": idx, "error": str(e)})
-
+    batches = parse_batches(spec, reader, profile, parser)
+    if not profile.inline:
+        batches = _threaded(batches, PIPELINE_DEPTH)
     try:
-        db.commit()
+        for parsed, parse_errors in profile.rows(batches, stage="wait_parse"):
+            errors.extend(parse_errors)
+            written, write_errors = write_batch(spec, db, parsed, resolver, profile, qc)
+            inserted += written
+            errors.extend(write_errors)
+
+        # Commit final de toutes les lignes valides
+        with profile.stage("commit"):
+            db.commit()
     except SQLAlchemyError as e:
         db.rollback()
-        raise ValueError(f"Erreur DB (FR_E2) : {str(e)}")
+        raise ValueError(f"{spec.db_error_prefix} : {str(e)}")
+    except Exception:
+        # Fichier illisible en cours de route : rien n'est gardé
+        db.rollback()
+        raise
+    finally:
+        batches.close()
 
-    return {"inserted": inserted, "errors": errors}
+    errors.sort(key=lambda error: error["line"])
+    metrics.record_import(spec.name, inserted, len(errors), time.perf_counter() - start)
+    return {"inserted": inserted, "flagged": qc.flagged, "errors": errors}
 
-# --- IMPORT IND_ATMO ---
 
-def import_ind_atmo_dataset(
+# --- FORMATS ---
+
+def _fr_e2_metadata(row: Dict[str, Any]) -> str:
+    nom_site = row.get("nom site", "")
+    type_implant = row.get("type d'implantation", "")
+    type_influence = row.get("type d'influence", "")
+    return (
+        f"nom_site={nom_site}; type_implantation={type_implant}; "
+        f"type_influence={type_influence}"
+    )
+
+
+IND_ATMO_CODES = ("code_no2", "code_o3", "code_pm10", "code_pm25", "code_so2")
+
+
+def _ind_atmo_metadata(row: Dict[str, Any]) -> str:
+    # On récupère les codes optionnels s'ils existent
+    codes = {
+        k: row.get(k, "")
+        for k in IND_ATMO_CODES
+        if row.get(k)
+    }
+    metadata_parts = [f"lib_qual={row.get('lib_qual', '')}"]
+    metadata_parts.extend([f"{k}={v}" for k, v in codes.items()])
+    return "; ".join(metadata_parts)
+
+
+GENERIC = DatasetSpec(
+    name="generic",
+    label="CSV Générique",
+    delimiter=",",
+    required_columns=frozenset({"source_name", "zone_name", "type", "value", "unit", "timestamp"}),
+    source_column="source_name",
+    zone_column="zone_name",
+    latitude_column="latitude",
+    longitude_column="longitude",
+    type_column="type",
+    value_column="value",
+    unit_column="unit",
+    timestamp_column="timestamp",
+    empty_checks=(
+        (("source_name",), "source_name vide"),
+        (("zone_name",), "zone_name vide"),
+        (("type",), "type vide"),
+    ),
+    metadata=lambda row: row.get("metadata", None),
+    metadata_columns=("metadata",),
+    keep_row_in_errors=True,
+    db_error_prefix="Erreur base de données lors du commit",
+)
+
+# Attention : le fichier FR_E2 utilise souvent le point-virgule
+FR_E2 = DatasetSpec(
+    name="fr_e2",
+    label="FR_E2",
+    delimiter=";",
+    required_columns=frozenset({
+        "Date de début", "Organisme", "Zas",
+        "Polluant", "valeur", "unité de mesure",
+    }),
+    source_column="Organisme",
+    zone_column="Zas",
+    type_column="Polluant",
+    value_column="valeur",  # virgule décimale française gérée par clean_float
+    unit_column="unité de mesure",
+    default_unit="µg/m³",
+    timestamp_column="Date de début",
+    empty_checks=(
+        (("Organisme", "Zas"), "Organisme ou Zas vide"),
+        (("Polluant",), "Polluant vide"),
+    ),
+    metadata=_fr_e2_metadata,
+    metadata_columns=("nom site", "type d'implantation", "type d'influence"),
+    source_description=lambda name: f"Mesures horaires {name}",
+    non_negative=True,
+    db_error_prefix="Erreur DB (FR_E2)",
+)
+
+IND_ATMO = DatasetSpec(
+    name="ind_atmo",
+    label="ind_atmo",
+    delimiter=",",
+    required_columns=frozenset({"lib_zone", "source", "date_ech", "code_qual", "lib_qual"}),
+    source_column="source",
+    zone_column="lib_zone",
+    latitude_column="y_wgs84",
+    longitude_column="x_wgs84",
+    fixed_type="atmo_index",
+    value_column="code_qual",
+    default_unit="index",
+    timestamp_column="date_ech",
+    empty_checks=((("lib_zone", "source"), "Zone ou Source vide"),),
+    metadata=_ind_atmo_metadata,
+    metadata_columns=("lib_qual", *IND_ATMO_CODES),
+    source_description=lambda name: "Indice ATMO par commune",
+    non_negative=True,
+    db_error_prefix="Erreur DB (Ind Atmo)",
+)
+
+# Formats reconnus automatiquement, du plus spécifique au plus général
+DATASETS: Dict[str, DatasetSpec] = {spec.name: spec for spec in (FR_E2, IND_ATMO, GENERIC)}
+
+
+def detect_dataset(header_line: str) -> Optional[DatasetSpec]:
+    """
+    Reconnaît le format d'un CSV à sa ligne d'en-tête (séparateur et colonnes obligatoires).
+    """
+    for spec in DATASETS.values():
+        columns = next(csv.reader([header_line], delimiter=spec.delimiter), [])
+        if spec.required_columns <= set(normalize_csv_headers(columns)):
+            return spec
+    return None
+
+
+# --- IMPORT GENERIC ---
+
+def import_indicators_from_csv(
     db: Session,
     file_obj: IO[str],
+    profile: Optional[ImportProfile] = None,
 ) -> Dict[str, Any]:
-    
-    # Fichier souvent en virgule
-    reader = csv.DictReader(file_obj, delimiter=",")
-    
-    if reader.fieldnames:
-        reader.fieldnames = normalize_csv_headers(reader.fieldnames)
-
-    required_cols = {"lib_zone", "source", "date_ech", "code_qual", "lib_qual"}
-    missing = required_cols - set(reader.fieldnames or [])
-    if missing:
-        raise ValueError(f"Colonnes manquantes (ind_atmo) : {missing}")
-
-    inserted = 0
-    errors: List[Dict[str, Any]] = []
+    return run_import(GENERIC, db, file_obj, profile)
 
-    for idx, row in enumerate(reader, start=2):
-        try:
-            zone_name = (row.get("lib_zone") or "").strip()
-            source_name = (row.get("source") or "").strip()
-            date_ech_raw = (row.get("date_ech") or "").strip()
-
-            if not zone_name or not source_name:
-                raise ValueError("Zone ou Source vide")
-            
-            ts_date = parse_timestamp(date_ech_raw)
-            
-            # Type fixe pour ce dataset
-            type_ = "atmo_index"
-            
-            value = clean_float(row.get("code_qual"))
-            unit = "index"
-
-            # Métadonnées dynamiques
-            lib_qual = row.get("lib_qual", "")
-            # On récupère les codes optionnels s'ils existent
-            codes = {
-                k: row.get(k, "") 
-                for k in ["code_no2", "code_o3", "code_pm10", "code_pm25", "code_so2"]
-                if row.get(k)
-            }
-            
-            metadata_parts = [f"lib_qual={lib_qual}"]
-            metadata_parts.extend([f"{k}={v}" for k, v in codes.items()])
-            metadata = "; ".join(metadata_parts)
-
-            source = get_or_create_source(
-                db,
-                name=source_name,
-                description="Indice ATMO par commune",
-            )
-            zone = get_or_create_zone(db, zone_name)
-
-            indicator = Indicator(
-                source_id=source.id,
-                zone_id=zone.id,
-                type=type_,
-                value=value,
-                unit=unit,
-                timestamp=ts_date,
-                extra_metadata=metadata,
-            )
-            db.add(indicator)
-            inserted += 1
+# --- IMPORT FR_E2 ---
 
-        except Exception as e:
-            errors.append({"line": idx, "error": str(e)})
+def import_fr_e2_dataset(
+    db: Session,
+    file_obj: IO[str],
+    profile: Optional[ImportProfile] = None,
+) -> Dict[str, Any]:
+    return run_import(FR_E2, db, file_obj, profile)
 
-    try:
-        db.commit()
-    except SQLAlchemyError as e:
-        db.rollback()
-        raise ValueError(f"Erreur DB (Ind Atmo) : {str(e)}")
+# --- IMPORT IND_ATMO ---
 
-    return {"inserted": inserted, "errors": errors}
\ No newline at end of file
+def import_ind_atmo_dataset(
+    db: Session,
+    file_obj: IO[str],
+    profile: Optional[ImportProfile] = None,
+) -> Dict[str, Any]:
+    return run_import(IND_ATMO, db, file_obj, profile)
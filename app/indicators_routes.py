@@ -1,18 +1,34 @@
-from datetime import datetime,date
+import asyncio
+import json
 from typing import List, Optional
-from io import StringIO
-from fastapi import APIRouter, Depends, HTTPException, status,UploadFile,File
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status,UploadFile,File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
-from .database import get_db
-from . import schemas, crud
+from .database import SessionLocal, get_db
+from . import schemas, crud, geo, ingest_buffer, pubsub, cache, locks
 from .auth import get_current_user  # pour protéger les routes
 from .models import User
-from .importer import (
-    import_indicators_from_csv,
-    import_fr_e2_dataset,
-    import_ind_atmo_dataset,
-)
+
+# Les modules lourds (NumPy, importeurs CSV) sont importés dans les routes qui
+# s'en servent, pour garder un démarrage rapide des workers.
+
+
+# Taille des lots validés / insérés ensemble par /indicators/bulk
+BULK_CHUNK_SIZE = 5000
+# Intervalle des commentaires keep-alive du flux SSE (secondes)
+STREAM_KEEPALIVE_SECONDS = 15
+# Nombre max de résultats de GET /api/zones/search
+ZONE_SEARCH_MAX_RESULTS = 50
+# Nombre de points par défaut / maximal de GET /api/indicators/series (LTTB)
+SERIES_DEFAULT_POINTS = 1000
+SERIES_MAX_POINTS = 10000
+# Nombre max de jeux de filtres par POST /api/indicators/stats/batch
+STATS_BATCH_MAX_QUERIES = 500
+# Requêtes SQL lancées en parallèle par un même batch (une session chacune)
+STATS_BATCH_CONCURRENCY = 4
 
 
 router = APIRouter(
@@ -21,21 +37,85 @@ router = APIRouter(
 )
 
 
+def check_engine(engine: str) -> None:
+    if engine not in ("sql", "columnar"):
+        raise HTTPException(status_code=400, detail="engine doit valoir 'sql' ou 'columnar'")
+
+
+def not_modified(request: Request, response: Response, key: str) -> Optional[Response]:
+    """
+    Requêtes conditionnelles : pose l'ETag (version des données `key` + paramètres)
+    et renvoie une réponse 304 si le client a déjà cette version (If-None-Match).
+    """
+    etag = cache.etag(key, request.url.path, str(request.query_params))
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip() for tag in if_none_match.split(",")}
+        if "*" in candidates or etag in candidates or etag[2:] in candidates:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
+
+
 @router.post("/zones", response_model=schemas.ZoneRead, status_code=status.HTTP_201_CREATED)
 def create_zone(
     zone_in: schemas.ZoneCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),  # besoin d'être connecté
 ):
+    # Même nom à la casse / aux espaces près : index unique sur le nom normalisé
+    if crud.get_zone_by_name(db, zone_in.name):
+        raise HTTPException(status_code=400, detail="Zone already exists")
     return crud.create_zone(db, zone_in)
 
 
+@router.get("/zones/search", response_model=List[schemas.ZoneRead])
+def search_zones(
+    request: Request,
+    response: Response,
+    q: str,
+    limit: int = 10,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    GET /api/zones/search?q=saint eti
+
+    Recherche par nom (index plein texte FTS5) : préfixes de mots, sans
+    accents ni casse ; les `limit` meilleurs résultats.
+    """
+    if not 1 <= limit <= ZONE_SEARCH_MAX_RESULTS:
+        raise HTTPException(status_code=400, detail=f"limit doit être compris entre 1 et {ZONE_SEARCH_MAX_RESULTS}")
+    cached = not_modified(request, response, cache.ZONES)
+    if cached:
+        return cached
+    return crud.search_zones(db, q, limit)
+
+
 @router.get("/zones", response_model=List[schemas.ZoneRead])
 def list_zones(
+    request: Request,
+    response: Response,
+    bbox: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    return crud.list_zones(db)
+    """
+    GET /api/zones
+
+    - bbox=ouest,sud,est,nord (degrés WGS84) : seulement les zones localisées
+      dans cette boîte, trouvées via l'index spatial R*Tree
+    """
+    try:
+        box = geo.parse_bbox(bbox) if bbox else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    cached = not_modified(request, response, cache.ZONES)
+    if cached:
+        return cached
+    return crud.list_zones(db, bbox=box)
 
 
 # ---------- SOURCES ---------- #
@@ -46,14 +126,21 @@ def create_source(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    if crud.get_source_by_name(db, source_in.name):
+        raise HTTPException(status_code=400, detail="Source already exists")
     return crud.create_source(db, source_in)
 
 
 @router.get("/sources", response_model=List[schemas.SourceRead])
 def list_sources(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    cached = not_modified(request, response, cache.SOURCES)
+    if cached:
+        return cached
     return crud.list_sources(db)
 
 
@@ -71,21 +158,141 @@ def create_indicator(
     if not crud.get_source(db, indicator_in.source_id):
         raise HTTPException(status_code=400, detail="Source not found")
 
+    # Mode write-behind : la mesure est journalisée puis insérée par lot
+    if ingest_buffer.buffer is not None:
+        try:
+            seq = ingest_buffer.buffer.submit(indicator_in)
+        except ingest_buffer.BufferFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="File d'ingestion pleine, réessayez plus tard.",
+                headers={"Retry-After": "1"},
+            )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"status": "accepted", "seq": seq},
+        )
+
     return crud.create_indicator(db, indicator_in)
 
 
+async def _iter_bulk_payloads(request: Request):
+    """
+    Produit (index, objet JSON ou exception) pour un tableau JSON
+    ou un flux NDJSON (une mesure par ligne, lu au fil de l'eau).
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        index = 0
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    try:
+                        yield index, json.loads(line)
+                    except ValueError as e:
+                        yield index, e
+                    index += 1
+        if buffer.strip():
+            try:
+                yield index, json.loads(buffer)
+            except ValueError as e:
+                yield index, e
+        return
+
+    try:
+        payload = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="JSON invalide")
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=400, detail="Un tableau JSON d'indicateurs est attendu")
+    for index, item in enumerate(payload):
+        yield index, item
+
+
+@router.post("/indicators/bulk", response_model=schemas.BulkInsertResult)
+async def bulk_create_indicators(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    POST /api/indicators/bulk
+
+    Insertion en masse : tableau JSON d'IndicatorCreate, ou flux NDJSON
+    (Content-Type: application/x-ndjson). Les zones / sources sont vérifiées
+    par lots, toutes les lignes valides sont insérées dans une seule transaction
+    et les erreurs sont renvoyées par élément (index dans le lot).
+    """
+    errors: List[dict] = []
+    valid: List[tuple] = []
+
+    async for index, item in _iter_bulk_payloads(request):
+        if isinstance(item, Exception):
+            errors.append({"index": index, "error": f"JSON invalide : {item}"})
+            continue
+        try:
+            valid.append((index, schemas.IndicatorCreate.model_validate(item)))
+        except ValidationError as e:
+            errors.append({"index": index, "error": "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+            )})
+
+    def insert_all() -> int:
+        # Transaction d'écriture courte : ouverte une fois tout le corps validé
+        inserted = 0
+        with locks.write_lock():
+            for start in range(0, len(valid), BULK_CHUNK_SIZE):
+                result = crud.bulk_create_indicators(db, valid[start:start + BULK_CHUNK_SIZE], commit=False)
+                inserted += result["inserted"]
+                errors.extend(result["errors"])
+            db.commit()
+        return inserted
+
+    inserted = await run_in_threadpool(insert_all)
+
+    errors.sort(key=lambda err: err["index"])
+    return {"inserted": inserted, "errors": errors}
+
+
 @router.get("/indicators", response_model=List[schemas.IndicatorRead])
 def list_indicators(
+    request: Request,
+    response: Response,
     type: Optional[str] = None,
     zone_id: Optional[int] = None,
     source_id: Optional[int] = None,
-    date_from: Optional[datetime] = None,
-    date_to: Optional[datetime] = None,
+    date_from: Optional[schemas.UtcDateTime] = None,
+    date_to: Optional[schemas.UtcDateTime] = None,
     skip: int = 0,
     limit: int = 100,
+    near: Optional[str] = None,
+    radius: float = 10.0,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    """
+    GET /api/indicators
+
+    - near=lat,lon & radius (km, 10 par défaut) : seulement les mesures des
+      zones situées à moins de `radius` km du point (index spatial R*Tree)
+    """
+    point = None
+    if near:
+        try:
+            point = geo.parse_point(near)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not 0 < radius <= geo.MAX_RADIUS_KM:
+            raise HTTPException(status_code=400, detail=f"radius doit être compris entre 0 et {geo.MAX_RADIUS_KM:g} km")
+
+    # Avec un filtre sur le type, seules les écritures de ce type changent l'ETag
+    # (sauf avec near= : le résultat dépend aussi de la position des zones)
+    cached = not_modified(request, response, cache.ALL if point else type or cache.ALL)
+    if cached:
+        return cached
     return crud.list_indicators(
         db=db,
         type=type,
@@ -95,14 +302,19 @@ def list_indicators(
         date_to=date_to,
         skip=skip,
         limit=limit,
+        near=(*point, radius) if point is not None else None,
     )
 @router.get("/indicators/stats", response_model=schemas.IndicatorStats)
 def get_indicator_stats(
+    request: Request,
+    response: Response,
     type: Optional[str] = None,
     zone_id: Optional[int] = None,
     source_id: Optional[int] = None,
-    date_from: Optional[datetime] = None,
-    date_to: Optional[datetime] = None,
+    date_from: Optional[schemas.UtcDateTime] = None,
+    date_to: Optional[schemas.UtcDateTime] = None,
+    exclude_flagged: bool = False,
+    engine: str = "sql",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -120,42 +332,387 @@ def get_indicator_stats(
     - zone_id
     - source_id
     - date_from, date_to (ISO 8601)
+    - exclude_flagged : sans les mesures signalées par le contrôle qualité des imports
+    - engine : "sql" (par défaut) ou "columnar" (miroir NumPy, pour les gros volumes)
     """
-    stats = crud.indicator_stats(
+    if engine == "columnar":
+        from . import analytics
+
+        stats_fn = analytics.indicator_stats
+    elif engine == "sql":
+        stats_fn = crud.indicator_stats
+    else:
+        raise HTTPException(status_code=400, detail="engine doit valoir 'sql' ou 'columnar'")
+
+    cached = not_modified(request, response, type or cache.ALL)
+    if cached:
+        return cached
+
+    stats = stats_fn(
         db=db,
         type=type,
         zone_id=zone_id,
         source_id=source_id,
         date_from=date_from,
         date_to=date_to,
+        exclude_flagged=exclude_flagged,
     )
     return stats
-@router.post("/indicators/import_csv")
-async def import_indicators_csv(
-    file: UploadFile = File(...),
+
+
+@router.post("/indicators/stats/batch", response_model=List[schemas.IndicatorStats])
+async def get_indicator_stats_batch(
+    payload: schemas.IndicatorStatsBatch,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    
-    if not file.filename.lower().endswith(".csv"):
+    """
+    POST /api/indicators/stats/batch
+    {"queries": [{"type": "NO2", "zone_id": 1}, {"type": "O3", "zone_id": 1}, ...]}
+
+    Plusieurs calculs de /api/indicators/stats en un seul aller-retour
+    (ex. une grille polluants x zones). Réponse : une entrée par requête, dans l'ordre.
+    - engine "sql" : les requêtes de même source / période sont calculées par
+      une seule requête GROUP BY type, zone_id ; les groupes distincts sont
+      lancés en parallèle (STATS_BATCH_CONCURRENCY sessions au plus)
+    - engine "columnar" : miroir NumPy, requêtes calculées en parallèle
+    """
+    queries = [q.model_dump() for q in payload.queries]
+    if not 1 <= len(queries) <= STATS_BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail=f"queries doit contenir entre 1 et {STATS_BATCH_MAX_QUERIES} éléments")
+
+    if payload.engine == "columnar":
+        from . import analytics, tiering
+
+        await run_in_threadpool(analytics.mirror.refresh, db)
+        partitions = await run_in_threadpool(tiering.cold_partitions, db)
+        return await asyncio.gather(*(run_in_threadpool(analytics.stats, partitions, **q) for q in queries))
+    if payload.engine != "sql":
+        raise HTTPException(status_code=400, detail="engine doit valoir 'sql' ou 'columnar'")
+
+    groups = crud.stats_batch_groups(queries)
+    if len(groups) == 1:
+        results = await run_in_threadpool(crud.grouped_indicator_stats, db, queries, groups[0])
+    else:
+        semaphore = asyncio.Semaphore(STATS_BATCH_CONCURRENCY)
+
+        def run_group(positions: List[int]):
+            group_db = SessionLocal()
+            try:
+                return crud.grouped_indicator_stats(group_db, queries, positions)
+            finally:
+                group_db.close()
+
+        async def limited(positions: List[int]):
+            async with semaphore:
+                return await run_in_threadpool(run_group, positions)
+
+        results = {}
+        for part in await asyncio.gather(*(limited(positions) for positions in groups)):
+            results.update(part)
+    return [results[i] for i in range(len(queries))]
+@router.get("/indicators/latest", response_model=List[schemas.LatestIndicatorRead])
+def latest_indicators(
+    request: Request,
+    response: Response,
+    type: Optional[str] = None,
+    zone_ids: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    GET /api/indicators/latest?type=NO2&zone_ids=1,2,3
+
+    Valeur actuelle : dernière mesure valide de chaque série (zone, type),
+    lue dans latest_indicators (tenue à jour à chaque insertion) sans
+    parcourir l'historique. Sans filtre : toutes les séries.
+    """
+    from . import timeseries
+
+    ids = None
+    if zone_ids is not None:
+        try:
+            ids = timeseries.parse_id_list(zone_ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    cached = not_modified(request, response, type or cache.ALL)
+    if cached:
+        return cached
+    return crud.list_latest(db, type=type, zone_ids=ids)
+
+
+@router.get("/indicators/stream")
+async def stream_indicators(
+    request: Request,
+    type: Optional[str] = None,
+    zone_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    GET /api/indicators/stream?type=NO2&zone_id=1
+
+    Flux Server-Sent Events : chaque nouvelle mesure commitée (POST, bulk,
+    imports) correspondant au filtre est envoyée sous forme d'un événement
+    `indicator` (JSON). Au-delà de pubsub.PENDING_MAX_MESSAGES mesures dans une
+    même transaction (gros import), les suivantes sont résumées par un événement
+    `summary` par (type, zone) : {"type", "zone_id", "count"}. Un abonné trop lent
+    perd les messages les plus anciens ; le nombre de messages perdus est
+    signalé par un événement `dropped`.
+    """
+    sub = pubsub.broker.subscribe(type=type, zone_id=zone_id)
+
+    async def events():
+        reported_dropped = 0
+        try:
+            yield ": abonné\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(sub.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if sub.dropped != reported_dropped:
+                    reported_dropped = sub.dropped
+                    yield f"event: dropped\ndata: {reported_dropped}\n\n"
+                if message.get("event") == "summary":
+                    yield f"event: summary\ndata: {json.dumps(message)}\n\n"
+                else:
+                    yield f"event: indicator\nid: {message['id']}\ndata: {json.dumps(message)}\n\n"
+        finally:
+            pubsub.broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/indicators/compare", response_model=schemas.IndicatorComparison)
+def compare_indicators(
+    type: str,
+    zone_ids: str,
+    bucket: str = "1d",
+    agg: str = "avg",
+    source_id: Optional[int] = None,
+    date_from: Optional[schemas.UtcDateTime] = None,
+    date_to: Optional[schemas.UtcDateTime] = None,
+    engine: str = "sql",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    GET /api/indicators/compare?type=NO2&zone_ids=1,2,3&bucket=1d
+
+    Compare plusieurs zones pour un même type d'indicateur :
+    les séries sont agrégées par tranche (bucket : 15m, 1h, 1d, 1w...)
+    et alignées sur un index temporel commun (None si pas de mesure).
+    agg : avg (par défaut), min ou max.
+    engine : "sql" (par défaut) ou "columnar" (miroir NumPy, comme /stats).
+    """
+    from . import timeseries
+
+    check_engine(engine)
+    if agg not in timeseries.AGGREGATES:
+        raise HTTPException(status_code=400, detail="agg doit valoir avg, min ou max")
+    try:
+        ids = timeseries.parse_id_list(zone_ids)
+        bucket_seconds = timeseries.parse_duration(bucket)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = timeseries.compare_series(
+        db=db,
+        type=type,
+        zone_ids=ids,
+        bucket_seconds=bucket_seconds,
+        agg=agg,
+        source_id=source_id,
+        date_from=date_from,
+        date_to=date_to,
+        engine=engine,
+    )
+    return {"type": type, "bucket": bucket, "agg": agg, **result}
+
+
+@router.get("/indicators/series", response_model=schemas.IndicatorSeries)
+def indicator_series(
+    request: Request,
+    response: Response,
+    type: str,
+    zone_id: Optional[int] = None,
+    source_id: Optional[int] = None,
+    date_from: Optional[schemas.UtcDateTime] = None,
+    date_to: Optional[schemas.UtcDateTime] = None,
+    max_points: int = SERIES_DEFAULT_POINTS,
+    engine: str = "sql",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    GET /api/indicators/series?type=NO2&zone_id=1&max_points=1000
+
+    Série brute d'un type (triée par date) pour les graphiques, réduite côté
+    serveur à `max_points` points au plus par LTTB (Largest-Triangle-Three-Buckets) :
+    la réponse garde une taille fixe quelle que soit la période, sans lisser les pics.
+    total_points donne le nombre de mesures avant réduction.
+    engine : "sql" (par défaut) ou "columnar" (miroir NumPy).
+    """
+    from . import timeseries
+
+    check_engine(engine)
+    if not 3 <= max_points <= SERIES_MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"max_points doit être compris entre 3 et {SERIES_MAX_POINTS}")
+
+    cached = not_modified(request, response, type)
+    if cached:
+        return cached
+
+    result = timeseries.downsample_series(
+        db=db,
+        type=type,
+        max_points=max_points,
+        zone_id=zone_id,
+        source_id=source_id,
+        date_from=date_from,
+        date_to=date_to,
+        engine=engine,
+    )
+    return {"type": type, "zone_id": zone_id, "max_points": max_points, **result}
+
+
+@router.get("/indicators/rolling", response_model=schemas.IndicatorRolling)
+def rolling_indicators(
+    type: str,
+    zone_id: int,
+    window: str = "8h",
+    agg: str = "mean",
+    threshold: Optional[float] = None,
+    source_id: Optional[int] = None,
+    date_from: Optional[schemas.UtcDateTime] = None,
+    date_to: Optional[schemas.UtcDateTime] = None,
+    daily: str = "max",
+    engine: str = "sql",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    GET /api/indicators/rolling?type=O3&zone_id=1&window=8h&agg=mean
+
+    Fenêtre glissante calculée côté serveur pour une série (type, zone),
+    hors mesures signalées par le contrôle qualité :
+    - points : valeur glissante (mean, max ou min) à chaque mesure ; avec
+      date_from, la fenêtre est préchauffée par les mesures précédentes
+    - daily_max : maximum journalier de la valeur glissante
+      (ex. max journalier de la moyenne 8h pour l'O3)
+    - daily=mean : ajoute daily_mean, moyenne par jour civil des mesures
+      (ex. moyenne journalière des PM10), sur laquelle porte alors le seuil
+    - exceedance_days : nombre de jours au-dessus de `threshold` si fourni
+    - engine : "sql" (par défaut) ou "columnar" (miroir NumPy)
+    """
+    from . import rolling, timeseries
+
+    check_engine(engine)
+    if agg not in rolling.AGGS:
+        raise HTTPException(status_code=400, detail="agg doit valoir mean, max ou min")
+    if daily not in ("max", "mean"):
+        raise HTTPException(status_code=400, detail="daily doit valoir max ou mean")
+    try:
+        window_seconds = timeseries.parse_duration(window)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    points = rolling.rolling_series(
+        db=db,
+        type=type,
+        zone_id=zone_id,
+        window_seconds=window_seconds,
+        agg=agg,
+        source_id=source_id,
+        date_from=date_from,
+        date_to=date_to,
+        engine=engine,
+    )
+    daily_max = rolling.daily_max(points)
+    daily_mean = None
+    if daily == "mean":
+        daily_mean = rolling.daily_mean(
+            db, type, zone_id, source_id=source_id, date_from=date_from, date_to=date_to, engine=engine,
+        )
+    daily_values = daily_mean if daily_mean is not None else daily_max
+    timestamps = timeseries.epoch_to_datetimes([ts for ts, _ in points])
+
+    return {
+        "type": type,
+        "zone_id": zone_id,
+        "window": window,
+        "agg": agg,
+        "points": [
+            {"timestamp": stamp, "value": value}
+            for stamp, (_, value) in zip(timestamps, points)
+        ],
+        "daily_max": daily_max,
+        "daily_mean": daily_mean,
+        "exceedance_days": rolling.exceedance_days(daily_values, threshold) if threshold is not None else None,
+    }
+
+
+def _check_upload_name(file: UploadFile) -> None:
+    from .import_files import SUPPORTED_SUFFIXES, is_supported
+
+    if not is_supported(file.filename or ""):
         raise HTTPException(
             status_code=400,
-            detail="Le fichier doit être un CSV.",
+            detail=f"Formats acceptés : {', '.join(SUPPORTED_SUFFIXES)}",
         )
 
-    content = (await file.read()).decode("utf-8").splitlines()
-    f = StringIO("\n".join(content))
+
+async def _import_upload(file: UploadFile, db: Session, import_name: str, profile: bool):
+    """
+    Lance la fonction d'import `import_name` de app.importer sur le fichier
+    envoyé (CSV, .csv.gz, .csv.zst ou zip de CSV), sous le verrou d'écriture.
+
+    Le fichier est décompressé et décodé en flux pendant l'import, sans copie
+    intermédiaire. Avec profile=True, le résultat contient en plus le temps
+    passé par étape (clé "profile", voir app.import_profile).
+    """
+    from . import importer
+    from .import_files import READ_ERRORS, import_file
+    from .import_profile import ImportProfile
+
+    import_fn = getattr(importer, import_name)
+    import_profile = ImportProfile() if profile else None
+
+    def run_import():
+        with locks.write_lock():
+            result = import_file(import_fn, db, file.file, file.filename, profile=import_profile)
+        if import_profile is not None:
+            result["profile"] = import_profile.report(result)
+        return result
 
     try:
-        result = import_indicators_from_csv(db, f)
-    except ValueError as e:
+        return await run_in_threadpool(run_import)
+    except (ValueError, *READ_ERRORS) as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    return result
+
+@router.post("/indicators/import_csv")
+async def import_indicators_csv(
+    file: UploadFile = File(...),
+    profile: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    
+    _check_upload_name(file)
+
+    return await _import_upload(file, db, "import_indicators_from_csv", profile)
 
 @router.post("/import/fr_e2")
 async def import_fr_e2(
     file: UploadFile = File(...),
+    profile: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -163,23 +720,18 @@ async def import_fr_e2(
     Import spécifique du fichier FR_E2_2025-01-01.csv (ATMO GRAND EST).
 
     Le fichier doit être en séparateur ';' et contenir les colonnes
-    décrites dans import_fr_e2_dataset.
+    décrites dans import_fr_e2_dataset. Il peut être compressé
+    (.csv.gz, .csv.zst) ou être une archive .zip de plusieurs CSV.
+    profile=true : ajoute au résultat le temps passé par étape de l'import.
     """
-    if not file.filename.lower().endswith(".csv"):
-        raise HTTPException(status_code=400, detail="Le fichier doit être un CSV.")
+    _check_upload_name(file)
 
-    content = (await file.read()).decode("utf-8").splitlines()
-    f = StringIO("\n".join(content))
+    return await _import_upload(file, db, "import_fr_e2_dataset", profile)
 
-    try:
-        result = import_fr_e2_dataset(db, f)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-    return result
 @router.post("/import/ind_atmo")
 async def import_ind_atmo(
     file: UploadFile = File(...),
+    profile: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -187,19 +739,12 @@ async def import_ind_atmo(
     Import spécifique du fichier ind_atmo_2021.csv (indices ATMO par commune).
 
     Séparateur ',' ; colonnes : lib_zone, source, date_ech, code_qual, lib_qual...
+    Fichier compressé (.csv.gz, .csv.zst) ou archive .zip acceptés.
+    profile=true : ajoute au résultat le temps passé par étape de l'import.
     """
-    if not file.filename.lower().endswith(".csv"):
-        raise HTTPException(status_code=400, detail="Le fichier doit être un CSV.")
-
-    content = (await file.read()).decode("utf-8").splitlines()
-    f = StringIO("\n".join(content))
-
-    try:
-        result = import_ind_atmo_dataset(db, f)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    _check_upload_name(file)
 
-    return result
+    return await _import_upload(file, db, "import_ind_atmo_dataset", profile)
 
 @router.put("/indicators/{indicator_id}", response_model=schemas.IndicatorRead)
 def update_indicator(
@@ -0,0 +1,342 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from . import config, crud, locks, schemas
+from .models import IngestCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+class BufferFull(Exception):
+    """
+    La file d'ingestion est pleine : le client doit réessayer plus tard.
+    """
+
+
+class IngestBuffer:
+    """
+    Ingestion différée des mesures unitaires (write-behind) :
+
+    1. submit() ajoute la mesure au journal local (fsync groupé entre requêtes
+       concurrentes) et la met en file : la mesure est durable, on peut acquitter ;
+    2. un unique thread écrivain vide la file par lots (toutes les `flush_ms`
+       ou dès `batch_rows` lignes) et commite chaque lot en une transaction ;
+    3. le numéro de séquence atteint est noté dans la table `ingest_checkpoints`,
+       dans la transaction du lot : au démarrage, seules les entrées du journal
+       postérieures au checkpoint sont rejouées, sans risque de doublon si le
+       processus s'est arrêté juste après un commit.
+
+    Un lot refusé par la base pour une autre raison qu'une erreur d'accès
+    (base verrouillée, disque plein...) est recommité mesure par mesure : les
+    mesures fautives sont écartées au lieu de bloquer celles qui les suivent.
+
+    La mesure est acquittée (202) avant son insertion : une mesure refusée à
+    l'écriture (zone supprimée entre-temps, contrainte...) est ajoutée à
+    `<journal>.rejected` (une ligne JSON : seq, mesure, erreur) et comptée dans
+    `rejected`, exposé par /readyz.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        wal_path: Path = config.WRITE_BEHIND_WAL_PATH,
+        flush_ms: int = config.WRITE_BEHIND_FLUSH_MS,
+        batch_rows: int = config.WRITE_BEHIND_BATCH_ROWS,
+        queue_size: int = config.WRITE_BEHIND_QUEUE_SIZE,
+        enqueue_timeout: float = config.WRITE_BEHIND_ENQUEUE_TIMEOUT,
+        fsync: bool = config.WRITE_BEHIND_FSYNC,
+    ):
+        self.session_factory = session_factory
+        self.wal_path = Path(wal_path)
+        # Clé du journal dans ingest_checkpoints (nom seul : le répertoire peut
+        # être monté à des chemins différents selon les machines)
+        self.journal = self.wal_path.name
+        # Ancien checkpoint fichier, seulement relu (versions précédentes)
+        self.ckpt_path = self.wal_path.with_name(self.wal_path.name + ".ckpt")
+        self.rejected_path = self.wal_path.with_name(self.wal_path.name + ".rejected")
+        self.flush_interval = flush_ms / 1000
+        self.batch_rows = batch_rows
+        self.enqueue_timeout = enqueue_timeout
+        self.fsync = fsync
+
+        self._queue: "queue.Queue[Tuple[int, schemas.IndicatorCreate]]" = queue.Queue()
+        # Places disponibles dans la file (contre-pression)
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._wal_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._wal = None
+        self._seq = 0
+        self._synced_seq = 0
+        self._committed_seq = 0
+        self.rejected = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- cycle de vie ---
+
+    def start(self) -> None:
+        self._wal = self.wal_path.open("ab")
+        # Le verrou signale aux autres workers que ce journal est vivant
+        locks.try_lock_exclusive(self._wal)
+        self.recover()
+        self._thread = threading.Thread(target=self._run, name="ingest-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+
+    @property
+    def pending(self) -> int:
+        """
+        Nombre de mesures acquittées mais pas encore commitées en base.
+        """
+        return self._seq - self._committed_seq
+
+    # --- journal ---
+
+    def recover(self) -> None:
+        """
+        Rejoue les entrées du journal non encore commitées (arrêt brutal).
+        """
+        self._committed_seq = self._read_checkpoint()
+        self._seq = self._committed_seq
+        self._replay()
+
+    def _read_checkpoint(self) -> int:
+        db = self.session_factory()
+        try:
+            seq = db.query(IngestCheckpoint.seq).filter(IngestCheckpoint.journal == self.journal).scalar() or 0
+        finally:
+            db.close()
+        try:
+            legacy = int(self.ckpt_path.read_text().strip() or 0)
+        except (OSError, ValueError):
+            legacy = 0
+        return max(seq, legacy)
+
+    def _save_checkpoint(self, db: Session, seq: int) -> None:
+        """
+        Note la séquence atteinte dans la transaction en cours de `db` (sans commit).
+        """
+        stmt = sqlite_insert(IngestCheckpoint).values(journal=self.journal, seq=seq)
+        db.execute(stmt.on_conflict_do_update(index_elements=["journal"], set_={"seq": seq}))
+
+    def clear_checkpoint(self) -> None:
+        db = self.session_factory()
+        try:
+            db.query(IngestCheckpoint).filter(IngestCheckpoint.journal == self.journal).delete()
+            db.commit()
+        finally:
+            db.close()
+        self.ckpt_path.unlink(missing_ok=True)
+
+    def _replay(self) -> None:
+        if not self.wal_path.exists():
+            return
+        items: List[Tuple[int, schemas.IndicatorCreate]] = []
+        with self.wal_path.open("rb") as f:
+            for number, line in enumerate(f, start=1):
+                try:
+                    record = json.loads(line)
+                    seq = int(record["seq"])
+                    if seq <= self._committed_seq:
+                        continue
+                    items.append((seq, schemas.IndicatorCreate.model_validate(record["item"])))
+                except (ValueError, KeyError, TypeError) as e:
+                    # Ligne tronquée (arrêt brutal pendant l'écriture) ou mesure invalide :
+                    # on la met de côté sans empêcher le démarrage
+                    logger.warning("Ligne %s du journal %s ignorée : %s", number, self.wal_path, e)
+                    self._reject_line(line.decode("utf-8", errors="replace").rstrip("\n"), str(e))
+
+        if items:
+            logger.info("Rejeu de %s mesures depuis %s", len(items), self.wal_path)
+            for start in range(0, len(items), self.batch_rows):
+                self._commit_entries(items[start:start + self.batch_rows], retry=False)
+            self._seq = max(self._seq, items[-1][0])
+        self.wal_path.write_bytes(b"")
+
+    def _reject_line(self, line: str, error: str) -> None:
+        self.rejected += 1
+        with self.rejected_path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"line": line, "error": error}, ensure_ascii=False) + "\n")
+
+    def _reject_item(self, seq: int, item: schemas.IndicatorCreate, error: str) -> None:
+        logger.error("Mesure %s écartée dans %s : %s", seq, self.rejected_path, error)
+        self._reject_line(json.dumps({"seq": seq, "item": item.model_dump(mode="json")}), error)
+
+    def _sync(self, seq: int) -> None:
+        """
+        fsync groupé : le premier thread qui arrive synchronise pour tous
+        ceux qui ont écrit avant lui.
+        """
+        if not self.fsync or self._synced_seq >= seq:
+            return
+        with self._sync_lock:
+            if self._synced_seq >= seq:
+                return
+            with self._wal_lock:
+                target = self._seq
+                fd = self._wal.fileno()
+            os.fsync(fd)
+            self._synced_seq = target
+
+    def submit(self, item: schemas.IndicatorCreate) -> int:
+        """
+        Rend la mesure durable (journal) et la met en file ; retourne son numéro de séquence.
+        Lève BufferFull si la file reste pleine plus de `enqueue_timeout` secondes.
+        """
+        if not self._slots.acquire(timeout=self.enqueue_timeout):
+            raise BufferFull("File d'ingestion pleine")
+
+        line = item.model_dump_json()
+        with self._wal_lock:
+            self._seq += 1
+            seq = self._seq
+            self._wal.write(f'{{"seq": {seq}, "item": {line}}}\n'.encode("utf-8"))
+            self._wal.flush()
+            # Mise en file sous le verrou : la file reste ordonnée par séquence
+            self._queue.put((seq, item))
+
+        self._sync(seq)
+        return seq
+
+    # --- écrivain ---
+
+    def _commit_batch(self, batch: List[Tuple[int, schemas.IndicatorCreate]]) -> None:
+        db = self.session_factory()
+        try:
+            with locks.write_lock():
+                result = crud.bulk_create_indicators(db, batch, commit=False)
+                self._save_checkpoint(db, batch[-1][0])
+                db.commit()
+        finally:
+            db.close()
+        items = dict(batch)
+        for err in result["errors"]:
+            self._reject_item(err["index"], items[err["index"]], err["error"])
+        self._committed_seq = batch[-1][0]
+
+    def _commit_entries(self, batch: List[Tuple[int, schemas.IndicatorCreate]], retry: bool = True) -> bool:
+        """
+        Commite le lot ; retourne False si l'écrivain s'arrête avant d'y être parvenu
+        (les mesures restent alors dans le journal et seront rejouées).
+
+        Erreur d'accès à la base (OperationalError) : on réessaie le même lot
+        (la file se remplit et la contre-pression s'applique entre-temps), sauf
+        au rejeu (retry=False) où l'erreur remonte. Autre erreur : le lot est
+        recommité mesure par mesure et les mesures refusées sont écartées.
+        """
+        while True:
+            try:
+                self._commit_batch(batch)
+                return True
+            except OperationalError:
+                if not retry:
+                    raise
+                logger.exception("Échec du commit d'un lot de %s mesures", len(batch))
+                if self._stop.is_set():
+                    return False
+                time.sleep(1)
+            except Exception as e:
+                if len(batch) > 1:
+                    logger.warning("Lot de %s mesures refusé (%s) : commit mesure par mesure", len(batch), e)
+                    return all(self._commit_entries([entry], retry) for entry in batch)
+                seq, item = batch[0]
+                self._reject_item(seq, item, str(e))
+                db = self.session_factory()
+                try:
+                    self._save_checkpoint(db, seq)
+                    db.commit()
+                finally:
+                    db.close()
+                self._committed_seq = seq
+                return True
+
+    def _take_batch(self) -> List[Tuple[int, schemas.IndicatorCreate]]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._take_batch()
+            if not batch:
+                continue
+            if not self._commit_entries(batch):
+                return
+            for _ in batch:
+                self._slots.release()
+
+            # Tout est en base : on repart d'un journal vide
+            with self._wal_lock:
+                if self._queue.empty() and self._committed_seq == self._seq:
+                    self._wal.truncate(0)
+
+
+buffer: Optional[IngestBuffer] = None
+
+
+def adopt_orphan_journals(session_factory: Callable[[], Session], base_path: Path) -> None:
+    """
+    Multi-workers : rejoue les journaux laissés par des workers arrêtés
+    (journal dont personne ne tient le verrou), puis les supprime.
+    """
+    own = buffer.wal_path if buffer is not None else None
+    for path in base_path.parent.glob(f"{base_path.stem}-*{base_path.suffix}"):
+        if path == own:
+            continue
+        with path.open("ab") as f:
+            if not locks.try_lock_exclusive(f):
+                continue
+            logger.info("Reprise du journal orphelin %s", path)
+            orphan = IngestBuffer(session_factory, wal_path=path)
+            orphan.recover()
+            path.unlink(missing_ok=True)
+            orphan.clear_checkpoint()
+
+
+def start_buffer(session_factory: Callable[[], Session]) -> IngestBuffer:
+    global buffer
+    wal_path = config.WRITE_BEHIND_WAL_PATH
+    if config.MULTI_WORKER:
+        # Un journal par worker
+        wal_path = locks.pid_suffixed(wal_path)
+    buffer = IngestBuffer(session_factory, wal_path=wal_path)
+    buffer.start()
+    if config.MULTI_WORKER:
+        adopt_orphan_journals(session_factory, config.WRITE_BEHIND_WAL_PATH)
+    return buffer
+
+
+def stop_buffer() -> None:
+    global buffer
+    if buffer is not None:
+        buffer.stop()
+        buffer = None
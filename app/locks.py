@@ -0,0 +1,61 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import IO, Optional
+
+from . import config
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou inter-processus
+    fcntl = None
+
+_thread_lock = threading.Lock()
+_lock_file: Optional[IO] = None
+
+
+def _get_lock_file() -> IO:
+    global _lock_file
+    if _lock_file is None:
+        _lock_file = open(config.WRITE_LOCK_PATH, "a+")
+    return _lock_file
+
+
+@contextmanager
+def write_lock():
+    """
+    Sérialise les écritures en masse (imports, bulk, lots write-behind, rétention) :
+    entre threads du processus, et entre processus en mode multi-workers
+    (verrou flock sur ECOTRACK_WRITE_LOCK_PATH).
+    """
+    with _thread_lock:
+        if not config.MULTI_WORKER or fcntl is None:
+            yield
+            return
+        lock_file = _get_lock_file()
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def try_lock_exclusive(f: IO) -> bool:
+    """
+    Verrou exclusif non bloquant sur un fichier ouvert (False si déjà pris par un autre processus).
+    """
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def pid_suffixed(path, pid: Optional[int] = None):
+    """
+    ecotrack-ingest.wal -> ecotrack-ingest-<pid>.wal
+    """
+    pid = os.getpid() if pid is None else pid
+    return path.with_name(f"{path.stem}-{pid}{path.suffix}")
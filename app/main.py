@@ -1,20 +1,102 @@
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
 
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
 
-
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
-
-from .database import engine
+from . import config, ingest_buffer, locks, metrics, slow_queries
+from .database import SessionLocal, engine
 from .models import Base
 from .auth import router as auth_router
 from .indicators_routes import router as indicators_router
-Base.metadata.create_all(bind=engine)
-from pathlib import Path
-app = FastAPI(title="EcoTrack API")
+from .admin_routes import router as admin_router
+
 BASE_DIR = Path(__file__).resolve().parent
 INDEX_FILE = BASE_DIR / "index.html"
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Démarrage / arrêt de l'application (rien de coûteux n'est fait à l'import).
+    """
+    # Pour voir les logs applicatifs (imports, rétention...) dans la console
+    logging.basicConfig(level=logging.INFO)
+
+    if config.CREATE_SCHEMA:
+        # Sous verrou : plusieurs workers démarrent en même temps
+        with locks.write_lock():
+            Base.metadata.create_all(bind=engine)
+    if config.WRITE_BEHIND_ENABLED:
+        ingest_buffer.start_buffer(SessionLocal)
+
+    yield
+
+    # Vide la file d'ingestion avant de s'arrêter
+    ingest_buffer.stop_buffer()
+
+
+app = FastAPI(title="EcoTrack API", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """
+    Mesure la durée et le nombre de requêtes SQL de chaque requête HTTP.
+    """
+    stats = metrics.RequestStats(path=request.url.path)
+    token = metrics.current_request.set(stats)
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.current_request.reset(token)
+        # Gabarit de la route (/api/indicators/{indicator_id}) plutôt que l'URL réelle
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.http_request_duration.observe(elapsed, request.method, route, str(status_code))
+        metrics.http_request_sql_statements.observe(stats.queries, route)
+
+    if config.DEBUG:
+        response.headers["X-Query-Count"] = str(stats.queries)
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.queries} queries", '
+            f"total;dur={elapsed * 1000:.1f}"
+        )
+    return response
+
+
+def _json_safe(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_json_safe(item) for item in value]
+    return value
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_error_handler(request: Request, exc: RequestValidationError):
+    """
+    422 comme par défaut, mais un NaN / Infinity reçu (JSON non standard) est
+    renvoyé en texte dans le détail : JSONResponse refuse de l'encoder (sinon 500).
+    """
+    return JSONResponse(
+        status_code=422,
+        content={"detail": _json_safe(jsonable_encoder(exc.errors()))},
+    )
+
+
 @app.get("/", response_class=HTMLResponse)
 def serve_index():
     """
@@ -29,6 +111,54 @@ def serve_index():
     return INDEX_FILE.read_text(encoding="utf-8")
 
 
+@app.get("/metrics", response_class=PlainTextResponse, tags=["health"])
+def prometheus_metrics():
+    """
+    Métriques au format Prometheus (propres à ce processus).
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/healthz", tags=["health"])
+def healthz():
+    """
+    Liveness : le processus répond.
+    """
+    return {"status": "ok"}
+
+
+@app.get("/readyz", tags=["health"])
+def readyz():
+    """
+    Readiness : la base répond, le schéma est en place et l'ingestion
+    différée n'a pas trop de retard. 503 sinon (le worker est retiré du pool).
+    """
+    checks = {}
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            checks["database"] = "ok"
+            checks["schema"] = "ok" if inspect(conn).has_table("indicators") else "missing"
+    except SQLAlchemyError as e:
+        checks["database"] = f"error: {e.__class__.__name__}"
+
+    buffer = ingest_buffer.buffer
+    if buffer is not None:
+        checks["ingest_pending"] = buffer.pending
+        # Mesures acquittées (202) puis refusées à l'écriture, voir <journal>.rejected
+        checks["ingest_rejected"] = buffer.rejected
+    ready = (
+        checks.get("database") == "ok"
+        and checks.get("schema") == "ok"
+        and (buffer is None or buffer.pending <= config.READY_MAX_PENDING)
+    )
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "checks": checks},
+    )
+
+
 # Inclusion des routes API
 app.include_router(auth_router)
 app.include_router(indicators_router)
+app.include_router(admin_router)
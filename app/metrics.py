@@ -0,0 +1,202 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from .database import engine
+
+LabelValues = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [compteurs par bucket..., +Inf], somme
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(labels, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip((*self.buckets, "+Inf"), counts):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total[0]}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+# --- métriques exposées ---
+
+http_request_duration = Histogram(
+    "ecotrack_http_request_duration_seconds",
+    "Durée des requêtes HTTP par route.",
+    labels=("method", "route", "status"),
+)
+http_request_sql_statements = Histogram(
+    "ecotrack_http_request_sql_statements",
+    "Nombre de requêtes SQL exécutées par requête HTTP.",
+    labels=("route",),
+    buckets=COUNT_BUCKETS,
+)
+sql_statement_duration = Histogram(
+    "ecotrack_sql_statement_duration_seconds",
+    "Durée des requêtes SQL par type d'instruction.",
+    labels=("statement",),
+    buckets=SQL_BUCKETS,
+)
+import_rows = Counter(
+    "ecotrack_import_rows_total",
+    "Lignes insérées par les imports CSV.",
+    labels=("dataset",),
+)
+import_errors = Counter(
+    "ecotrack_import_errors_total",
+    "Lignes rejetées par les imports CSV.",
+    labels=("dataset",),
+)
+import_seconds = Counter(
+    "ecotrack_import_seconds_total",
+    "Temps passé dans les imports CSV.",
+    labels=("dataset",),
+)
+import_rows_per_second = Gauge(
+    "ecotrack_import_rows_per_second",
+    "Débit du dernier import CSV.",
+    labels=("dataset",),
+)
+
+REGISTRY = [
+    http_request_duration,
+    http_request_sql_statements,
+    sql_statement_duration,
+    import_rows,
+    import_errors,
+    import_seconds,
+    import_rows_per_second,
+]
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def record_import(dataset: str, inserted: int, errors: int, seconds: float) -> None:
+    import_rows.inc(inserted, dataset)
+    import_errors.inc(errors, dataset)
+    import_seconds.inc(seconds, dataset)
+    if seconds > 0:
+        import_rows_per_second.set(inserted / seconds, dataset)
+
+
+# --- compteurs SQL par requête HTTP ---
+
+@dataclass
+class RequestStats:
+    path: str = ""
+    queries: int = 0
+    sql_seconds: float = 0.0
+
+
+# Objet mutable partagé avec le threadpool (le contexte y est copié)
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+# Fonctions appelées après chaque requête SQL avec sa durée en secondes
+# (ex. journal des requêtes lentes) : une seule mesure du temps pour tous
+_statement_hooks: List[Callable[..., None]] = []
+
+
+def add_statement_hook(hook: Callable[..., None]) -> None:
+    """
+    hook(cursor, statement, parameters, executemany, elapsed) après chaque requête SQL.
+    """
+    _statement_hooks.append(hook)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Départ rangé dans le contexte de l'exécution : une requête en erreur
+    # (pas d'after_cursor_execute) ne laisse rien sur la connexion
+    if context is not None:
+        context._query_start = time.perf_counter()
+    else:
+        conn.info["query_start"] = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = context._query_start if context is not None else conn.info.pop("query_start")
+    elapsed = time.perf_counter() - start
+    kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    sql_statement_duration.observe(elapsed, kind)
+
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.sql_seconds += elapsed
+
+    for hook in _statement_hooks:
+        hook(cursor, statement, parameters, executemany, elapsed)
@@ -1,18 +1,38 @@
+import re
+import unicodedata
+from datetime import datetime
+
 from sqlalchemy import (
+    DDL,
     Column,
     Integer,
     String,
     Float,
     Boolean,
+    Date,
     DateTime,
     ForeignKey,
+    Index,
+    MetaData,
+    Table,
     Text,
+    UniqueConstraint,
+    event,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 
 from .database import Base
 
 
+def normalize_name(name: str) -> str:
+    """
+    Forme normalisée d'un nom de zone / source, clé des recherches exactes
+    (get_or_create_*) : Unicode NFKC, espaces superflus retirés, casse ignorée.
+    Les accents sont conservés ; la recherche approchée passe par zone_search.
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", name)).strip().casefold()
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -30,23 +50,130 @@ class Zone(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
+    # Renseigné automatiquement à partir de `name` (index unique)
+    normalized_name = Column(String, nullable=True, unique=True, index=True)
     postal_code = Column(String, nullable=True)
+    # Position de la zone (WGS84, degrés), indexée dans zone_rtree
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     indicators = relationship("Indicator", back_populates="zone")
 
+    @validates("name")
+    def _set_normalized_name(self, key, name):
+        self.normalized_name = normalize_name(name) if name is not None else None
+        return name
+
+
+# Index spatial des zones : table virtuelle R*Tree de SQLite (une boîte réduite
+# à un point par zone localisée), tenue à jour par des triggers sur `zones`.
+# Déclarée hors de Base.metadata : create_all ne sait pas créer une table
+# virtuelle, elle est créée avec la table `zones` (voir app/geo.py pour les requêtes).
+zone_rtree = Table(
+    "zone_rtree",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("min_lat", Float),
+    Column("max_lat", Float),
+    Column("min_lon", Float),
+    Column("max_lon", Float),
+)
+
+ZONE_RTREE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS zone_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+    """
+    CREATE TRIGGER IF NOT EXISTS zones_rtree_insert AFTER INSERT ON zones
+    WHEN NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL
+    BEGIN
+        INSERT INTO zone_rtree VALUES (NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS zones_rtree_update AFTER UPDATE OF latitude, longitude ON zones
+    BEGIN
+        DELETE FROM zone_rtree WHERE id = OLD.id;
+        INSERT INTO zone_rtree
+        SELECT NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude
+        WHERE NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS zones_rtree_delete AFTER DELETE ON zones
+    BEGIN
+        DELETE FROM zone_rtree WHERE id = OLD.id;
+    END
+    """,
+)
+
+# Recherche plein texte des noms de zones (GET /api/zones/search) : table FTS5
+# à contenu externe (les noms restent dans `zones`), sans accents ni casse,
+# avec index de préfixes de 2 et 3 caractères pour la saisie au fil de l'eau.
+zone_search = Table(
+    "zone_search",
+    MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("name", String),
+    Column("rank", Float),
+)
+
+ZONE_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS zone_search USING fts5(
+        name, content='zones', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS zones_search_insert AFTER INSERT ON zones
+    BEGIN
+        INSERT INTO zone_search(rowid, name) VALUES (NEW.id, NEW.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS zones_search_update AFTER UPDATE OF name ON zones
+    BEGIN
+        INSERT INTO zone_search(zone_search, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+        INSERT INTO zone_search(rowid, name) VALUES (NEW.id, NEW.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS zones_search_delete AFTER DELETE ON zones
+    BEGIN
+        INSERT INTO zone_search(zone_search, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+    END
+    """,
+)
+
+for _statement in ZONE_RTREE_DDL + ZONE_SEARCH_DDL:
+    event.listen(Zone.__table__, "after_create", DDL(_statement))
+
 
 class Source(Base):
     __tablename__ = "sources"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
+    # Renseigné automatiquement à partir de `name` (index unique)
+    normalized_name = Column(String, nullable=True, unique=True, index=True)
     description = Column(Text, nullable=True)
     url = Column(String, nullable=True)
 
     indicators = relationship("Indicator", back_populates="source")
 
+    @validates("name")
+    def _set_normalized_name(self, key, name):
+        self.normalized_name = normalize_name(name) if name is not None else None
+        return name
+
 
 class Indicator(Base):
     __tablename__ = "indicators"
+    __table_args__ = (
+        # Stats hors mesures signalées : WHERE type = ? AND quality_flag = 0
+        Index("ix_indicators_type_quality_flag", "type", "quality_flag"),
+        # AUTOINCREMENT : un id n'est jamais réattribué, même après suppression
+        # des plus grands (mesures archivées dans le stockage froid, purge)
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     source_id = Column(Integer, ForeignKey("sources.id"), nullable=False)
@@ -56,5 +183,132 @@ class Indicator(Base):
     unit = Column(String, nullable=False)
     timestamp = Column(DateTime, nullable=False, index=True)
     extra_metadata = Column("metadata", Text, nullable=True)
+    # Contrôle qualité à l'import (bits de app/quality.py, 0 = valide)
+    quality_flag = Column(Integer, nullable=False, default=0, server_default="0")
     source = relationship("Source", back_populates="indicators")
     zone = relationship("Zone", back_populates="indicators")
+
+
+class LatestIndicator(Base):
+    """
+    Dernière mesure valide (quality_flag = 0) de chaque série (zone, type),
+    tenue à jour à chaque insertion : la "valeur actuelle" se lit par clé,
+    sans parcourir `indicators`. Une mesure arrivée en retard (date plus
+    ancienne que celle déjà connue) ne la remplace pas.
+    """
+    __tablename__ = "latest_indicators"
+
+    zone_id = Column(Integer, ForeignKey("zones.id"), primary_key=True)
+    type = Column(String, primary_key=True, index=True)
+    indicator_id = Column(Integer, nullable=False)
+    source_id = Column(Integer, ForeignKey("sources.id"), nullable=False)
+    value = Column(Float, nullable=False)
+    unit = Column(String, nullable=False)
+    timestamp = Column(DateTime, nullable=False)
+
+
+class QuarantinedIndicator(Base):
+    """
+    Mesures écartées par le contrôle qualité d'un import (ECOTRACK_IMPORT_QC=quarantine),
+    avec la raison (quality_flag) et leur origine (format, ligne du fichier).
+    """
+    __tablename__ = "indicator_quarantine"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_id = Column(Integer, ForeignKey("sources.id"), nullable=False)
+    zone_id = Column(Integer, ForeignKey("zones.id"), nullable=False)
+    type = Column(String, nullable=False)
+    value = Column(Float, nullable=False)
+    unit = Column(String, nullable=False)
+    timestamp = Column(DateTime, nullable=False)
+    extra_metadata = Column("metadata", Text, nullable=True)
+    quality_flag = Column(Integer, nullable=False)
+    dataset = Column(String, nullable=False)
+    line = Column(Integer, nullable=True)
+    quarantined_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class IndicatorRollup(Base):
+    """
+    Agrégats journaliers produits par la politique de rétention
+    (les mesures brutes correspondantes sont supprimées de `indicators`).
+    count / min / max / somme ne portent que sur les mesures valides ;
+    `flagged` compte les mesures signalées par le contrôle qualité (min et
+    max sont vides si toutes l'étaient).
+    """
+    __tablename__ = "indicator_rollups"
+    __table_args__ = (
+        UniqueConstraint("zone_id", "source_id", "type", "unit", "day", name="uq_indicator_rollups_series_day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_id = Column(Integer, ForeignKey("sources.id"), nullable=False)
+    zone_id = Column(Integer, ForeignKey("zones.id"), nullable=False)
+    type = Column(String, nullable=False)
+    unit = Column(String, nullable=False)
+    day = Column(Date, nullable=False, index=True)
+    count = Column(Integer, nullable=False)
+    min_value = Column(Float, nullable=True)
+    max_value = Column(Float, nullable=True)
+    sum_value = Column(Float, nullable=False)
+    flagged = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class ColdPartition(Base):
+    """
+    Manifeste du stockage froid : un fichier Parquet par type, mois et passage
+    de l'archivage (app/tiering.py), avec les bornes utilisées pour n'ouvrir
+    que les fichiers utiles à une requête.
+    """
+    __tablename__ = "cold_partitions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    type = Column(String, nullable=False, index=True)
+    month = Column(Date, nullable=False)
+    path = Column(String, nullable=False, unique=True)
+    row_count = Column(Integer, nullable=False)
+    min_id = Column(Integer, nullable=False)
+    max_id = Column(Integer, nullable=False)
+    min_timestamp = Column(DateTime, nullable=False)
+    max_timestamp = Column(DateTime, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class DataVersion(Base):
+    """
+    Compteurs de version des données partagés entre workers (voir app/cache.py).
+    """
+    __tablename__ = "data_versions"
+
+    key = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class IngestCheckpoint(Base):
+    """
+    Dernière séquence commitée de chaque journal d'ingestion différée (voir
+    app/ingest_buffer.py), écrite dans la même transaction que le lot.
+    """
+    __tablename__ = "ingest_checkpoints"
+
+    journal = Column(String, primary_key=True)
+    seq = Column(Integer, nullable=False)
+
+
+class IngestedFile(Base):
+    """
+    Fichiers déjà ingérés par init.py (reconnus à leur empreinte SHA-256) :
+    une nouvelle exécution les ignore.
+    """
+    __tablename__ = "ingested_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    path = Column(String, nullable=False, index=True)
+    size = Column(Integer, nullable=False)
+    mtime = Column(Float, nullable=False)
+    sha256 = Column(String(64), nullable=False, unique=True)
+    dataset = Column(String, nullable=False)
+    inserted = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+    ingested_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,199 @@
+import asyncio
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .models import Indicator
+
+# Taille max de la file de chaque abonné : au-delà, les plus anciens messages sont perdus
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Messages détaillés gardés par transaction (un abonné n'en garderait pas plus) ;
+# au-delà (gros import), les mesures sont seulement comptées par (type, zone)
+# et diffusées au commit sous forme d'événements `summary`
+PENDING_MAX_MESSAGES = SUBSCRIBER_QUEUE_SIZE
+
+FilterKey = Tuple[Optional[str], Optional[int]]
+
+
+class Subscription:
+    """
+    Abonnement aux nouvelles mesures d'un (type, zone_id) — None = tous.
+    """
+
+    def __init__(self, type: Optional[str], zone_id: Optional[int], loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.key: FilterKey = (type, zone_id)
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def _offer(self, messages: List[Dict[str, Any]]) -> None:
+        # Exécuté dans la boucle de l'abonné (un appel par commit) : un abonné
+        # lent perd ses plus anciens messages au lieu de bloquer les écrivains
+        for message in messages:
+            if self.queue.full():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait(message)
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+
+class Broker:
+    """
+    Pub/sub en mémoire : les écritures commitées sont diffusées aux abonnés
+    dont le filtre correspond, sans jamais attendre un abonné.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[FilterKey, Set[Subscription]] = {}
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(
+        self,
+        type: Optional[str] = None,
+        zone_id: Optional[int] = None,
+        maxsize: int = SUBSCRIBER_QUEUE_SIZE,
+    ) -> Subscription:
+        sub = Subscription(type, zone_id, asyncio.get_running_loop(), maxsize)
+        with self._lock:
+            self._subscribers.setdefault(sub.key, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.key)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.key]
+
+    def publish(self, messages: Iterable[Dict[str, Any]]) -> None:
+        """
+        Appelable depuis n'importe quel thread. Chaque abonné reçoit ses
+        messages en un seul lot (un appel à sa boucle par publication).
+        """
+        if not self._subscribers:
+            return
+        with self._lock:
+            snapshot = {key: list(subs) for key, subs in self._subscribers.items()}
+        batches: Dict[Subscription, List[Dict[str, Any]]] = {}
+        for message in messages:
+            type_, zone_id = message["type"], message["zone_id"]
+            for key in ((type_, zone_id), (type_, None), (None, zone_id), (None, None)):
+                for sub in snapshot.get(key, ()):
+                    batches.setdefault(sub, []).append(message)
+        for sub, batch in batches.items():
+            try:
+                sub.loop.call_soon_threadsafe(sub._offer, batch)
+            except RuntimeError:
+                # Boucle de l'abonné fermée
+                self.unsubscribe(sub)
+
+
+broker = Broker()
+
+
+def indicator_message(indicator: Indicator) -> Dict[str, Any]:
+    return {
+        "id": indicator.id,
+        "source_id": indicator.source_id,
+        "zone_id": indicator.zone_id,
+        "type": indicator.type,
+        "value": indicator.value,
+        "unit": indicator.unit,
+        "timestamp": indicator.timestamp.isoformat(),
+        "extra_metadata": indicator.extra_metadata,
+    }
+
+
+class PendingMessages:
+    """
+    Messages d'une transaction, diffusés à son commit : les PENDING_MAX_MESSAGES
+    premiers en détail, les suivants seulement comptés par (type, zone).
+    """
+
+    def __init__(self):
+        self.messages: List[Dict[str, Any]] = []
+        self.counts: Dict[FilterKey, int] = {}
+
+    @property
+    def room(self) -> int:
+        return PENDING_MAX_MESSAGES - len(self.messages)
+
+    def add(self, messages: List[Dict[str, Any]]) -> None:
+        room = self.room
+        self.messages.extend(messages[:room])
+        self.count(messages[room:])
+
+    def count(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for row in rows:
+            key = (row["type"], row["zone_id"])
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        return [
+            {"event": "summary", "type": type_, "zone_id": zone_id, "count": count}
+            for (type_, zone_id), count in self.counts.items()
+        ]
+
+
+def _pending(session: Session) -> PendingMessages:
+    pending = session.info.get("pending_messages")
+    if pending is None:
+        pending = session.info["pending_messages"] = PendingMessages()
+    return pending
+
+
+def pending_room(session: Session) -> int:
+    """
+    Nombre de messages détaillés que la transaction peut encore mettre en
+    attente (0 sans abonné : rien n'est gardé).
+    """
+    if not broker.has_subscribers:
+        return 0
+    pending = session.info.get("pending_messages")
+    return pending.room if pending is not None else PENDING_MAX_MESSAGES
+
+
+def queue_messages(session: Session, messages: List[Dict[str, Any]]) -> None:
+    """
+    Messages à diffuser au prochain commit de la session (insertions hors ORM).
+    """
+    if broker.has_subscribers:
+        _pending(session).add(messages)
+
+
+def queue_counts(session: Session, rows: Iterable[Dict[str, Any]]) -> None:
+    """
+    Mesures insérées à signaler seulement par leur nombre (voir PENDING_MAX_MESSAGES).
+    """
+    if broker.has_subscribers:
+        _pending(session).count(rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_new_indicators(session: Session, flush_context) -> None:
+    if not broker.has_subscribers:
+        return
+    messages = [indicator_message(obj) for obj in session.new if isinstance(obj, Indicator)]
+    if messages:
+        _pending(session).add(messages)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_on_commit(session: Session) -> None:
+    pending = session.info.pop("pending_messages", None)
+    if pending is not None:
+        broker.publish(pending.messages + pending.summaries())
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop("pending_messages", None)
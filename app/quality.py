@@ -0,0 +1,155 @@
+import math
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import config
+
+# Contrôle qualité des imports : chaque mesure reçoit un quality_flag (bits
+# ci-dessous, 0 = mesure valide). Les règles fixes (valeur absente, valeur de
+# remplissage, concentration négative) ne coûtent que quelques comparaisons ;
+# les valeurs aberrantes sont repérées par rapport à la moyenne / variance
+# courantes de la série (zone, type), tenues à jour en flux (Welford).
+
+# Bits de Indicator.quality_flag
+MISSING_VALUE = 1   # valeur vide, convertie en 0.0 par clean_float
+NEGATIVE = 2        # concentration / indice négatif
+FILL_VALUE = 4      # valeur de remplissage des capteurs (9999, -999...)
+OUTLIER = 8         # trop loin de la moyenne courante de la série
+
+FLAG_NAMES = {
+    MISSING_VALUE: "missing_value",
+    NEGATIVE: "negative",
+    FILL_VALUE: "fill_value",
+    OUTLIER: "outlier",
+}
+
+# Valeurs écrites par les capteurs / exports à la place d'une mesure absente
+FILL_VALUES = frozenset({9999.0, -9999.0, 99999.0, -99999.0, -999.0})
+
+# Unités pour lesquelles une valeur négative n'a pas de sens (CSV générique)
+CONCENTRATION_UNITS = frozenset({
+    "µg/m3", "µg/m³", "ug/m3", "ug/m³", "mg/m3", "mg/m³", "ng/m3", "ng/m³",
+    "ppb", "ppm", "index", "indice",
+})
+
+# Action sur les mesures signalées : "flag" (insérées avec leur quality_flag),
+# "quarantine" (écartées dans indicator_quarantine) ou "off" (pas de contrôle)
+ACTIONS = ("flag", "quarantine", "off")
+
+
+def describe(flags: int) -> str:
+    """
+    "negative,outlier" pour un quality_flag ("" si valide).
+    """
+    return ",".join(name for bit, name in FLAG_NAMES.items() if flags & bit)
+
+
+@lru_cache(maxsize=256)
+def is_concentration(unit: str) -> bool:
+    return unit.strip().lower().replace(" ", "") in CONCENTRATION_UNITS
+
+
+class RunningStats:
+    """
+    Moyenne et variance d'une série mises à jour en O(1) par mesure (Welford).
+    """
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+class QualityControl:
+    """
+    Étape de contrôle qualité d'un import (une instance par import, ou par
+    exécution de init.py : les statistiques des séries continuent d'un fichier
+    à l'autre).
+
+    Avec une session `db`, chaque série est amorcée, la première fois qu'elle
+    apparaît, par ses `history` dernières mesures valides en base : un petit
+    fichier quotidien (24 mesures par série) est donc testé contre l'historique
+    de la série, pas seulement contre ses propres lignes.
+
+    Une série n'est testée contre sa moyenne qu'à partir de `min_samples`
+    mesures. Les mesures signalées n'entrent pas dans les statistiques ; une
+    mesure aberrante y entre ramenée à la borne du seuil, pour qu'un vrai
+    changement de niveau finisse par être accepté sans qu'un pic isolé gonfle
+    la variance.
+    """
+
+    def __init__(
+        self,
+        action: Optional[str] = None,
+        max_zscore: Optional[float] = None,
+        min_samples: Optional[int] = None,
+        db: Optional[Session] = None,
+        history: Optional[int] = None,
+    ):
+        self.action = action or config.IMPORT_QC
+        if self.action not in ACTIONS:
+            raise ValueError(f"Action de contrôle qualité inconnue : {self.action!r} (valeurs : {', '.join(ACTIONS)})")
+        self.max_zscore = max_zscore if max_zscore is not None else config.IMPORT_QC_MAX_ZSCORE
+        self.min_samples = min_samples if min_samples is not None else config.IMPORT_QC_MIN_SAMPLES
+        self.db = db
+        self.history = history if history is not None else config.IMPORT_QC_HISTORY
+        self.series: Dict[Tuple[int, str], RunningStats] = {}
+        self.flagged = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.action != "off"
+
+    @property
+    def quarantine(self) -> bool:
+        return self.action == "quarantine"
+
+    def _seed(self, zone_id: int, type: str) -> RunningStats:
+        stats = RunningStats()
+        if self.db is not None and self.history > 0:
+            from . import crud
+
+            for value in crud.recent_values(self.db, zone_id, type, self.history):
+                stats.push(value)
+        return stats
+
+    def check(self, zone_id: int, type: str, value: float, missing: bool = False, non_negative: bool = False) -> int:
+        """
+        quality_flag de la mesure (0 si valide), et mise à jour de la série.
+        """
+        if missing:
+            flags = MISSING_VALUE
+        elif value in FILL_VALUES:
+            flags = FILL_VALUE
+        elif non_negative and value < 0:
+            flags = NEGATIVE
+        else:
+            flags = 0
+        if flags:
+            self.flagged += 1
+            return flags
+
+        stats = self.series.get((zone_id, type))
+        if stats is None:
+            stats = self.series[(zone_id, type)] = self._seed(zone_id, type)
+        if stats.count >= self.min_samples:
+            limit = self.max_zscore * stats.std
+            if limit > 0 and abs(value - stats.mean) > limit:
+                stats.push(min(max(value, stats.mean - limit), stats.mean + limit))
+                self.flagged += 1
+                return OUTLIER
+        stats.push(value)
+        return 0
@@ -0,0 +1,196 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, func, delete, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from . import cache, locks
+from .models import ColdPartition, Indicator, IndicatorRollup
+
+logger = logging.getLogger(__name__)
+
+# Durée de conservation des mesures brutes, en jours, par type d'indicateur.
+# None = on garde tout (ex. l'indice ATMO est déjà journalier).
+RETENTION_POLICIES: Dict[str, Optional[int]] = {
+    "atmo_index": None,
+}
+# Politique appliquée aux types absents de RETENTION_POLICIES
+DEFAULT_RETENTION_DAYS: Optional[int] = 365
+
+# Nombre de lignes brutes traitées (agrégées + supprimées) par transaction
+BATCH_SIZE = 5000
+
+
+def get_policy(type_: str, policies: Optional[Dict[str, Optional[int]]] = None) -> Optional[int]:
+    policies = RETENTION_POLICIES if policies is None else policies
+    if type_ in policies:
+        return policies[type_]
+    return DEFAULT_RETENTION_DAYS
+
+
+def db_used_bytes(db: Session) -> int:
+    """
+    Taille réellement occupée par la base SQLite (pages utilisées, hors freelist).
+    """
+    page_size = db.execute(text("PRAGMA page_size")).scalar()
+    page_count = db.execute(text("PRAGMA page_count")).scalar()
+    freelist = db.execute(text("PRAGMA freelist_count")).scalar()
+    return (page_count - freelist) * page_size
+
+
+def _downsample_batch(db: Session, type_: str, cutoff: datetime, batch_size: int) -> Dict[str, int]:
+    """
+    Agrège en journalier un lot des plus anciennes mesures brutes puis les supprime,
+    le tout dans une seule transaction courte.
+    """
+    ids = [
+        row[0]
+        for row in db.query(Indicator.id)
+        .filter(Indicator.type == type_, Indicator.timestamp < cutoff)
+        .order_by(Indicator.timestamp)
+        .limit(batch_size)
+        .all()
+    ]
+    if not ids:
+        return {"rows_deleted": 0, "rollups_written": 0}
+
+    day = func.date(Indicator.timestamp)
+    # Les mesures signalées par le contrôle qualité sont comptées à part
+    valid = case((Indicator.quality_flag == 0, Indicator.value))
+    groups = (
+        db.query(
+            Indicator.zone_id,
+            Indicator.source_id,
+            Indicator.unit,
+            day,
+            func.count(valid),
+            func.min(valid),
+            func.max(valid),
+            func.coalesce(func.sum(valid), 0.0),
+            func.count(Indicator.id) - func.count(valid),
+        )
+        .filter(Indicator.id.in_(ids))
+        .group_by(Indicator.zone_id, Indicator.source_id, Indicator.unit, day)
+        .all()
+    )
+
+    rollups: List[Dict[str, Any]] = [
+        {
+            "zone_id": zone_id,
+            "source_id": source_id,
+            "type": type_,
+            "unit": unit,
+            "day": date.fromisoformat(day_str),
+            "count": count,
+            "min_value": min_value,
+            "max_value": max_value,
+            "sum_value": sum_value,
+            "flagged": flagged,
+        }
+        for zone_id, source_id, unit, day_str, count, min_value, max_value, sum_value, flagged in groups
+    ]
+
+    # Fusion avec un agrégat déjà existant pour le même jour (relance, lot à cheval sur 2 jours...)
+    stmt = sqlite_insert(IndicatorRollup).values(rollups)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["zone_id", "source_id", "type", "unit", "day"],
+        set_={
+            "count": IndicatorRollup.count + stmt.excluded.count,
+            # min() / max() à plusieurs arguments valent NULL si l'un d'eux l'est
+            "min_value": func.min(
+                func.coalesce(IndicatorRollup.min_value, stmt.excluded.min_value),
+                func.coalesce(stmt.excluded.min_value, IndicatorRollup.min_value),
+            ),
+            "max_value": func.max(
+                func.coalesce(IndicatorRollup.max_value, stmt.excluded.max_value),
+                func.coalesce(stmt.excluded.max_value, IndicatorRollup.max_value),
+            ),
+            "sum_value": IndicatorRollup.sum_value + stmt.excluded.sum_value,
+            "flagged": IndicatorRollup.flagged + stmt.excluded.flagged,
+        },
+    )
+    db.execute(stmt)
+    db.execute(delete(Indicator).where(Indicator.id.in_(ids)))
+    cache.mark_changed(db, {type_, cache.REWRITES})
+    db.commit()
+
+    return {"rows_deleted": len(ids), "rollups_written": len(rollups)}
+
+
+def apply_retention(
+    db: Session,
+    policies: Optional[Dict[str, Optional[int]]] = None,
+    now: Optional[datetime] = None,
+    batch_size: int = BATCH_SIZE,
+    vacuum: bool = False,
+) -> Dict[str, Any]:
+    """
+    Applique la politique de rétention à chaque type d'indicateur :
+    les mesures brutes plus anciennes que la durée configurée sont
+    agrégées par jour dans `indicator_rollups` puis supprimées par lots.
+
+    La rétention ne lit que la table `indicators` : les mesures déjà déplacées
+    dans le stockage froid (tiering.py, après ECOTRACK_HOT_DAYS jours) lui
+    échappent. Elle doit donc passer avant l'archivage, avec une durée au plus
+    égale à HOT_DAYS pour les types à agréger ; les fichiers froids plus anciens
+    que la limite sont signalés dans le résumé (cold_partitions_skipped).
+
+    Retourne un résumé : lignes supprimées, agrégats écrits, octets récupérés.
+    """
+    now = now or datetime.utcnow()
+    # On ne traite que des journées complètes
+    today = datetime(now.year, now.month, now.day)
+
+    bytes_before = db_used_bytes(db)
+    types = [row[0] for row in db.query(Indicator.type).distinct().all()]
+
+    per_type: Dict[str, Dict[str, int]] = {}
+    for type_ in types:
+        days = get_policy(type_, policies)
+        if days is None:
+            continue
+
+        cutoff = today - timedelta(days=days)
+        totals = {"rows_deleted": 0, "rollups_written": 0}
+        while True:
+            with locks.write_lock():
+                result = _downsample_batch(db, type_, cutoff, batch_size)
+            if not result["rows_deleted"]:
+                break
+            totals["rows_deleted"] += result["rows_deleted"]
+            totals["rollups_written"] += result["rollups_written"]
+
+        if totals["rows_deleted"]:
+            logger.info("Rétention %s : %s lignes brutes agrégées", type_, totals["rows_deleted"])
+            per_type[type_] = totals
+
+    # Types dont des mesures plus anciennes que la limite sont déjà archivées
+    cold_skipped: Dict[str, int] = {}
+    for type_, min_timestamp in db.query(ColdPartition.type, ColdPartition.min_timestamp):
+        days = get_policy(type_, policies)
+        if days is not None and min_timestamp < today - timedelta(days=days):
+            cold_skipped[type_] = cold_skipped.get(type_, 0) + 1
+    for type_, count in cold_skipped.items():
+        logger.warning(
+            "Rétention %s : %s fichiers du stockage froid dépassent la limite et ne sont pas agrégés "
+            "(lancer la rétention avant tiering.py, avec une durée <= ECOTRACK_HOT_DAYS)",
+            type_, count,
+        )
+
+    if vacuum:
+        # VACUUM rend la place au système de fichiers (verrou exclusif le temps de l'opération)
+        db.commit()
+        with db.get_bind().connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM"))
+
+    bytes_after = db_used_bytes(db)
+
+    return {
+        "rows_deleted": sum(t["rows_deleted"] for t in per_type.values()),
+        "rollups_written": sum(t["rollups_written"] for t in per_type.values()),
+        "bytes_reclaimed": max(bytes_before - bytes_after, 0),
+        "per_type": per_type,
+        "cold_partitions_skipped": cold_skipped,
+    }
@@ -0,0 +1,284 @@
+import calendar
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from . import cache, config, tiering
+from .models import Indicator
+from .timeseries import epoch_seconds_column, mirror_columns
+
+AGGS = ("mean", "max", "min")
+
+
+class RollingWindow:
+    """
+    Fenêtre glissante temporelle (les points des `window_seconds` dernières secondes).
+
+    Chaque push() est en O(1) amorti : somme glissante pour la moyenne,
+    deques monotones pour le max et le min.
+    """
+
+    def __init__(self, window_seconds: int):
+        self.window_seconds = window_seconds
+        self._points: deque = deque()  # (ts, value)
+        self._sum = 0.0
+        self._max: deque = deque()  # valeurs décroissantes
+        self._min: deque = deque()  # valeurs croissantes
+
+    def push(self, ts: int, value: float) -> None:
+        self._points.append((ts, value))
+        self._sum += value
+
+        while self._max and self._max[-1][1] < value:
+            self._max.pop()
+        self._max.append((ts, value))
+        while self._min and self._min[-1][1] > value:
+            self._min.pop()
+        self._min.append((ts, value))
+
+        # On retire les points sortis de la fenêtre ]ts - window, ts]
+        start = ts - self.window_seconds
+        while self._points and self._points[0][0] <= start:
+            _, old = self._points.popleft()
+            self._sum -= old
+        while self._max and self._max[0][0] <= start:
+            self._max.popleft()
+        while self._min and self._min[0][0] <= start:
+            self._min.popleft()
+
+    @property
+    def count(self) -> int:
+        return len(self._points)
+
+    def value(self, agg: str) -> float:
+        if agg == "mean":
+            return self._sum / len(self._points)
+        if agg == "max":
+            return self._max[0][1]
+        return self._min[0][1]
+
+
+@dataclass
+class RollingSeries:
+    """
+    Résultat en cache pour une série : l'état de la fenêtre est conservé
+    pour pouvoir prolonger le calcul quand de nouvelles mesures arrivent.
+    Les mesures antérieures à `start` (préchauffage) remplissent la fenêtre
+    sans produire de point.
+    """
+    window: RollingWindow
+    agg: str
+    start: Optional[int] = None
+    version: int = -1
+    rewrites: int = -1
+    last_id: int = 0
+    last_ts: Optional[int] = None
+    points: List[Tuple[int, float]] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        """
+        Nombre de points gardés en mémoire (résultat + état de la fenêtre).
+        """
+        window = self.window
+        return len(self.points) + len(window._points) + len(window._max) + len(window._min)
+
+    def extend(self, rows: List[Tuple[int, int, float]]) -> None:
+        for id_, ts, value in rows:
+            self.window.push(ts, value)
+            if self.start is None or ts >= self.start:
+                self.points.append((ts, self.window.value(self.agg)))
+            self.last_ts = ts
+            self.last_id = max(self.last_id, id_)
+
+
+# Borné en nombre de séries et en nombre total de points
+_series_cache = cache.LRUCache(
+    maxsize=512,
+    max_weight=config.ROLLING_CACHE_MAX_POINTS,
+    weigh=lambda series: series.size,
+)
+# Un verrou par série en cours de calcul : deux requêtes sur la même série ne
+# la calculent qu'une fois, les autres séries ne sont pas bloquées
+_key_locks: Dict[tuple, list] = {}  # clé -> [verrou, nombre d'utilisateurs]
+_key_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _key_lock(key: tuple):
+    with _key_locks_guard:
+        entry = _key_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _key_locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                del _key_locks[key]
+
+
+def _fetch(
+    db: Session,
+    type: str,
+    zone_id: int,
+    source_id: Optional[int],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    after_id: int = 0,
+    engine: str = "sql",
+) -> List[Tuple[int, int, float]]:
+    """
+    [(id, ts_epoch, valeur)] des mesures valides (quality_flag = 0) de la
+    série, triées par date puis id, stockage froid compris.
+    """
+    if engine == "columnar":
+        hot = mirror_columns(
+            db, ["id", "ts", "value"],
+            type=type, zone_id=zone_id, source_id=source_id, date_from=date_from, date_to=date_to,
+            exclude_flagged=True, after_id=after_id,
+        )
+        order = np.lexsort((hot["id"], hot["ts"]))
+        rows = list(zip(hot["id"][order].tolist(), hot["ts"][order].tolist(), hot["value"][order].tolist()))
+    else:
+        query = db.query(Indicator.id, epoch_seconds_column(), Indicator.value).filter(
+            Indicator.type == type,
+            Indicator.zone_id == zone_id,
+            Indicator.quality_flag == 0,
+        )
+        if source_id:
+            query = query.filter(Indicator.source_id == source_id)
+        if date_from:
+            query = query.filter(Indicator.timestamp >= date_from)
+        if date_to:
+            query = query.filter(Indicator.timestamp <= date_to)
+        if after_id:
+            query = query.filter(Indicator.id > after_id)
+        rows = [tuple(r) for r in query.order_by(Indicator.timestamp, Indicator.id).all()]
+    if after_id:
+        # Les mesures froides ont des ids plus anciens (l'archivage force un recalcul complet)
+        return rows
+
+    partitions = tiering.cold_partitions(db, type, date_from, date_to)
+    if not partitions:
+        return rows
+    cold = tiering.cold_arrays(
+        partitions, ["id", "timestamp", "value"],
+        zone_id=zone_id, source_id=source_id, date_from=date_from, date_to=date_to, exclude_flagged=True,
+    )
+    cold_rows = list(zip(cold["id"].tolist(), cold["timestamp"].tolist(), cold["value"].tolist()))
+    return sorted(cold_rows + rows, key=lambda row: (row[1], row[0]))
+
+
+def rolling_series(
+    db: Session,
+    type: str,
+    zone_id: int,
+    window_seconds: int,
+    agg: str = "mean",
+    source_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    engine: str = "sql",
+) -> List[Tuple[int, float]]:
+    """
+    Retourne [(ts_epoch, valeur glissante)] pour la série (type, zone).
+
+    Les mesures signalées par le contrôle qualité sont ignorées. Avec
+    date_from, la fenêtre est préchauffée par les mesures des `window_seconds`
+    précédentes : le premier point porte déjà sur une fenêtre complète.
+
+    Le résultat est mis en cache par série ; quand de nouvelles mesures
+    arrivent (après la dernière connue), seul le complément est calculé.
+    Une modification/suppression ou une mesure arrivée dans le désordre
+    provoque un recalcul complet. Les versions viennent de la table
+    `data_versions` : les imports faits par init.py invalident aussi le cache.
+    engine="columnar" lit la table chaude dans le miroir colonnaire (même résultat).
+    """
+    key = (type, zone_id, source_id, date_from, date_to, window_seconds, agg)
+    fetch_from = date_from - timedelta(seconds=window_seconds) if date_from else None
+    filters = (type, zone_id, source_id, fetch_from, date_to)
+
+    with _key_lock(key):
+        version = cache.data_version(type)
+        rewrites = cache.data_version(cache.REWRITES)
+
+        series: Optional[RollingSeries] = _series_cache.get(key)
+        if series is not None and series.version == version:
+            return list(series.points)
+
+        if series is not None and series.rewrites == rewrites:
+            new_rows = _fetch(db, *filters, after_id=series.last_id, engine=engine)
+            if series.last_ts is None or not new_rows or new_rows[0][1] >= series.last_ts:
+                series.extend(new_rows)
+            else:
+                series = None
+        else:
+            series = None
+
+        if series is None:
+            start = calendar.timegm(date_from.timetuple()) if date_from else None
+            series = RollingSeries(window=RollingWindow(window_seconds), agg=agg, start=start)
+            series.extend(_fetch(db, *filters, engine=engine))
+
+        series.version = version
+        series.rewrites = rewrites
+        _series_cache.set(key, series)
+        return list(series.points)
+
+
+def daily_max(points: List[Tuple[int, float]]) -> List[Dict[str, Any]]:
+    """
+    Maximum journalier (jour UTC) d'une série glissante,
+    ex. maximum journalier de la moyenne sur 8 heures pour l'O3.
+    """
+    days: Dict[int, float] = {}
+    for ts, value in points:
+        day = ts // 86400
+        if day not in days or value > days[day]:
+            days[day] = value
+    return [
+        {"day": datetime.fromtimestamp(day * 86400, tz=timezone.utc).date(), "value": value}
+        for day, value in sorted(days.items())
+    ]
+
+
+def daily_mean(
+    db: Session,
+    type: str,
+    zone_id: int,
+    source_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    engine: str = "sql",
+) -> List[Dict[str, Any]]:
+    """
+    Moyenne par jour civil (UTC) des mesures valides de la série, ex. moyenne
+    journalière des PM10 (valeur limite de 50 µg/m³) : contrairement à une
+    fenêtre glissante de 24h, chaque mesure ne compte que pour son jour.
+    """
+    rows = _fetch(db, type, zone_id, source_id, date_from, date_to, engine=engine)
+    if not rows:
+        return []
+    stamps = np.fromiter((ts for _, ts, _ in rows), dtype=np.int64, count=len(rows))
+    values = np.fromiter((value for _, _, value in rows), dtype=np.float64, count=len(rows))
+    days, inverse = np.unique(stamps // 86400, return_inverse=True)
+    means = np.bincount(inverse, weights=values) / np.bincount(inverse)
+    return [
+        {"day": datetime.fromtimestamp(int(day) * 86400, tz=timezone.utc).date(), "value": float(value)}
+        for day, value in zip(days, means)
+    ]
+
+
+def exceedance_days(daily: List[Dict[str, Any]], threshold: float) -> int:
+    """
+    Nombre de jours où la valeur journalière dépasse le seuil.
+    """
+    return sum(1 for d in daily if d["value"] > threshold)
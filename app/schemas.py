@@ -1,6 +1,20 @@
-from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import Optional, List
+from pydantic import AfterValidator, BaseModel, Field
+from datetime import date, datetime, timezone
+from typing import Annotated, Any, Optional, List
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Date comparable aux timestamps stockés (naïfs, en UTC) : une date avec
+    fuseau (ex. date_from=2024-04-01T00:00:00Z) est convertie en UTC.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# Bornes de période des filtres (date_from / date_to), ramenées en UTC naïf
+UtcDateTime = Annotated[datetime, AfterValidator(naive_utc)]
 
 class UserBase(BaseModel):
     email: str
@@ -30,6 +44,8 @@ class Token(BaseModel):
 class ZoneBase(BaseModel):
     name: str
     postal_code: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 
 class ZoneCreate(ZoneBase):
@@ -72,13 +88,14 @@ class IndicatorBase(BaseModel):
 
 
 class IndicatorCreate(IndicatorBase):
-    pass
+    # NaN / Infinity refusés : la colonne value est NOT NULL (SQLite stocke NaN en NULL)
+    value: float = Field(..., allow_inf_nan=False)
 
 class IndicatorUpdate(BaseModel):
     source_id: Optional[int] = Field(None, ge=1)
     zone_id: Optional[int] = Field(None, ge=1)
     type: Optional[str] = Field(None, min_length=1, max_length=100)
-    value: Optional[float] = None
+    value: Optional[float] = Field(None, allow_inf_nan=False)
     unit: Optional[str] = None
     timestamp: Optional[datetime] = None
     extra_metadata: Optional[str] = None
@@ -88,6 +105,7 @@ class IndicatorUpdate(BaseModel):
 
 class IndicatorRead(IndicatorBase):
     id: int
+    quality_flag: int = 0
 
     class Config:
         orm_mode = True
@@ -96,4 +114,91 @@ class IndicatorStats(BaseModel):
     count: int
     min_value: float | None
     max_value: float | None
-    avg_value: float | None
\ No newline at end of file
+    avg_value: float | None
+
+class LatestIndicatorRead(BaseModel):
+    zone_id: int
+    type: str
+    indicator_id: int
+    source_id: int
+    value: float
+    unit: str
+    timestamp: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class StatsQuery(BaseModel):
+    type: Optional[str] = None
+    zone_id: Optional[int] = None
+    source_id: Optional[int] = None
+    date_from: Optional[UtcDateTime] = None
+    date_to: Optional[UtcDateTime] = None
+    exclude_flagged: bool = False
+
+
+class IndicatorStatsBatch(BaseModel):
+    queries: List[StatsQuery]
+    engine: str = "sql"
+
+
+class ZoneSeries(BaseModel):
+    zone_id: int
+    values: List[Optional[float]]
+
+
+class IndicatorComparison(BaseModel):
+    type: str
+    bucket: str
+    agg: str
+    timestamps: List[datetime]
+    series: List[ZoneSeries]
+
+
+class RollingPoint(BaseModel):
+    timestamp: datetime
+    value: float
+
+
+class IndicatorSeries(BaseModel):
+    type: str
+    zone_id: Optional[int] = None
+    max_points: int
+    total_points: int
+    points: List[RollingPoint]
+
+
+class DailyValue(BaseModel):
+    day: date
+    value: float
+
+
+class IndicatorRolling(BaseModel):
+    type: str
+    zone_id: int
+    window: str
+    agg: str
+    points: List[RollingPoint]
+    daily_max: List[DailyValue]
+    daily_mean: Optional[List[DailyValue]] = None
+    exceedance_days: Optional[int] = None
+
+
+class BulkItemError(BaseModel):
+    index: int
+    error: str
+
+
+class BulkInsertResult(BaseModel):
+    inserted: int
+    errors: List[BulkItemError]
+
+
+class SlowQuery(BaseModel):
+    timestamp: datetime
+    duration_ms: float
+    path: Optional[str] = None
+    statement: str
+    parameters: Any = None
+    plan: List[str]
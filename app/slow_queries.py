@@ -0,0 +1,93 @@
+import logging
+import re
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List
+
+from . import config, metrics
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_recent: deque = deque(maxlen=config.SLOW_QUERY_LOG_SIZE)
+
+
+def _explain(dbapi_connection, statement: str, parameters) -> List[str]:
+    """
+    Plan d'exécution SQLite (EXPLAIN QUERY PLAN) : montre notamment
+    si un index couvre les filtres ("SEARCH ... USING INDEX") ou non ("SCAN").
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        return [row[3] for row in cursor.fetchall()]
+    except Exception as e:
+        return [f"EXPLAIN impossible : {e}"]
+    finally:
+        cursor.close()
+
+
+# Tables dont les paramètres peuvent apparaître dans le journal (mesures, zones,
+# sources...) ; toute autre requête (users, tables ajoutées plus tard) est masquée
+PARAMETER_TABLES = frozenset({
+    "indicators", "latest_indicators", "indicator_quarantine", "indicator_rollups",
+    "zones", "zone_rtree", "zone_search", "sources", "cold_partitions",
+    "data_versions", "ingested_files",
+})
+_TABLE_RE = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE|TABLE)\s+"?(\w+)', re.IGNORECASE)
+
+
+def _safe_parameters(statement: str, parameters) -> Any:
+    tables = set(_TABLE_RE.findall(statement))
+    if not tables or not tables <= PARAMETER_TABLES:
+        # Pas de mots de passe (hashés), d'emails... dans les logs
+        return "<masqués>"
+    if isinstance(parameters, (list, tuple)):
+        return [p if isinstance(p, (int, float, str, type(None))) else str(p) for p in parameters]
+    return str(parameters)
+
+
+def _record(cursor, statement: str, parameters, executemany: bool, elapsed: float) -> None:
+    elapsed_ms = elapsed * 1000
+    threshold = config.SLOW_QUERY_THRESHOLD_MS
+    if not threshold or elapsed_ms < threshold:
+        return
+
+    plan: List[str] = []
+    if config.SLOW_QUERY_EXPLAIN and not executemany and statement.lstrip().upper().startswith("SELECT"):
+        plan = _explain(cursor.connection, statement, parameters)
+
+    request = metrics.current_request.get()
+    entry = {
+        "timestamp": datetime.utcnow(),
+        "duration_ms": round(elapsed_ms, 2),
+        "path": request.path if request is not None else None,
+        "statement": statement,
+        "parameters": _safe_parameters(statement, parameters) if not executemany else f"<executemany x{len(parameters)}>",
+        "plan": plan,
+    }
+    with _lock:
+        _recent.append(entry)
+
+    logger.warning(
+        "Requête SQL lente (%.1f ms) %s : %s | paramètres=%s | plan=%s",
+        elapsed_ms,
+        entry["path"] or "",
+        " ".join(statement.split()),
+        entry["parameters"],
+        " / ".join(plan),
+    )
+
+
+metrics.add_statement_hook(_record)
+
+
+def recent(limit: int = None) -> List[Dict[str, Any]]:
+    """
+    Requêtes lentes les plus récentes d'abord.
+    """
+    with _lock:
+        entries = list(_recent)
+    entries.reverse()
+    return entries[:limit] if limit else entries
@@ -0,0 +1,453 @@
+import functools
+import logging
+import operator
+import os
+import re
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session
+
+from . import cache, config, locks
+from .models import ColdPartition, Indicator
+from .schemas import naive_utc
+from .retention import db_used_bytes
+
+logger = logging.getLogger(__name__)
+
+# Stockage chaud / froid : les mesures anciennes quittent la table `indicators`
+# pour des fichiers Parquet compressés (un par type, mois et passage), recensés
+# dans `cold_partitions`. Les lectures (list_indicators, stats, séries compare /
+# series / rolling, miroir colonnaire) n'ouvrent ces fichiers que si la période
+# demandée les recoupe, et ne lisent que les groupes de lignes utiles (filtres
+# poussés dans le scan Parquet).
+# pyarrow est un paquet optionnel, importé seulement quand il y a des données froides.
+
+# Lignes par groupe de lignes Parquet (les statistiques min/max de chaque
+# groupe permettent d'en sauter la lecture)
+ROW_GROUP_ROWS = 64_000
+# Compression des fichiers froids
+COMPRESSION = "zstd"
+
+# Stats agrégées : (count, min, max, somme) par clé de regroupement
+ColdStats = Dict[tuple, Tuple[int, float, float, float]]
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute  # noqa: F401
+        import pyarrow.dataset  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise RuntimeError("Stockage froid : le paquet optionnel 'pyarrow' n'est pas installé.")
+    return pyarrow
+
+
+def _schema(pa):
+    # Mêmes champs que IndicatorRead
+    return pa.schema([
+        ("id", pa.int64()),
+        ("source_id", pa.int64()),
+        ("zone_id", pa.int64()),
+        ("type", pa.string()),
+        ("value", pa.float64()),
+        ("unit", pa.string()),
+        ("timestamp", pa.timestamp("us")),
+        ("extra_metadata", pa.string()),
+        ("quality_flag", pa.int64()),
+    ])
+
+
+_COLUMNS = (
+    Indicator.id,
+    Indicator.source_id,
+    Indicator.zone_id,
+    Indicator.type,
+    Indicator.value,
+    Indicator.unit,
+    Indicator.timestamp,
+    Indicator.extra_metadata,
+    Indicator.quality_flag,
+)
+
+
+# --- archivage ---
+
+def _next_month(month: datetime) -> datetime:
+    return datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _partition_path(directory: Path, type_: str, month: datetime, min_id: int) -> Path:
+    safe_type = re.sub(r"[^\w.-]", "_", type_)
+    return directory / f"type={safe_type}" / f"{month:%Y-%m}-{min_id}.parquet"
+
+
+def pending_partitions(db: Session, cutoff: datetime, max_id: int) -> List[Tuple[str, datetime, int]]:
+    """
+    [(type, mois, lignes)] des mesures antérieures à `cutoff` encore dans la table chaude.
+    """
+    month = func.strftime("%Y-%m", Indicator.timestamp)
+    rows = (
+        db.query(Indicator.type, month, func.count(Indicator.id))
+        .filter(Indicator.timestamp < cutoff, Indicator.id <= max_id)
+        .group_by(Indicator.type, month)
+        .order_by(month, Indicator.type)
+        .all()
+    )
+    return [(type_, datetime.strptime(month_str, "%Y-%m"), count) for type_, month_str, count in rows]
+
+
+def _archive_partition(
+    db: Session,
+    type_: str,
+    month: datetime,
+    cutoff: datetime,
+    max_id: int,
+    directory: Path,
+) -> Optional[ColdPartition]:
+    """
+    Écrit les mesures (type, mois) antérieures à `cutoff` dans un fichier Parquet
+    (triées par zone puis date, pour que les filtres sur la zone sautent des
+    groupes de lignes), puis les supprime de la table chaude dans la même
+    transaction que l'ajout au manifeste. En cas d'échec, le fichier est effacé.
+    """
+    pa = _pyarrow()
+    schema = _schema(pa)
+    filters = (
+        Indicator.type == type_,
+        Indicator.timestamp >= month,
+        Indicator.timestamp < min(_next_month(month), cutoff),
+        # Les mesures arrivées pendant l'archivage ne sont ni écrites ni supprimées
+        Indicator.id <= max_id,
+    )
+    query = db.query(*_COLUMNS).filter(*filters).order_by(Indicator.zone_id, Indicator.timestamp, Indicator.id)
+
+    tmp_path = directory / f".{uuid.uuid4().hex}.parquet.tmp"
+    path = None
+    directory.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    min_id = max_id_written = None
+    min_ts = max_ts = None
+    try:
+        with pa.parquet.ParquetWriter(tmp_path, schema, compression=COMPRESSION) as writer:
+            chunk = []
+            for row in query.yield_per(ROW_GROUP_ROWS):
+                chunk.append(row)
+                if len(chunk) == ROW_GROUP_ROWS:
+                    writer.write_batch(_record_batch(pa, schema, chunk), row_group_size=ROW_GROUP_ROWS)
+                    chunk = []
+            if chunk:
+                writer.write_batch(_record_batch(pa, schema, chunk), row_group_size=ROW_GROUP_ROWS)
+        table = pa.parquet.read_table(tmp_path, columns=["id", "timestamp"])
+        rows = table.num_rows
+        if not rows:
+            tmp_path.unlink()
+            db.rollback()
+            return None
+        id_range = pa.compute.min_max(table["id"])
+        ts_range = pa.compute.min_max(table["timestamp"])
+        min_id, max_id_written = id_range["min"].as_py(), id_range["max"].as_py()
+        min_ts, max_ts = ts_range["min"].as_py(), ts_range["max"].as_py()
+
+        path = _partition_path(directory, type_, month, min_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, path)
+
+        partition = ColdPartition(
+            type=type_,
+            month=month.date(),
+            path=str(path),
+            row_count=rows,
+            min_id=min_id,
+            max_id=max_id_written,
+            min_timestamp=min_ts,
+            max_timestamp=max_ts,
+            size_bytes=path.stat().st_size,
+        )
+        db.add(partition)
+        deleted = db.execute(delete(Indicator).where(*filters)).rowcount
+        if deleted != rows:
+            raise RuntimeError(f"Archivage {type_} {month:%Y-%m} : {rows} lignes écrites, {deleted} supprimées")
+        cache.mark_changed(db, {type_, cache.REWRITES})
+        db.commit()
+        return partition
+    except BaseException:
+        db.rollback()
+        for leftover in (tmp_path, path):
+            if leftover is not None and leftover.exists():
+                leftover.unlink()
+        raise
+
+
+def _record_batch(pa, schema, rows: List[tuple]):
+    columns = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+def archive_cold(
+    db: Session,
+    hot_days: Optional[int] = None,
+    now: Optional[datetime] = None,
+    directory: Optional[Path] = None,
+    vacuum: bool = False,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """
+    Déplace les mesures de plus de `hot_days` jours (défaut : ECOTRACK_HOT_DAYS)
+    vers des fichiers Parquet sous `directory` (défaut : ECOTRACK_COLD_DIR),
+    une transaction par (type, mois), sous le verrou d'écriture.
+
+    Les ids archivés ne sont jamais réattribués (`indicators.id` est en
+    AUTOINCREMENT) : les tiers chaud et froid ne peuvent pas se chevaucher.
+
+    Retourne un résumé : partitions écrites, lignes déplacées, octets écrits / récupérés.
+    """
+    hot_days = config.HOT_DAYS if hot_days is None else hot_days
+    directory = Path(directory or config.COLD_DIR)
+    now = now or datetime.utcnow()
+    # On ne déplace que des journées complètes
+    cutoff = datetime(now.year, now.month, now.day) - timedelta(days=hot_days)
+
+    max_id = db.query(func.max(Indicator.id)).scalar()
+    pending = pending_partitions(db, cutoff, max_id) if max_id is not None else []
+    summary: Dict[str, Any] = {
+        "cutoff": cutoff,
+        "partitions": [],
+        "rows_moved": 0,
+        "bytes_written": 0,
+        "bytes_reclaimed": 0,
+    }
+    if dry_run:
+        summary["partitions"] = [
+            {"type": type_, "month": f"{month:%Y-%m}", "rows": rows} for type_, month, rows in pending
+        ]
+        summary["rows_moved"] = sum(rows for _, _, rows in pending)
+        return summary
+    if pending:
+        _pyarrow()
+
+    bytes_before = db_used_bytes(db)
+    for type_, month, _ in pending:
+        with locks.write_lock():
+            partition = _archive_partition(db, type_, month, cutoff, max_id, directory)
+        if partition is None:
+            continue
+        logger.info("Stockage froid %s %s : %s lignes -> %s", type_, f"{month:%Y-%m}", partition.row_count, partition.path)
+        summary["partitions"].append({
+            "type": type_,
+            "month": f"{month:%Y-%m}",
+            "rows": partition.row_count,
+            "path": partition.path,
+            "size_bytes": partition.size_bytes,
+        })
+        summary["rows_moved"] += partition.row_count
+        summary["bytes_written"] += partition.size_bytes
+
+    if vacuum:
+        # VACUUM rend la place au système de fichiers (verrou exclusif le temps de l'opération)
+        db.commit()
+        with db.get_bind().connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT").exec_driver_sql("VACUUM")
+
+    summary["bytes_reclaimed"] = max(bytes_before - db_used_bytes(db), 0)
+    return summary
+
+
+# --- lecture ---
+
+def cold_partitions(
+    db: Session,
+    type: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> List[ColdPartition]:
+    """
+    Fichiers froids pouvant contenir des mesures de la période (liste vide si
+    la période ne concerne que la table chaude : aucun fichier n'est ouvert).
+    """
+    date_from, date_to = naive_utc(date_from), naive_utc(date_to)
+    query = db.query(ColdPartition)
+    if type:
+        query = query.filter(ColdPartition.type == type)
+    if date_from:
+        query = query.filter(ColdPartition.max_timestamp >= date_from)
+    if date_to:
+        query = query.filter(ColdPartition.min_timestamp <= date_to)
+    return query.order_by(ColdPartition.min_id).all()
+
+
+def matching_partitions(
+    partitions: List[ColdPartition],
+    type: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> List[ColdPartition]:
+    """
+    Même sélection que cold_partitions, sur une liste déjà chargée
+    (plusieurs requêtes d'un même batch).
+    """
+    date_from, date_to = naive_utc(date_from), naive_utc(date_to)
+    return [
+        p for p in partitions
+        if (not type or p.type == type)
+        and (not date_from or p.max_timestamp >= date_from)
+        and (not date_to or p.min_timestamp <= date_to)
+    ]
+
+
+def _expression(
+    zone_id: Optional[int] = None,
+    zone_ids: Optional[Sequence[int]] = None,
+    source_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    exclude_flagged: bool = False,
+):
+    import pyarrow.dataset as ds
+
+    date_from, date_to = naive_utc(date_from), naive_utc(date_to)
+    conditions = []
+    if zone_id:
+        conditions.append(ds.field("zone_id") == zone_id)
+    if zone_ids is not None:
+        conditions.append(ds.field("zone_id").isin(list(zone_ids)))
+    if source_id:
+        conditions.append(ds.field("source_id") == source_id)
+    if date_from:
+        conditions.append(ds.field("timestamp") >= date_from)
+    if date_to:
+        conditions.append(ds.field("timestamp") <= date_to)
+    if exclude_flagged:
+        conditions.append(ds.field("quality_flag") == 0)
+    return functools.reduce(operator.and_, conditions) if conditions else None
+
+
+def scan(partitions: List[ColdPartition], columns: Optional[List[str]] = None, **filters: Any):
+    """
+    Table pyarrow des mesures froides filtrées (mêmes filtres que list_indicators).
+    Les filtres sont poussés dans le scan : seuls les groupes de lignes dont
+    les statistiques min/max peuvent correspondre sont lus.
+    """
+    pa = _pyarrow()
+    dataset = pa.dataset.dataset([p.path for p in partitions], schema=_schema(pa), format="parquet")
+    return dataset.to_table(columns=columns, filter=_expression(**filters))
+
+
+def _id_clusters(partitions: List[ColdPartition]) -> List[List[ColdPartition]]:
+    """
+    Regroupe les partitions (triées par min_id) dont les plages d'ids se
+    chevauchent (types différents archivés sur le même mois) : d'un groupe
+    à l'autre, les ids sont strictement croissants.
+    """
+    clusters: List[List[ColdPartition]] = []
+    high = None
+    for partition in sorted(partitions, key=lambda p: p.min_id):
+        if clusters and partition.min_id <= high:
+            clusters[-1].append(partition)
+            high = max(high, partition.max_id)
+        else:
+            clusters.append([partition])
+            high = partition.max_id
+    return clusters
+
+
+def list_cold(
+    partitions: List[ColdPartition],
+    skip: int,
+    limit: int,
+    **filters: Any,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    (mesures froides [skip, skip + limit[ triées par id, nombre total de mesures froides filtrées).
+
+    Le total est compté fichier par fichier (colonnes des filtres seulement) ;
+    seuls les groupes de partitions qui recoupent la page sont ensuite lus :
+    d'abord leurs ids, puis les lignes complètes des ids retenus.
+    """
+    pa = _pyarrow()
+    schema = _schema(pa)
+    expression = _expression(**filters)
+    rows: List[Dict[str, Any]] = []
+    total = 0
+    for cluster in _id_clusters(partitions):
+        dataset = pa.dataset.dataset([p.path for p in cluster], schema=schema, format="parquet")
+        count = dataset.count_rows(filter=expression)
+        start = total
+        total += count
+        if not count or limit <= 0 or len(rows) >= limit or total <= skip:
+            continue
+        # Page dans ce groupe : [offset, offset + wanted[
+        offset = max(skip - start, 0)
+        wanted = limit - len(rows)
+        ids = dataset.to_table(columns=["id"], filter=expression)["id"]
+        page_ids = pa.compute.sort_indices(ids)[offset:offset + wanted]
+        page_ids = pa.compute.take(ids, page_ids)
+        table = dataset.to_table(filter=pa.dataset.field("id").isin(page_ids))
+        rows.extend(table.sort_by("id").to_pylist())
+    return rows, total
+
+
+def cold_arrays(
+    partitions: List[ColdPartition],
+    columns: Sequence[str],
+    **filters: Any,
+) -> Dict[str, Any]:
+    """
+    Colonnes NumPy des mesures froides filtrées (timestamp en secondes depuis
+    epoch, comme epoch_seconds_column côté SQLite), pour les séries.
+    """
+    pa = _pyarrow()
+    table = scan(partitions, columns=list(columns), **filters)
+    arrays = {}
+    for column in columns:
+        array = table[column]
+        if column == "timestamp":
+            array = pa.compute.divide(array.cast(pa.int64()), 1_000_000)
+        arrays[column] = array.to_numpy()
+    return arrays
+
+
+def cold_stats(partitions: List[ColdPartition], group_by: Sequence[str] = (), **filters: Any) -> ColdStats:
+    """
+    {clé de regroupement: (count, min, max, somme)} des mesures froides filtrées
+    (clé () sans regroupement).
+    """
+    table = scan(partitions, columns=[*group_by, "value"], **filters)
+    if not table.num_rows:
+        return {}
+    grouped = table.group_by(list(group_by)).aggregate([
+        ("value", "count"),
+        ("value", "min"),
+        ("value", "max"),
+        ("value", "sum"),
+    ])
+    result: ColdStats = {}
+    for row in grouped.to_pylist():
+        key = tuple(row[column] for column in group_by)
+        result[key] = (row["value_count"], row["value_min"], row["value_max"], row["value_sum"])
+    return result
+
+
+def merge_stats(hot: Dict[str, Any], cold: Optional[Tuple[int, float, float, float]]) -> Dict[str, Any]:
+    """
+    Combine des stats de la table chaude (format de crud.indicator_stats) et du stockage froid.
+    """
+    if not cold:
+        return hot
+    count, min_value, max_value, total = cold
+    if not hot["count"]:
+        return {"count": count, "min_value": min_value, "max_value": max_value, "avg_value": total / count}
+    merged_count = hot["count"] + count
+    return {
+        "count": merged_count,
+        "min_value": min(hot["min_value"], min_value),
+        "max_value": max(hot["max_value"], max_value),
+        "avg_value": (hot["avg_value"] * hot["count"] + total) / merged_count,
+    }
@@ -0,0 +1,305 @@
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import Integer, cast, func
+from sqlalchemy.orm import Session
+
+from .models import Indicator
+
+_DURATION_RE = re.compile(r"^\s*(\d+)\s*([smhdw])\s*$")
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+AGGREGATES = {
+    "avg": func.avg,
+    "min": func.min,
+    "max": func.max,
+}
+
+
+def parse_duration(raw: str) -> int:
+    """
+    Convertit une durée du type "15m", "8h", "1d", "1w" en secondes.
+    """
+    match = _DURATION_RE.match(raw or "")
+    if not match:
+        raise ValueError(f"Durée invalide : {raw!r} (ex. 15m, 1h, 1d, 1w)")
+    seconds = int(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+    if seconds <= 0:
+        raise ValueError(f"Durée invalide : {raw!r}")
+    return seconds
+
+
+def parse_id_list(raw: str) -> List[int]:
+    """
+    "1,2,3" -> [1, 2, 3] (doublons retirés, ordre conservé).
+    """
+    ids: List[int] = []
+    for part in (raw or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if not part.isdigit():
+            raise ValueError(f"Identifiant invalide : {part!r}")
+        value = int(part)
+        if value not in ids:
+            ids.append(value)
+    if not ids:
+        raise ValueError("Liste d'identifiants vide")
+    return ids
+
+
+def epoch_seconds_column():
+    """
+    Expression SQL : timestamp de la mesure en secondes depuis epoch (UTC).
+    """
+    return cast(func.strftime("%s", Indicator.timestamp), Integer)
+
+
+def epoch_to_datetimes(stamps: np.ndarray) -> List[datetime]:
+    return [
+        datetime.fromtimestamp(int(s), tz=timezone.utc).replace(tzinfo=None)
+        for s in stamps
+    ]
+
+
+def _cold(db: Session, type: str, columns: List[str], **filters: Any) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Colonnes des mesures froides de la série (None si la période ne recoupe
+    aucun fichier du stockage froid).
+    """
+    from . import tiering
+
+    partitions = tiering.cold_partitions(db, type, filters.get("date_from"), filters.get("date_to"))
+    if not partitions:
+        return None
+    return tiering.cold_arrays(partitions, columns, **filters)
+
+
+def mirror_columns(db: Session, columns: List[str], **filters: Any) -> Dict[str, np.ndarray]:
+    """
+    Colonnes des mesures de la table chaude lues dans le miroir colonnaire
+    (engine=columnar, voir app/analytics.py) au lieu d'une requête SQL.
+    """
+    from . import analytics
+
+    analytics.mirror.refresh(db)
+    return analytics.mirror.select(columns, **filters)
+
+
+def _group(keys: np.ndarray, sums, counts, mins, maxs):
+    """
+    Fusionne des agrégats partiels (somme, nombre, min, max) de même clé.
+    """
+    unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    total = np.zeros(len(unique))
+    count = np.zeros(len(unique))
+    low = np.full(len(unique), np.inf)
+    high = np.full(len(unique), -np.inf)
+    np.add.at(total, inverse, sums)
+    np.add.at(count, inverse, counts)
+    np.minimum.at(low, inverse, mins)
+    np.maximum.at(high, inverse, maxs)
+    return unique, {"avg": total / count, "min": low, "max": high}
+
+
+def compare_series(
+    db: Session,
+    type: str,
+    zone_ids: List[int],
+    bucket_seconds: int,
+    agg: str = "avg",
+    source_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    engine: str = "sql",
+) -> Dict[str, Any]:
+    """
+    Agrège la série `type` de chaque zone par tranche de `bucket_seconds`
+    (une seule requête GROUP BY zone_id, tranche, ou le miroir colonnaire avec
+    engine="columnar") puis aligne toutes les zones sur un index temporel
+    commun. Les tranches sans mesure valent None. Les mesures du stockage froid
+    sont agrégées de la même façon et fusionnées (une tranche peut chevaucher les deux).
+    """
+    if engine == "columnar":
+        hot = mirror_columns(
+            db, ["zone_id", "ts", "value"],
+            type=type, zone_ids=zone_ids, source_id=source_id, date_from=date_from, date_to=date_to,
+        )
+        values = hot["value"]
+        parts = [np.column_stack([hot["zone_id"].astype(np.int64), (hot["ts"] // bucket_seconds) * bucket_seconds])]
+        stats = [np.column_stack([values, np.ones(len(values)), values, values])]
+    else:
+        bucket = (epoch_seconds_column() // bucket_seconds) * bucket_seconds
+
+        query = db.query(
+            Indicator.zone_id,
+            bucket,
+            func.sum(Indicator.value),
+            func.count(Indicator.value),
+            func.min(Indicator.value),
+            func.max(Indicator.value),
+        ).filter(Indicator.type == type, Indicator.zone_id.in_(zone_ids))
+
+        if source_id:
+            query = query.filter(Indicator.source_id == source_id)
+        if date_from:
+            query = query.filter(Indicator.timestamp >= date_from)
+        if date_to:
+            query = query.filter(Indicator.timestamp <= date_to)
+
+        rows = query.group_by(Indicator.zone_id, bucket).all()
+        parts = [np.array([r[:2] for r in rows], dtype=np.int64).reshape(-1, 2)]
+        stats = [np.array([r[2:] for r in rows], dtype=np.float64).reshape(-1, 4)]
+
+    cold = _cold(
+        db, type, ["zone_id", "timestamp", "value"],
+        zone_ids=zone_ids, source_id=source_id, date_from=date_from, date_to=date_to,
+    )
+    if cold is not None and len(cold["value"]):
+        values = cold["value"]
+        parts.append(np.column_stack([cold["zone_id"], (cold["timestamp"] // bucket_seconds) * bucket_seconds]))
+        stats.append(np.column_stack([values, np.ones(len(values)), values, values]))
+
+    keys = np.concatenate(parts)
+    if not len(keys):
+        return {
+            "timestamps": [],
+            "series": [{"zone_id": zone_id, "values": []} for zone_id in zone_ids],
+        }
+    partial = np.concatenate(stats)
+    keys, aggregates = _group(keys, *partial.T)
+    zones, stamps, values = keys[:, 0], keys[:, 1], aggregates[agg]
+
+    # Index temporel commun + position de chaque point dans la matrice zones x tranches
+    index = np.unique(stamps)
+    cols = np.searchsorted(index, stamps)
+
+    requested = np.asarray(zone_ids, dtype=np.int64)
+    order = np.argsort(requested)
+    row_pos = order[np.searchsorted(requested[order], zones)]
+
+    matrix = np.full((len(requested), len(index)), np.nan)
+    matrix[row_pos, cols] = values
+
+    aligned = matrix.astype(object)
+    aligned[np.isnan(matrix)] = None
+
+    return {
+        "timestamps": epoch_to_datetimes(index),
+        "series": [
+            {"zone_id": zone_id, "values": aligned[i].tolist()}
+            for i, zone_id in enumerate(zone_ids)
+        ],
+    }
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets : indices des `max_points` points (au plus)
+    qui conservent le mieux l'allure de la courbe (x croissants).
+
+    Le premier et le dernier point sont gardés ; les autres sont répartis en
+    max_points - 2 tranches, et l'on garde dans chaque tranche le point qui forme
+    le plus grand triangle avec le point retenu juste avant et la moyenne de la
+    tranche suivante. Les pics sont donc conservés, contrairement à une moyenne.
+    Les moyennes de tranches sont calculées d'un bloc (np.add.reduceat) ; seul le
+    choix du point, qui dépend du précédent, est fait tranche par tranche.
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64) - x[0]  # précision des produits sur des epoch
+    y = np.asarray(y, dtype=np.float64)
+
+    # Bornes des tranches sur les points 1..n-2 (chaque tranche est non vide)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:-1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+    # Point "suivant" de chaque tranche : moyenne de la tranche d'après, puis le dernier point
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        # Double de l'aire du triangle (a, point candidat, moyenne suivante)
+        area = np.abs(
+            (x[a] - next_x[i]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (next_y[i] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_series(
+    db: Session,
+    type: str,
+    max_points: int,
+    zone_id: Optional[int] = None,
+    source_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    engine: str = "sql",
+) -> Dict[str, Any]:
+    """
+    Série brute (timestamp, valeur) du type demandé, triée par date (stockage
+    froid compris ; table chaude lue en SQL ou dans le miroir colonnaire),
+    réduite à `max_points` points au plus par LTTB : la taille de la réponse
+    ne dépend plus de la durée de la période.
+    """
+    if engine == "columnar":
+        hot = mirror_columns(
+            db, ["id", "ts", "value"],
+            type=type, zone_id=zone_id, source_id=source_id, date_from=date_from, date_to=date_to,
+        )
+        order = np.lexsort((hot["id"], hot["ts"]))
+        stamps, values = hot["ts"][order], hot["value"][order]
+    else:
+        query = db.query(epoch_seconds_column(), Indicator.value).filter(Indicator.type == type)
+        if zone_id:
+            query = query.filter(Indicator.zone_id == zone_id)
+        if source_id:
+            query = query.filter(Indicator.source_id == source_id)
+        if date_from:
+            query = query.filter(Indicator.timestamp >= date_from)
+        if date_to:
+            query = query.filter(Indicator.timestamp <= date_to)
+
+        rows = query.order_by(Indicator.timestamp, Indicator.id).all()
+        stamps = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        values = np.fromiter((r[1] for r in rows), dtype=np.float64, count=len(rows))
+
+    hot_count = len(stamps)
+    cold = _cold(
+        db, type, ["id", "timestamp", "value"],
+        zone_id=zone_id, source_id=source_id, date_from=date_from, date_to=date_to,
+    )
+    if cold is not None and len(cold["value"]):
+        # Mesures froides (plus anciennes) triées par date puis id, placées avant les chaudes
+        order = np.lexsort((cold["id"], cold["timestamp"]))
+        stamps = np.concatenate([cold["timestamp"][order], stamps])
+        values = np.concatenate([cold["value"][order], values])
+        if hot_count:
+            order = np.argsort(stamps, kind="stable")
+            stamps, values = stamps[order], values[order]
+
+    # Les valeurs non finies (NaN importés) ne sont pas tracées
+    finite = np.isfinite(values)
+    stamps, values = stamps[finite], values[finite]
+
+    keep = lttb_indices(stamps, values, max_points)
+    return {
+        "total_points": len(stamps),
+        "points": [
+            {"timestamp": stamp, "value": value}
+            for stamp, value in zip(epoch_to_datetimes(stamps[keep]), values[keep].tolist())
+        ],
+    }
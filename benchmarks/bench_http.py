@@ -0,0 +1,137 @@
+"""
+Test de charge des routes HTTP, en process via un client ASGI (sans réseau).
+
+    python benchmarks/bench_http.py --rows 100k --requests 500 --concurrency 16
+    python benchmarks/bench_http.py --scenarios list,stats --output results.jsonl
+
+La base est remplie comme dans bench_queries.py, puis chaque scénario envoie
+--requests requêtes avec --concurrency requêtes simultanées. On mesure le
+débit, les percentiles de latence et la répartition des codes HTTP.
+Le lifespan de l'application est exécuté (ingestion différée, schéma...).
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import Counter
+
+from common import emit, format_size, parse_size, setup_workdir, summarize
+
+EMAIL = "bench@ecotrack.fr"
+PASSWORD = "benchmark"
+
+
+def scenarios(ctx: dict) -> dict:
+    """
+    nom -> fonction (i) -> (méthode, url, kwargs httpx)
+    """
+    zone, other = ctx["zone_id"], ctx["zone_id"] + 1
+    window = f"date_from={ctx['date_from'].isoformat()}&date_to={ctx['date_to'].isoformat()}"
+    return {
+        "zones": lambda i: ("GET", "/api/zones", {}),
+        "list": lambda i: ("GET", f"/api/indicators?type=NO2&zone_id={zone}&limit=100", {}),
+        "list_etag": lambda i: (
+            "GET",
+            f"/api/indicators?type=NO2&zone_id={zone}&limit=100",
+            {"headers": {"If-None-Match": ctx["etag"]}},
+        ),
+        "stats": lambda i: ("GET", f"/api/indicators/stats?type=NO2&{window}", {}),
+        "stats_columnar": lambda i: ("GET", f"/api/indicators/stats?type=NO2&{window}&engine=columnar", {}),
+        "compare": lambda i: ("GET", f"/api/indicators/compare?type=NO2&zone_ids={zone},{other}&bucket=1d", {}),
+        "rolling": lambda i: ("GET", f"/api/indicators/rolling?type=O3&zone_id={zone}&window=8h", {}),
+        "post": lambda i: (
+            "POST",
+            "/api/indicators",
+            {"json": {
+                "source_id": ctx["source_id"],
+                "zone_id": zone,
+                "type": "NO2",
+                "value": float(i % 100),
+                "unit": "µg/m³",
+                "timestamp": ctx["date_to"].isoformat(),
+            }},
+        ),
+    }
+
+
+async def run_scenario(client, make_request, requests: int, concurrency: int) -> dict:
+    latencies = []
+    statuses = Counter()
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            method, url, kwargs = make_request(i)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            statuses[str(response.status_code)] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests_per_second": round(requests / elapsed, 1),
+        **summarize(latencies),
+        "status": dict(sorted(statuses.items())),
+    }
+
+
+async def run(args, ctx: dict) -> None:
+    import httpx
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        # Le journal INFO de httpx (une ligne par requête) fausserait les mesures
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.post("/register", json={"email": EMAIL, "password": PASSWORD})
+            token = (await client.post(
+                "/login", data={"username": EMAIL, "password": PASSWORD}
+            )).json()["access_token"]
+            client.headers["Authorization"] = f"Bearer {token}"
+
+            ctx["etag"] = (await client.get(
+                f"/api/indicators?type=NO2&zone_id={ctx['zone_id']}&limit=100"
+            )).headers.get("ETag", "")
+
+            available = scenarios(ctx)
+            names = list(available) if args.scenarios == "all" else args.scenarios.split(",")
+            for name in names:
+                # Premier appel hors mesure (caches, miroir colonnaire...)
+                method, url, kwargs = available[name](0)
+                await client.request(method, url, **kwargs)
+                metrics = await run_scenario(client, available[name], args.requests, args.concurrency)
+                emit(
+                    "http",
+                    {
+                        "scenario": name,
+                        "rows": format_size(args.rows),
+                        "requests": args.requests,
+                        "concurrency": args.concurrency,
+                    },
+                    metrics,
+                    args.output,
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=parse_size, default=parse_size("100k"))
+    parser.add_argument("--scenarios", default="all")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", help="fichier JSON Lines où ajouter les résultats")
+    args = parser.parse_args()
+
+    setup_workdir()
+    from bench_queries import seed
+
+    ctx = seed(args.rows)
+    asyncio.run(run(args, ctx))
+
+
+if __name__ == "__main__":
+    main()
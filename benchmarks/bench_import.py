@@ -0,0 +1,88 @@
+"""
+Débit des importeurs CSV (app.importer) sur des fichiers synthétiques.
+
+    python benchmarks/bench_import.py --rows 10k
+    python benchmarks/bench_import.py --dataset fr_e2 --rows 10k,1M --runs 3 --output results.jsonl
+    python benchmarks/bench_import.py --dataset fr_e2 --rows 1M --parser rows,columnar
+
+Pour chaque jeu de données et chaque taille, le fichier est généré une fois
+(benchmarks/.data), puis importé --runs fois dans une base vide ; le meilleur
+essai est retenu. 1M / 10M lignes demandent plusieurs minutes et beaucoup
+de mémoire : les importeurs gardent toute la transaction en session.
+"""
+import argparse
+import time
+
+from common import emit, format_size, parse_size, reset_database, setup_workdir
+from datagen import DATASETS, cached_dataset
+
+# dataset -> nom de la fonction d'import dans app.importer
+IMPORTERS = {
+    "generic": "import_indicators_from_csv",
+    "fr_e2": "import_fr_e2_dataset",
+    "ind_atmo": "import_ind_atmo_dataset",
+}
+
+
+def run_import(dataset: str, path, parser: str) -> dict:
+    from app import importer
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        with open(path, encoding="utf-8", newline="") as f:
+            start = time.perf_counter()
+            # Même chemin que IMPORTERS[dataset], avec le moteur de parsing choisi
+            result = importer.run_import(importer.DATASETS[dataset], db, f, parser=parser)
+            seconds = time.perf_counter() - start
+    finally:
+        db.close()
+    return {"seconds": seconds, "inserted": result["inserted"], "errors": len(result["errors"])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dataset", choices=[*DATASETS, "all"], default="all")
+    parser.add_argument("--rows", default="10k", help="tailles séparées par des virgules : 10k,1M,10M")
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--parser", default="rows", help="moteurs de parsing séparés par des virgules : rows,columnar")
+    parser.add_argument("--output", help="fichier JSON Lines où ajouter les résultats")
+    args = parser.parse_args()
+
+    datasets = DATASETS if args.dataset == "all" else (args.dataset,)
+    sizes = [parse_size(size) for size in args.rows.split(",")]
+    setup_workdir()
+
+    for dataset in datasets:
+        for rows in sizes:
+            path = cached_dataset(dataset, rows, error_rate=args.error_rate)
+            for engine in args.parser.split(","):
+                runs = []
+                for _ in range(args.runs):
+                    reset_database()
+                    runs.append(run_import(dataset, path, engine))
+                best = min(runs, key=lambda r: r["seconds"])
+                emit(
+                    "import",
+                    {
+                        "dataset": dataset,
+                        "function": IMPORTERS[dataset],
+                        "parser": engine,
+                        "rows": format_size(rows),
+                        "error_rate": args.error_rate,
+                    },
+                    {
+                        "seconds": round(best["seconds"], 3),
+                        "rows_per_second": round(rows / best["seconds"], 1),
+                        "inserted": best["inserted"],
+                        "errors": best["errors"],
+                        "file_mb": round(path.stat().st_size / 1e6, 2),
+                        "runs": len(runs),
+                    },
+                    args.output,
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Latence de crud.list_indicators / crud.indicator_stats selon les filtres.
+
+    python benchmarks/bench_queries.py --rows 1M --runs 50
+    python benchmarks/bench_queries.py --rows 100k --filters type,type+zone --output results.jsonl
+
+La base est remplie directement (insert en masse, même répartition que
+datagen.py : NB_ZONES zones x 5 polluants par heure), puis chaque
+combinaison de filtres est exécutée --runs fois après --warmup essais.
+Les stats sont aussi mesurées sur le miroir colonnaire (engine=columnar).
+"""
+import argparse
+import random
+import time
+from datetime import timedelta
+
+from common import emit, format_size, parse_size, reset_database, setup_workdir, summarize
+from datagen import ORGANISMES, POLLUTANTS, START
+
+NB_ZONES = 50
+INSERT_CHUNK = 50_000
+# Fenêtre des filtres par date : une semaine au milieu des données
+WINDOW = timedelta(days=7)
+
+FILTERS = {
+    "none": lambda ctx: {},
+    "type": lambda ctx: {"type": "NO2"},
+    "zone": lambda ctx: {"zone_id": ctx["zone_id"]},
+    "source": lambda ctx: {"source_id": ctx["source_id"]},
+    "range": lambda ctx: {"date_from": ctx["date_from"], "date_to": ctx["date_to"]},
+    "type+zone": lambda ctx: {"type": "NO2", "zone_id": ctx["zone_id"]},
+    "type+range": lambda ctx: {"type": "NO2", "date_from": ctx["date_from"], "date_to": ctx["date_to"]},
+    "type+zone+range": lambda ctx: {
+        "type": "NO2",
+        "zone_id": ctx["zone_id"],
+        "date_from": ctx["date_from"],
+        "date_to": ctx["date_to"],
+    },
+}
+
+
+def seed(rows: int, seed: int = 42) -> dict:
+    """
+    Remplit une base vide et retourne le contexte des filtres (ids, fenêtre de dates).
+    """
+    from sqlalchemy import insert
+
+    from app.database import SessionLocal
+    from app.models import Indicator, Source, Zone
+
+    reset_database()
+    rng = random.Random(seed)
+    db = SessionLocal()
+    try:
+        sources = [Source(name=name, description="", url="") for name in ORGANISMES]
+        zones = [Zone(name=f"Zone {i:03d}") for i in range(NB_ZONES)]
+        db.add_all(sources + zones)
+        db.flush()
+
+        per_hour = NB_ZONES * len(POLLUTANTS)
+        batch = []
+        for i in range(rows):
+            hour, slot = divmod(i, per_hour)
+            zone, pollutant = divmod(slot, len(POLLUTANTS))
+            name, mean = POLLUTANTS[pollutant]
+            batch.append({
+                "source_id": sources[zone % len(sources)].id,
+                "zone_id": zones[zone].id,
+                "type": name,
+                "value": max(0.0, rng.gauss(mean, mean / 3)),
+                "unit": "µg/m³",
+                "timestamp": START + timedelta(hours=hour),
+            })
+            if len(batch) >= INSERT_CHUNK:
+                db.execute(insert(Indicator), batch)
+                batch = []
+        if batch:
+            db.execute(insert(Indicator), batch)
+        db.commit()
+
+        middle = START + timedelta(hours=rows // per_hour // 2)
+        return {
+            "zone_id": zones[NB_ZONES // 2].id,
+            "source_id": sources[0].id,
+            "date_from": middle,
+            "date_to": middle + WINDOW,
+        }
+    finally:
+        db.close()
+
+
+def measure(fn, filters: dict, runs: int, warmup: int) -> dict:
+    from app.database import SessionLocal
+
+    samples = []
+    db = SessionLocal()
+    try:
+        for i in range(warmup + runs):
+            start = time.perf_counter()
+            fn(db, **filters)
+            elapsed = time.perf_counter() - start
+            if i >= warmup:
+                samples.append(elapsed)
+    finally:
+        db.close()
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=parse_size, default=parse_size("100k"))
+    parser.add_argument("--filters", default="all", help=f"parmi : {', '.join(FILTERS)}")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--limit", type=int, default=100, help="limit de list_indicators")
+    parser.add_argument("--output", help="fichier JSON Lines où ajouter les résultats")
+    args = parser.parse_args()
+
+    names = list(FILTERS) if args.filters == "all" else args.filters.split(",")
+    setup_workdir()
+
+    start = time.perf_counter()
+    ctx = seed(args.rows)
+    print(f"# base remplie : {args.rows} lignes en {time.perf_counter() - start:.1f} s", flush=True)
+
+    from app import analytics, crud
+
+    targets = {
+        "list_indicators": lambda db, **f: crud.list_indicators(db, limit=args.limit, **f),
+        "indicator_stats": crud.indicator_stats,
+        "indicator_stats[columnar]": analytics.indicator_stats,
+    }
+    for name in names:
+        filters = FILTERS[name](ctx)
+        for target, fn in targets.items():
+            emit(
+                "query",
+                {"function": target, "filters": name, "rows": format_size(args.rows)},
+                measure(fn, filters, args.runs, args.warmup),
+                args.output,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Débit de POST /api/indicators unitaires, en mode synchrone ou write-behind.
+
+    python benchmarks/bench_single_post.py --mode sync --requests 2000
+    python benchmarks/bench_single_post.py --mode write-behind --requests 2000 --concurrency 16
+
+Le benchmark tourne dans un dossier temporaire (base SQLite et journal neufs)
+et appelle l'application en process via le client de test ASGI.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import emit, setup_workdir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mode", choices=["sync", "write-behind"], default="sync")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--output", help="fichier JSON Lines où ajouter les résultats")
+    args = parser.parse_args()
+
+    setup_workdir()
+    os.environ["ECOTRACK_WRITE_BEHIND"] = "1" if args.mode == "write-behind" else "0"
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app import ingest_buffer
+
+    with TestClient(app) as client:
+        client.post("/register", json={"email": "bench@ecotrack.fr", "password": "benchmark"})
+        token = client.post(
+            "/login", data={"username": "bench@ecotrack.fr", "password": "benchmark"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        client.post("/api/zones", json={"name": "Bench"}, headers=headers)
+        client.post("/api/sources", json={"name": "Bench"}, headers=headers)
+
+        def post(i):
+            payload = {
+                "source_id": 1,
+                "zone_id": 1,
+                "type": "NO2",
+                "value": float(i % 100),
+                "unit": "µg/m³",
+                "timestamp": f"2025-01-01T{i % 24:02d}:00:00",
+            }
+            return client.post("/api/indicators", json=payload, headers=headers).status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            statuses = list(pool.map(post, range(args.requests)))
+        acked = time.perf_counter() - start
+
+        # En write-behind, on attend que tout soit réellement en base
+        while ingest_buffer.buffer is not None and ingest_buffer.buffer.pending:
+            time.sleep(0.01)
+        durable = time.perf_counter() - start
+
+    emit(
+        "single_post",
+        {"mode": args.mode, "requests": args.requests, "concurrency": args.concurrency},
+        {
+            "ok": sum(1 for s in statuses if s in (201, 202)),
+            "rejected": sum(1 for s in statuses if s == 503),
+            "ack_seconds": round(acked, 3),
+            "total_seconds": round(durable, 3),
+            "requests_per_second": round(args.requests / acked, 1),
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
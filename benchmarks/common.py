@@ -0,0 +1,136 @@
+"""
+Utilitaires partagés par les benchmarks : dossier de travail jetable,
+tailles lisibles ("10k", "1M"), percentiles et sortie JSON comparable.
+
+Chaque benchmark produit des résultats de la forme
+    {"benchmark": ..., "params": {...}, "metrics": {...}, "env": {...}}
+une ligne JSON par résultat sur stdout, et en plus dans --output si donné
+(fichier JSON Lines, relu par benchmarks/compare.py).
+"""
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+# Fichiers CSV générés, réutilisés d'une exécution à l'autre
+DATA_DIR = ROOT / "benchmarks" / ".data"
+
+_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_size(raw: str) -> int:
+    """
+    "10k" -> 10_000, "1M" -> 1_000_000, "2500" -> 2500.
+    """
+    raw = raw.strip().lower().replace("_", "")
+    if raw and raw[-1] in _SUFFIXES:
+        return int(float(raw[:-1]) * _SUFFIXES[raw[-1]])
+    return int(raw)
+
+
+def format_size(rows: int) -> str:
+    for suffix, factor in (("M", 1_000_000), ("k", 1_000)):
+        if rows >= factor and rows % factor == 0:
+            return f"{rows // factor}{suffix}"
+    return str(rows)
+
+
+def setup_workdir(prefix: str = "ecotrack-bench-") -> Path:
+    """
+    Se place dans un dossier temporaire neuf (ecotrack.db, journal d'ingestion
+    et miroir colonnaire y sont créés) et rend le paquet `app` importable.
+
+    À appeler AVANT d'importer `app` : l'URL de la base est relative au
+    dossier courant.
+    """
+    workdir = Path(tempfile.mkdtemp(prefix=prefix))
+    os.chdir(workdir)
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    return workdir
+
+
+def reset_database() -> None:
+    """
+    Vide la base de benchmark (tables recréées à l'identique).
+    """
+    from app import models  # noqa: F401  (enregistre les tables sur Base)
+    from app.database import Base, engine
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Statistiques de latence (millisecondes) d'une série de mesures en secondes.
+    """
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+        return ordered[index] * 1000
+
+    return {
+        "runs": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(pct(50), 3),
+        "p95_ms": round(pct(95), 3),
+        "p99_ms": round(pct(99), 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def env_info() -> Dict[str, Any]:
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def emit(
+    benchmark: str,
+    params: Dict[str, Any],
+    metrics: Dict[str, Any],
+    output: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Affiche un résultat (une ligne JSON) et l'ajoute au fichier `output`.
+    """
+    result = {"benchmark": benchmark, "params": params, "metrics": metrics, "env": env_info()}
+    line = json.dumps(result, ensure_ascii=False)
+    print(line, flush=True)
+    if output:
+        with open(output, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    return result
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    """
+    Identifiant stable d'un résultat (benchmark + paramètres), pour comparer deux exécutions.
+    """
+    return result["benchmark"] + json.dumps(result["params"], sort_keys=True, ensure_ascii=False)
@@ -0,0 +1,69 @@
+"""
+Compare deux exécutions de benchmarks (fichiers JSON Lines de --output).
+
+    python benchmarks/compare.py avant.jsonl apres.jsonl --threshold 10
+
+Les résultats sont appariés par benchmark + paramètres. Pour chaque métrique
+numérique, on affiche la variation relative ; une dégradation au-delà de
+--threshold % (latence plus haute ou débit plus bas) fait sortir en erreur.
+"""
+import argparse
+import json
+import sys
+from typing import Dict
+
+from common import result_key
+
+# Métriques pour lesquelles une valeur plus haute est meilleure
+HIGHER_IS_BETTER = ("rows_per_second", "requests_per_second")
+# Métriques comparées (les autres sont des compteurs informatifs)
+COMPARED_SUFFIXES = ("_ms", "seconds", "_per_second")
+
+
+def load(path: str) -> Dict[str, dict]:
+    results = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                result = json.loads(line)
+                # En cas de doublon, la dernière mesure l'emporte
+                results[result_key(result)] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="dégradation tolérée en %%")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    regressions = []
+
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key]["metrics"], candidate[key]["metrics"]
+        label = f"{candidate[key]['benchmark']} {json.dumps(candidate[key]['params'], ensure_ascii=False)}"
+        print(label)
+        for metric, old in before.items():
+            new = after.get(metric)
+            if not metric.endswith(COMPARED_SUFFIXES) or not isinstance(old, (int, float)) or not old:
+                continue
+            if not isinstance(new, (int, float)):
+                continue
+            change = (new - old) / old * 100
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = "  REGRESSION" if worse > args.threshold else ""
+            print(f"  {metric:<22} {old:>12} -> {new:<12} {change:+7.1f} %{flag}")
+            if flag:
+                regressions.append(f"{label} {metric} {change:+.1f} %")
+
+    for key in sorted(baseline.keys() - candidate.keys()):
+        print(f"absent de {args.candidate} : {key}")
+
+    if regressions:
+        sys.exit("Régressions au-delà de {:.0f} % :\n  {}".format(args.threshold, "\n  ".join(regressions)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Générateur de CSV synthétiques au format des jeux de données importés.
+
+    python benchmarks/datagen.py --dataset fr_e2 --rows 1M --output fr_e2_1M.csv
+    python benchmarks/datagen.py --dataset ind_atmo --rows 10k --error-rate 0.01
+
+Les fichiers ont les mêmes en-têtes, séparateurs et formats (dates, virgule
+décimale) que les fichiers FR_E2 / ind_atmo réels. La génération est
+déterministe (--seed) et en flux : 10M lignes ne tiennent jamais en mémoire.
+Une fraction --error-rate de lignes est volontairement invalide, pour
+mesurer aussi le chemin d'erreur des importeurs.
+"""
+import argparse
+import csv
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from common import DATA_DIR, format_size, parse_size
+
+DATASETS = ("generic", "fr_e2", "ind_atmo")
+
+START = datetime(2025, 1, 1)
+POLLUTANTS = [("NO2", 40.0), ("O3", 70.0), ("PM10", 25.0), ("PM2.5", 15.0), ("SO2", 5.0)]
+ORGANISMES = ["ATMO AURA", "AIRPARIF", "ATMO SUD", "ATMO GRAND EST", "ATMO HDF", "AIR BREIZH"]
+QUALIFICATIFS = ["Bon", "Moyen", "Dégradé", "Mauvais", "Très mauvais", "Extrêmement mauvais"]
+
+FR_E2_HEADER = [
+    "Date de début", "Date de fin", "Organisme", "code zas", "Zas", "code site",
+    "nom site", "type d'implantation", "Polluant", "type d'influence",
+    "discriminant", "Réglementaire", "type d'évaluation", "procédure de mesure",
+    "type de valeur", "valeur", "valeur brute", "unité de mesure",
+    "taux de saisie", "couverture temporelle", "couverture de données",
+    "code qualité", "validité",
+]
+IND_ATMO_HEADER = [
+    "date_ech", "code_qual", "lib_qual", "coul_qual", "date_dif", "source",
+    "type_zone", "code_zone", "lib_zone", "code_no2", "code_so2", "code_o3",
+    "code_pm10", "code_pm25", "x_wgs84", "y_wgs84", "x_reg", "y_reg", "epsg_reg",
+]
+GENERIC_HEADER = ["source_name", "zone_name", "type", "value", "unit", "timestamp", "metadata"]
+
+
+def _fr_value(value: float) -> str:
+    return f"{value:.1f}".replace(".", ",")
+
+
+def _fr_e2_rows(rows: int, zones: int, rng: random.Random) -> Iterator[List[str]]:
+    # Un site par zone, tous les polluants chaque heure
+    per_hour = zones * len(POLLUTANTS)
+    for i in range(rows):
+        hour, slot = divmod(i, per_hour)
+        zone, pollutant = divmod(slot, len(POLLUTANTS))
+        name, mean = POLLUTANTS[pollutant]
+        start = START + timedelta(hours=hour)
+        value = max(0.0, rng.gauss(mean, mean / 3))
+        organisme = ORGANISMES[zone % len(ORGANISMES)]
+        yield [
+            start.strftime("%Y/%m/%d %H:%M:%S"),
+            (start + timedelta(hours=1)).strftime("%Y/%m/%d %H:%M:%S"),
+            organisme, f"FR{zone:05d}", f"ZAS {zone:03d}", f"FR{zone:05d}A",
+            f"Site {zone:03d}", "Urbaine", name, "Fond",
+            "A", "Oui", "mesures fixes", "Auto", "moyenne horaire",
+            _fr_value(value), _fr_value(value), "µg-m3",
+            "100", "100", "100", "A", "1",
+        ]
+
+
+def _ind_atmo_rows(rows: int, zones: int, rng: random.Random) -> Iterator[List[str]]:
+    # Un indice par commune et par jour
+    for i in range(rows):
+        day, zone = divmod(i, zones)
+        date = (START + timedelta(days=day)).strftime("%Y-%m-%d")
+        codes = [rng.choices(range(1, 7), weights=(30, 40, 15, 10, 4, 1))[0] for _ in range(5)]
+        code_qual = max(codes)
+        yield [
+            date, str(code_qual), QUALIFICATIFS[code_qual - 1], "#50F0E6", date,
+            ORGANISMES[zone % len(ORGANISMES)], "commune", f"{zone:05d}",
+            f"Commune {zone:04d}", *map(str, codes),
+            f"{2 + zone % 500 / 100:.4f}", f"{43 + zone % 700 / 100:.4f}",
+            "", "", "2154",
+        ]
+
+
+def _generic_rows(rows: int, zones: int, rng: random.Random) -> Iterator[List[str]]:
+    per_hour = zones * len(POLLUTANTS)
+    for i in range(rows):
+        hour, slot = divmod(i, per_hour)
+        zone, pollutant = divmod(slot, len(POLLUTANTS))
+        name, mean = POLLUTANTS[pollutant]
+        yield [
+            ORGANISMES[zone % len(ORGANISMES)], f"Zone {zone:03d}", name,
+            f"{max(0.0, rng.gauss(mean, mean / 3)):.2f}", "µg/m³",
+            (START + timedelta(hours=hour)).isoformat(), "",
+        ]
+
+
+# dataset -> (en-tête, séparateur, générateur, colonnes (date, valeur) à corrompre, nb de zones par défaut)
+SPECS: Dict[str, tuple] = {
+    "generic": (GENERIC_HEADER, ",", _generic_rows, (5, 3), 50),
+    "fr_e2": (FR_E2_HEADER, ";", _fr_e2_rows, (0, 15), 50),
+    "ind_atmo": (IND_ATMO_HEADER, ",", _ind_atmo_rows, (0, 1), 500),
+}
+
+
+def generate(
+    dataset: str,
+    rows: int,
+    path: Path,
+    zones: int = 0,
+    error_rate: float = 0.0,
+    seed: int = 42,
+) -> Path:
+    """
+    Écrit `rows` lignes de `dataset` dans `path` et retourne le chemin.
+    """
+    header, delimiter, row_factory, (date_col, value_col), default_zones = SPECS[dataset]
+    rng = random.Random(seed)
+
+    def corrupt(row: List[str]) -> None:
+        if rng.random() < 0.5:
+            row[date_col] = "pas une date"
+        else:
+            row[value_col] = "n/a"
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(header)
+        for row in row_factory(rows, zones or default_zones, rng):
+            if error_rate and rng.random() < error_rate:
+                corrupt(row)
+            writer.writerow(row)
+    return path
+
+
+def cached_dataset(dataset: str, rows: int, error_rate: float = 0.0, seed: int = 42) -> Path:
+    """
+    Chemin d'un fichier généré dans benchmarks/.data, créé s'il n'existe pas encore.
+    """
+    name = f"{dataset}_{format_size(rows)}_e{error_rate:g}_s{seed}.csv"
+    path = DATA_DIR / name
+    if not path.exists():
+        tmp = path.with_suffix(".tmp")
+        generate(dataset, rows, tmp, error_rate=error_rate, seed=seed)
+        tmp.replace(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dataset", choices=DATASETS, required=True)
+    parser.add_argument("--rows", type=parse_size, default=parse_size("10k"))
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--zones", type=int, default=0, help="0 = valeur par défaut du jeu de données")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    output = args.output or Path(f"{args.dataset}_{format_size(args.rows)}.csv")
+    generate(args.dataset, args.rows, output, zones=args.zones, error_rate=args.error_rate, seed=args.seed)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
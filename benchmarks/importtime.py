@@ -0,0 +1,76 @@
+"""
+Budget de temps d'import de app.main (démarrage à froid d'un worker).
+
+    python benchmarks/importtime.py --budget-ms 2000
+
+Mesure `python -X importtime -c "import app.main"` (meilleur de N essais),
+vérifie que les modules lourds ne sont pas importés au démarrage et sort
+en erreur (code 1) si le budget est dépassé : utilisable tel quel en CI.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules qui ne doivent être chargés qu'à la première utilisation
+LAZY_MODULES = [
+    "numpy",
+    "bcrypt",
+    "jose",
+    "app.importer",
+    "app.analytics",
+    "app.timeseries",
+    "app.rolling",
+]
+
+
+def measure() -> dict:
+    """
+    Retourne {module: temps cumulé en µs} pour un import à froid de app.main.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=2000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    best = min(runs, key=lambda t: t.get("app.main", 0))
+    total_ms = best["app.main"] / 1000
+    eager = [name for name in LAZY_MODULES if name in best]
+
+    print(json.dumps({
+        "benchmark": "importtime",
+        "app_main_ms": round(total_ms, 1),
+        "budget_ms": args.budget_ms,
+        "eager_heavy_modules": eager,
+    }))
+
+    if eager:
+        sys.exit(f"Modules importés au démarrage alors qu'ils devraient être différés : {eager}")
+    if total_ms > args.budget_ms:
+        sys.exit(f"import app.main : {total_ms:.0f} ms > budget {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
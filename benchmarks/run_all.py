@@ -0,0 +1,62 @@
+"""
+Lance toute la suite de benchmarks et écrit les résultats dans un seul fichier.
+
+    python benchmarks/run_all.py --output results/$(git rev-parse --short HEAD).jsonl
+    python benchmarks/run_all.py --profile full --output full.jsonl
+
+Chaque benchmark tourne dans son propre processus (base et dossier neufs).
+Profils : quick (10k lignes, quelques secondes), full (10k / 1M / 10M lignes,
+plusieurs dizaines de minutes et plusieurs Go de disque).
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+PROFILES = {
+    "quick": [
+        ["bench_import.py", "--rows", "10k"],
+        ["bench_queries.py", "--rows", "100k"],
+        ["bench_http.py", "--rows", "100k", "--requests", "200"],
+        ["bench_single_post.py", "--mode", "sync", "--requests", "1000"],
+        ["bench_single_post.py", "--mode", "write-behind", "--requests", "1000"],
+    ],
+    "full": [
+        ["bench_import.py", "--rows", "10k,1M,10M"],
+        ["bench_queries.py", "--rows", "1M", "--runs", "50"],
+        ["bench_queries.py", "--rows", "10M", "--runs", "20"],
+        ["bench_http.py", "--rows", "1M", "--requests", "2000", "--concurrency", "32"],
+        ["bench_single_post.py", "--mode", "sync", "--requests", "5000", "--concurrency", "16"],
+        ["bench_single_post.py", "--mode", "write-behind", "--requests", "5000", "--concurrency", "16"],
+    ],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profile", choices=PROFILES, default="quick")
+    parser.add_argument("--output", required=True, help="fichier JSON Lines (écrasé)")
+    args = parser.parse_args()
+
+    output = Path(args.output).resolve()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text("", encoding="utf-8")
+
+    failed = []
+    for command in PROFILES[args.profile]:
+        print(f"# {' '.join(command)}", flush=True)
+        proc = subprocess.run(
+            [sys.executable, str(HERE / command[0]), *command[1:], "--output", str(output)],
+            cwd=HERE,
+        )
+        if proc.returncode:
+            failed.append(" ".join(command))
+
+    if failed:
+        sys.exit(f"Benchmarks en échec : {failed}")
+
+
+if __name__ == "__main__":
+    main()
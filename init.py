@@ -1,43 +1,177 @@
+import argparse
+import logging
+import os
+import sys
+import time
 from pathlib import Path
 
+from app.bulk_ingest import DirectoryIngestor, IngestProgress, discover
 from app.database import SessionLocal
-from app.importer import (
-    import_ind_atmo_csv,
-    import_fr_e2_csv,
-)
+from app.import_profile import format_report
+from app.importer import DATASETS, PARSERS
 
 
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
 
+# Intervalle minimal entre deux lignes de progression (secondes)
+PROGRESS_INTERVAL = 0.5
+
+
+class ProgressPrinter:
+    """
+    Ligne de progression agrégée (tous fichiers confondus), limitée à une
+    mise à jour toutes les PROGRESS_INTERVAL secondes. Sur un terminal, la
+    ligne est réécrite en place ; sinon (redirection), une ligne par intervalle x10.
+    """
+
+    def __init__(self):
+        self.tty = sys.stdout.isatty()
+        self.interval = PROGRESS_INTERVAL if self.tty else PROGRESS_INTERVAL * 10
+        self.last = 0.0
+
+    def __call__(self, progress: IngestProgress) -> None:
+        now = time.perf_counter()
+        if now - self.last < self.interval and progress.files_done < progress.files_total:
+            return
+        self.last = now
+        line = (
+            f"[INGEST] {progress.files_done}/{progress.files_total} fichiers, "
+            f"{progress.rows} lignes ({progress.rows_per_second:.0f} lignes/s), "
+            f"{progress.errors} erreurs, {progress.skipped} ignorés"
+        )
+        if progress.current and progress.files_done < progress.files_total:
+            line += f" - {progress.current}"
+        if self.tty:
+            print(f"\r\033[K{line}", end="", flush=True)
+        else:
+            print(line, flush=True)
+
+    def close(self) -> None:
+        if self.tty:
+            print()
+
+
+def print_result(result) -> None:
+    name = result.path.name
+    if result.status == "ingested":
+        datasets = ",".join(result.datasets)
+        print(f"[INIT] {name} ({datasets}) → {result.inserted} lignes insérées, {result.errors} erreurs")
+        if result.flagged:
+            print(f"[INIT]   {result.flagged} mesures signalées par le contrôle qualité")
+        for error in result.top_errors[:3]:
+            print(f"[INIT]   erreur x{error['count']} : {error['error']}")
+    elif result.status == "skipped":
+        print(f"[INIT] {name} déjà ingéré, ignoré")
+    elif result.status == "duplicate":
+        print(f"[INIT] {name} ignoré : {result.message}")
+    else:
+        print(f"[INIT] {name} ÉCHEC : {result.message}")
+    # Archive : CSV refusés en entier (ex. colonnes manquantes)
+    for rejected in result.rejected:
+        if result.status != "failed":
+            print(f"[INIT]   refusé : {rejected}")
+    if result.profile:
+        print(f"[PROFILE] {name}")
+        print(format_report(result.profile))
+
 
 def main():
+    parser = argparse.ArgumentParser(
+        description="Remplit la base à partir des fichiers CSV (éventuellement compressés) de data/."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        metavar="MOTIF",
+        help="fichiers, dossiers ou motifs glob à ingérer (défaut : data/)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="processus de parsing en parallèle (0 : tout dans le processus courant)",
+    )
+    parser.add_argument(
+        "--dataset",
+        choices=["auto", *DATASETS],
+        default="auto",
+        help="format des fichiers (auto : reconnu à la ligne d'en-tête de chaque CSV)",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=PARSERS,
+        help="moteur de parsing : rows (ligne à ligne) ou columnar (NumPy, par blocs) ; défaut : ECOTRACK_IMPORT_PARSER",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="réingère les fichiers déjà présents dans ingested_files, même modifiés depuis",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="liste les fichiers trouvés sans rien importer",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="affiche le temps passé par étape (décodage, dates, nombres, zones/sources, commit) ; implique --workers 0",
+    )
+    parser.add_argument(
+        "--pstats",
+        type=Path,
+        metavar="DOSSIER",
+        help="profile aussi l'import avec cProfile et écrit un fichier .pstats par fichier dans DOSSIER",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    paths = discover(args.paths or [str(DATA_DIR)])
+    if not paths:
+        print(f"[INIT] Aucun fichier importable (.csv, .csv.gz, .csv.zst, .zip) dans {args.paths or DATA_DIR}")
+        return
+    if args.dry_run:
+        for path in paths:
+            print(f"[INIT] {path} ({path.stat().st_size} octets)")
+        print(f"[INIT] {len(paths)} fichiers")
+        return
+
     # Ouverture d'une session DB
     db = SessionLocal()
+    printer = ProgressPrinter()
 
     try:
-    
-        ind_atmo_path = DATA_DIR / "ind_atmo_2021.csv"
-        if ind_atmo_path.exists():
-            print(f"[INIT] Import du fichier : {ind_atmo_path}")
-            with ind_atmo_path.open("r", encoding="utf-8") as f:
-                result = import_ind_atmo_csv(db, f)
-            print(f"[INIT] ind_atmo_2021 → {result['inserted']} lignes insérées, {len(result['errors'])} erreurs")
-        else:
-            print(f"[INIT] Fichier ind_atmo_2021.csv introuvable dans {DATA_DIR}")
-
-        fr_e2_path = DATA_DIR / "FR_E2_2025-01-01.csv"
-        if fr_e2_path.exists():
-            print(f"[INIT] Import du fichier : {fr_e2_path}")
-            with fr_e2_path.open("r", encoding="utf-8") as f:
-                result = import_fr_e2_csv(db, f)
-            print(f"[INIT] FR_E2_2025-01-01 → {result['inserted']} lignes insérées, {len(result['errors'])} erreurs")
-        else:
-            print(f"[INIT] Fichier FR_E2_2025-01-01.csv introuvable dans {DATA_DIR}")
-
+        ingestor = DirectoryIngestor(
+            db,
+            workers=args.workers,
+            dataset=None if args.dataset == "auto" else args.dataset,
+            force=args.force,
+            on_progress=printer,
+            profile=args.profile,
+            pstats_dir=args.pstats,
+            parser=args.parser,
+        )
+        results = ingestor.run(paths)
     finally:
+        printer.close()
         db.close()
 
+    for result in results:
+        print_result(result)
+
+    progress = ingestor.progress
+    print(
+        f"[INIT] {len(results)} fichiers en {progress.elapsed:.1f} s : "
+        f"{progress.rows} lignes insérées ({progress.rows_per_second:.0f} lignes/s), "
+        f"{progress.errors} erreurs, {progress.skipped} ignorés, {progress.failed} en échec"
+    )
+    if args.pstats:
+        print(f"[PROFILE] statistiques cProfile : {args.pstats}")
+    if progress.failed:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,54 @@
+import argparse
+
+from app.database import SessionLocal
+from app.retention import BATCH_SIZE, RETENTION_POLICIES, apply_retention
+
+
+def parse_policies(values):
+    """
+    Transforme ["NO2=365", "O3=none"] en {"NO2": 365, "O3": None}.
+    """
+    policies = dict(RETENTION_POLICIES)
+    for item in values or []:
+        type_, _, days = item.partition("=")
+        if not type_ or not days:
+            raise SystemExit(f"Politique invalide : {item!r} (attendu TYPE=JOURS)")
+        policies[type_.strip()] = None if days.strip().lower() == "none" else int(days)
+    return policies
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Agrège en journalier puis supprime les mesures brutes trop anciennes."
+    )
+    parser.add_argument("--policy", action="append", help="TYPE=JOURS (ou TYPE=none), répétable")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--vacuum", action="store_true", help="Lance un VACUUM pour réduire le fichier")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = apply_retention(
+            db,
+            policies=parse_policies(args.policy),
+            batch_size=args.batch_size,
+            vacuum=args.vacuum,
+        )
+    finally:
+        db.close()
+
+    for type_, totals in result["per_type"].items():
+        print(f"[RETENTION] {type_} → {totals['rows_deleted']} lignes supprimées, {totals['rollups_written']} agrégats")
+    print(
+        f"[RETENTION] Total : {result['rows_deleted']} lignes supprimées, "
+        f"{result['bytes_reclaimed']} octets récupérés"
+    )
+    for type_, count in result["cold_partitions_skipped"].items():
+        print(
+            f"[RETENTION] {type_} : {count} fichiers froids plus anciens que la limite, non agrégés "
+            "(lancer la rétention avant tiering.py)"
+        )
+
+
+if __name__ == "__main__":
+    main()
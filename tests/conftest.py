@@ -0,0 +1,105 @@
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+ADMIN_EMAIL = "admin@ecotrack.test"
+os.environ.setdefault("ECOTRACK_ADMIN_EMAILS", ADMIN_EMAIL)
+
+# Le chemin de la base (./ecotrack.db) est résolu à la création du moteur :
+# on se place dans un répertoire temporaire avant d'importer l'application
+DB_DIR = Path(tempfile.mkdtemp(prefix="ecotrack-tests-"))
+os.chdir(DB_DIR)
+
+from app import crud, schemas  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.models import Base  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """
+    Chaque test part d'une base vide, dans un répertoire vide (miroir
+    colonnaire ./analytics, stockage froid ./cold, journal d'ingestion).
+    """
+    from app import analytics, rolling
+
+    engine.dispose()
+    for path in DB_DIR.glob("ecotrack.db*"):
+        path.unlink()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(analytics, "mirror", analytics.ColumnarMirror())
+    rolling._series_cache.clear()
+    Base.metadata.create_all(bind=engine)
+    yield tmp_path
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def seed(db):
+    """
+    Deux zones et une source : {"zones": [id, id], "source": id}.
+    """
+    zones = [crud.create_zone(db, schemas.ZoneCreate(name=name)).id for name in ("Metz", "Nancy")]
+    source = crud.create_source(db, schemas.SourceCreate(name="ATMO")).id
+    return {"zones": zones, "source": source}
+
+
+@pytest.fixture
+def client(workdir):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as c:
+        c.post("/register", json={"email": ADMIN_EMAIL, "password": "secret1"})
+        token = c.post("/login", data={"username": ADMIN_EMAIL, "password": "secret1"}).json()["access_token"]
+        c.headers["Authorization"] = f"Bearer {token}"
+        yield c
+
+
+def make_rows(seed, days=90, types=("NO2", "O3"), end=datetime(2024, 6, 15), rng_seed=1):
+    """
+    Mesures horaires (environ 30 % manquantes) sur `days` jours, insérées
+    dans le désordre : les ids ne suivent pas les dates.
+    """
+    rng = random.Random(rng_seed)
+    start = end - timedelta(days=days)
+    rows = [
+        {
+            "source_id": seed["source"],
+            "zone_id": zone_id,
+            "type": type_,
+            "value": round(rng.uniform(0, 80), 3),
+            "unit": "µg/m3",
+            "timestamp": start + timedelta(hours=hour),
+        }
+        for hour in range(days * 24)
+        for zone_id in seed["zones"]
+        for type_ in types
+        if rng.random() < 0.7
+    ]
+    rng.shuffle(rows)
+    return rows
+
+
+@pytest.fixture
+def rows(db, seed):
+    data = make_rows(seed)
+    crud.insert_indicator_rows(db, data)
+    db.commit()
+    return data
@@ -0,0 +1,108 @@
+import math
+from datetime import datetime
+
+import pytest
+
+from app import analytics, crud
+from app.models import Indicator
+
+FILTERS = [
+    {},
+    {"type": "NO2"},
+    {"type": "O3", "zone_id": 2},
+    {"type": "NO2", "date_from": datetime(2024, 4, 1), "date_to": datetime(2024, 5, 1, 12)},
+    {"type": "CO"},
+]
+
+
+def assert_same_stats(db, **filters):
+    expected = crud.indicator_stats(db, **filters)
+    result = analytics.indicator_stats(db, **filters)
+    assert result["count"] == expected["count"]
+    for key in ("min_value", "max_value", "avg_value"):
+        if expected[key] is None:
+            assert result[key] is None
+        else:
+            assert math.isclose(result[key], expected[key], rel_tol=1e-9)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_columnar_stats_match_sql(db, rows, filters):
+    assert_same_stats(db, **filters)
+
+
+def test_mirror_appends_new_rows_incrementally(db, seed, rows):
+    analytics.mirror.refresh(db)
+    size = analytics.mirror.size
+
+    crud.insert_indicator_rows(db, [{
+        "source_id": seed["source"], "zone_id": seed["zones"][0], "type": "NO2",
+        "value": 500.0, "unit": "µg/m3", "timestamp": datetime(2024, 6, 20),
+    }])
+    db.commit()
+
+    assert analytics.mirror.refresh(db) == 1
+    assert analytics.mirror.size == size + 1
+    assert_same_stats(db, type="NO2")
+
+
+def test_mirror_rebuilds_after_delete_and_reloads_from_disk(db, rows):
+    analytics.mirror.refresh(db)
+    highest = db.query(Indicator).filter(Indicator.type == "NO2").order_by(Indicator.value.desc()).first()
+    crud.delete_indicator(db, highest)
+
+    assert_same_stats(db, type="NO2")
+
+    # Nouveau processus : le miroir est relu depuis ./analytics, sans rien réimporter
+    reloaded = analytics.ColumnarMirror()
+    assert reloaded.refresh(db) == 0
+    assert reloaded.size == analytics.mirror.size
+
+
+ENDPOINTS = [
+    ("/api/indicators/compare", {"type": "NO2", "zone_ids": "1,2", "bucket": "1d"}),
+    ("/api/indicators/compare", {"type": "O3", "zone_ids": "2", "bucket": "6h", "agg": "max",
+                                 "date_from": "2024-04-01T00:00:00", "date_to": "2024-05-01T12:00:00"}),
+    ("/api/indicators/series", {"type": "NO2", "zone_id": 1, "max_points": 300}),
+    ("/api/indicators/series", {"type": "O3", "date_from": "2024-05-01T00:00:00"}),
+    ("/api/indicators/rolling", {"type": "O3", "zone_id": 1, "window": "8h"}),
+    ("/api/indicators/rolling", {"type": "NO2", "zone_id": 2, "window": "1d", "agg": "max",
+                                 "date_to": "2024-05-10T00:00:00"}),
+]
+
+
+@pytest.mark.parametrize("path, params", ENDPOINTS)
+def test_columnar_series_endpoints_match_sql(client, rows, path, params):
+    from app import rolling
+
+    expected = client.get(path, params=params)
+    # Le cache des fenêtres glissantes est commun aux deux moteurs
+    rolling._series_cache.clear()
+    result = client.get(path, params={**params, "engine": "columnar"})
+
+    assert expected.status_code == result.status_code == 200
+    assert result.json() == expected.json()
+
+
+@pytest.mark.parametrize("path", ["/api/indicators/compare", "/api/indicators/series", "/api/indicators/rolling"])
+def test_series_endpoints_reject_unknown_engine(client, path):
+    response = client.get(path, params={"type": "NO2", "zone_id": 1, "zone_ids": "1", "engine": "duckdb"})
+    assert response.status_code == 400
+
+
+def test_select_uses_one_snapshot_of_the_columns(db, seed, rows):
+    analytics.mirror.refresh(db)
+    size = analytics.mirror.size
+    cols, _ = analytics.mirror._snapshot()
+
+    # Un refresh concurrent agrandit les tableaux : la vue déjà prise ne change pas
+    crud.insert_indicator_rows(db, [{
+        "source_id": seed["source"], "zone_id": seed["zones"][0], "type": "NO2",
+        "value": 500.0, "unit": "µg/m3", "timestamp": datetime(2024, 6, 20),
+    } for _ in range(5000)])
+    db.commit()
+    analytics.mirror.refresh(db)
+
+    assert all(len(array) == size for array in cols.values())
+    selected = analytics.mirror.select(["id", "value"], type="NO2", after_id=int(cols["id"].max()))
+    assert len(selected["id"]) == len(selected["value"]) == 5000
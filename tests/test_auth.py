@@ -0,0 +1,68 @@
+from collections import deque
+
+import pytest
+
+from conftest import ADMIN_EMAIL
+
+from app import config, slow_queries
+
+
+def register(client, email, **fields):
+    return client.post("/register", json={"email": email, "password": "secret1", **fields})
+
+
+def login(client, email):
+    response = client.post("/login", data={"username": email, "password": "secret1"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.parametrize("role", ["admin", "superuser"])
+def test_register_refuses_a_chosen_role(client, role):
+    assert config.ADMIN_EMAILS == {ADMIN_EMAIL}
+
+    response = register(client, "alice@ecotrack.test", role=role)
+
+    assert response.status_code == 403
+    assert register(client, "alice@ecotrack.test").json()["role"] == "user"
+
+
+def test_register_gives_admin_only_to_configured_emails(client):
+    assert register(client, "bob@ecotrack.test", role="user").json()["role"] == "user"
+    # Le client (fixture) est inscrit avec l'email admin, sans rôle demandé
+    assert client.get("/me").json()["role"] == "admin"
+
+    assert client.get("/api/admin/slow-queries").status_code == 200
+    headers = login(client, "bob@ecotrack.test")
+    assert client.get("/api/admin/slow-queries", headers=headers).status_code == 403
+
+
+@pytest.fixture
+def log_every_query(monkeypatch):
+    monkeypatch.setattr(config, "SLOW_QUERY_THRESHOLD_MS", 1e-9)
+    monkeypatch.setattr(slow_queries, "_recent", deque(maxlen=1000))
+
+
+def test_slow_query_log_masks_parameters_outside_measurement_tables(client, seed, log_every_query):
+    register(client, "carol@ecotrack.test")
+    client.get(f"/api/indicators?zone_id={seed['zones'][1]}")
+
+    entries = client.get("/api/admin/slow-queries").json()
+    users = [e for e in entries if "users" in e["statement"]]
+    indicators = [e for e in entries if "FROM indicators" in e["statement"]]
+
+    assert users and indicators
+    assert all(e["parameters"] == "<masqués>" for e in users)
+    for entry in entries:
+        assert "carol@ecotrack.test" not in str(entry["parameters"])
+        assert "secret1" not in str(entry["parameters"])
+    assert any(seed["zones"][1] in e["parameters"] for e in indicators if isinstance(e["parameters"], list))
+
+
+def test_safe_parameters():
+    mask = slow_queries._safe_parameters
+
+    assert mask("SELECT * FROM indicators WHERE zone_id = ?", (3,)) == [3]
+    assert mask("SELECT 1", ()) == "<masqués>"
+    assert mask("SELECT * FROM users WHERE email = ?", ("a@b",)) == "<masqués>"
+    assert mask("SELECT * FROM indicators JOIN users ON 1", ("a@b",)) == "<masqués>"
+    assert mask('INSERT INTO "sessions" VALUES (?)', ("jeton",)) == "<masqués>"
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from app.models import Indicator
+
+
+def item(seed, **changes):
+    return {
+        "source_id": seed["source"], "zone_id": seed["zones"][0], "type": "NO2",
+        "value": 12.5, "unit": "µg/m3", "timestamp": "2024-01-01T00:00:00", **changes,
+    }
+
+
+def errors_by_index(body):
+    return {error["index"]: error["error"] for error in body["errors"]}
+
+
+@pytest.mark.parametrize("ndjson", [False, True])
+def test_bulk_reports_errors_per_item(client, db, seed, ndjson):
+    items = [
+        item(seed),
+        item(seed, zone_id=999),
+        item(seed, source_id=999),
+        item(seed, value="abc"),
+        {k: v for k, v in item(seed).items() if k != "timestamp"},
+        item(seed, value=30.0, zone_id=seed["zones"][1]),
+    ]
+    if ndjson:
+        lines = [json.dumps(i) for i in items]
+        lines.insert(4, "{pas du json")
+        # Ligne vide ignorée, dernière ligne sans retour final
+        response = client.post(
+            "/api/indicators/bulk",
+            content="\n".join(lines[:3]) + "\n\n" + "\n".join(lines[3:]),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        invalid_json, missing_ts, last = 4, 5, 6
+    else:
+        response = client.post("/api/indicators/bulk", json=items)
+        invalid_json, missing_ts, last = None, 4, 5
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["inserted"] == 2
+    errors = errors_by_index(body)
+    assert [error["index"] for error in body["errors"]] == sorted(errors)
+    assert errors[1] == "Zone not found"
+    assert errors[2] == "Source not found"
+    assert errors[3].startswith("value:")
+    assert errors[missing_ts].startswith("timestamp:")
+    if invalid_json is not None:
+        assert errors[invalid_json].startswith("JSON invalide")
+    assert last not in errors
+    assert sorted(v for (v,) in db.query(Indicator.value)) == [12.5, 30.0]
+
+
+def test_bulk_rejects_non_finite_values(client, seed):
+    # json.dumps écrit NaN tel quel (extension acceptée par json.loads)
+    response = client.post(
+        "/api/indicators/bulk",
+        content=json.dumps([item(seed, value=float("nan")), item(seed)]),
+        headers={"Content-Type": "application/json"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["inserted"] == 1
+    assert [error["index"] for error in body["errors"]] == [0]
+
+
+@pytest.mark.parametrize("content", ["{pas du json", '{"type": "NO2"}'])
+def test_bulk_rejects_a_body_that_is_not_a_json_array(client, content):
+    response = client.post("/api/indicators/bulk", content=content, headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
@@ -0,0 +1,77 @@
+import os
+import shutil
+
+from app.bulk_ingest import DirectoryIngestor
+from app.models import IngestedFile, Indicator
+
+HEADER = "source_name,zone_name,type,value,unit,timestamp\n"
+
+
+def daily_lines(hours, day="2024-06-16"):
+    return "".join(f"ATMO,Metz,NO2,{10 + hour},µg/m3,{day}T{hour:02d}:00:00\n" for hour in hours)
+
+
+def ingest(db, paths, force=False):
+    return DirectoryIngestor(db, workers=0, force=force).run(paths)
+
+
+def test_files_already_ingested_are_skipped(db, workdir):
+    path = workdir / "daily.csv"
+    path.write_text(HEADER + daily_lines(range(12)), encoding="utf-8")
+
+    [first] = ingest(db, [path])
+    assert (first.status, first.inserted) == ("ingested", 12)
+
+    # Même chemin, taille et date : ignoré sans relire le fichier
+    [again] = ingest(db, [path])
+    assert again.status == "skipped"
+
+    # Fichier seulement touché : reconnu à son empreinte
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 60))
+    [touched] = ingest(db, [path])
+    assert touched.status == "skipped"
+    assert db.query(IngestedFile.mtime).scalar() == stat.st_mtime + 60
+
+    # Copie sous un autre nom
+    copy = workdir / "copy.csv"
+    shutil.copy(path, copy)
+    [duplicate] = ingest(db, [copy])
+    assert duplicate.status == "duplicate"
+
+    assert db.query(Indicator).count() == 12
+
+
+def test_changed_file_is_refused_unless_forced(db, workdir):
+    path = workdir / "daily.csv"
+    path.write_text(HEADER + daily_lines(range(12)), encoding="utf-8")
+    ingest(db, [path])
+
+    # Fichier quotidien complété : le réimporter dupliquerait les 12 premières heures
+    path.write_text(HEADER + daily_lines(range(24)), encoding="utf-8")
+    ingestor = DirectoryIngestor(db, workers=0)
+    [changed] = ingestor.run([path])
+
+    assert changed.status == "changed"
+    assert "--force" in changed.message
+    assert ingestor.progress.failed == 1
+    assert db.query(Indicator).count() == 12
+
+    [forced] = ingest(db, [path], force=True)
+    assert (forced.status, forced.inserted) == ("ingested", 24)
+    # Une seule ligne ingested_files par chemin, avec le nouveau contenu
+    assert db.query(IngestedFile.inserted).all() == [(24,)]
+
+
+def test_changed_file_is_refused_with_workers(db, workdir):
+    path = workdir / "daily.csv"
+    path.write_text(HEADER + daily_lines(range(12)), encoding="utf-8")
+    other = workdir / "other.csv"
+    other.write_text(HEADER + daily_lines(range(6), day="2024-06-17"), encoding="utf-8")
+    ingest(db, [path])
+    path.write_text(HEADER + daily_lines(range(24)), encoding="utf-8")
+
+    results = DirectoryIngestor(db, workers=1).run([path, other])
+
+    assert [result.status for result in results] == ["changed", "ingested"]
+    assert db.query(Indicator).count() == 18
@@ -0,0 +1,75 @@
+from app import cache
+
+
+def get(client, url, etag=None):
+    return client.get(url, headers={"If-None-Match": etag} if etag else {})
+
+
+def test_matching_etag_gives_304(client, seed):
+    first = get(client, "/api/zones")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert etag.startswith('W/"')
+
+    again = get(client, "/api/zones", etag)
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.content == b""
+    # Forme forte du même ETag, liste de candidats et joker
+    assert get(client, "/api/zones", etag[2:]).status_code == 304
+    assert get(client, "/api/zones", f'W/"autre", {etag}').status_code == 304
+    assert get(client, "/api/zones", "*").status_code == 304
+    assert get(client, "/api/zones", 'W/"autre"').status_code == 200
+
+
+def test_etag_depends_on_query_parameters(client, seed):
+    no2 = get(client, "/api/indicators?type=NO2").headers["ETag"]
+    o3 = get(client, "/api/indicators?type=O3").headers["ETag"]
+
+    assert no2 != o3
+    assert get(client, "/api/indicators?type=O3", no2).status_code == 200
+
+
+def add(client, seed, type_, value=10.0):
+    response = client.post("/api/indicators", json={
+        "source_id": seed["source"], "zone_id": seed["zones"][0], "type": type_,
+        "value": value, "unit": "µg/m3", "timestamp": "2024-01-01T00:00:00",
+    })
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_writes_only_invalidate_their_own_key(client, seed):
+    urls = ["/api/indicators/stats?type=NO2", "/api/indicators/stats?type=O3", "/api/indicators/stats"]
+    etags = {url: get(client, url).headers["ETag"] for url in urls}
+    zones = get(client, "/api/zones").headers["ETag"]
+    sources = get(client, "/api/sources").headers["ETag"]
+
+    add(client, seed, "NO2")
+
+    assert get(client, urls[0], etags[urls[0]]).status_code == 200
+    assert get(client, urls[1], etags[urls[1]]).status_code == 304
+    # Sans filtre sur le type, toute écriture change l'ETag
+    assert get(client, urls[2], etags[urls[2]]).status_code == 200
+    assert get(client, "/api/zones", zones).status_code == 304
+    assert get(client, "/api/sources", sources).status_code == 304
+
+    assert client.post("/api/zones", json={"name": "Thionville"}).status_code == 201
+    assert get(client, "/api/zones", zones).status_code == 200
+    assert get(client, "/api/sources", sources).status_code == 304
+
+
+def test_changing_the_type_invalidates_both_types(client, seed):
+    indicator_id = add(client, seed, "NO2")
+    versions = {key: cache.data_version(key) for key in ("NO2", "O3", "PM10", cache.REWRITES)}
+
+    response = client.put(f"/api/indicators/{indicator_id}", json={
+        "source_id": seed["source"], "zone_id": seed["zones"][0], "type": "O3",
+        "value": 11.0, "unit": "µg/m3", "timestamp": "2024-01-01T00:00:00",
+    })
+
+    assert response.status_code == 200
+    assert cache.data_version("NO2") == versions["NO2"] + 1
+    assert cache.data_version("O3") == versions["O3"] + 1
+    assert cache.data_version(cache.REWRITES) == versions[cache.REWRITES] + 1
+    assert cache.data_version("PM10") == versions["PM10"]
@@ -0,0 +1,78 @@
+import io
+
+import pytest
+
+from app import importer
+
+SAMPLES = {
+    "generic": (
+        "source_name,zone_name,type,value,unit,timestamp,latitude,longitude,metadata\n"
+        "ATMO,Metz,NO2,12.5,µg/m3,2024-01-01T00:00:00,49.1,6.17,capteur=A\n"
+        "ATMO,Metz,NO2,\"13,5\",µg/m3,2024-01-01 01:00:00,49.1,6.17,\n"
+        "ATMO,Metz,NO2,1e3,µg/m3,2024-01-01T02:00:00,4.91e1,abc,\n"
+        "ATMO,Metz,NO2,,µg/m3,01/01/2024 03:00:00,,,\n"
+        ",Metz,NO2,1,µg/m3,2024-01-01T04:00:00,,,\n"
+        "ATMO,,NO2,1,µg/m3,2024-01-01T05:00:00,,,\n"
+        "ATMO,Metz,,1,µg/m3,2024-01-01T06:00:00,,,\n"
+        "ATMO,Metz,NO2,abc,µg/m3,2024-01-01T07:00:00,,,\n"
+        "ATMO,Metz,NO2,1,µg/m3,2024-02-30T00:00:00,,,\n"
+        "ATMO,Metz,NO2,1,µg/m3,pas une date,,,\n"
+        "ATMO,Metz,NO2,1,µg/m3\n"
+        "\n"
+        "ATMO,Metz,NO2,1,µg/m3,2024-01-01T08:00:00,91,181,x,en trop\n"
+        "  ATMO , Metz ,O3, -2.5 , ppb ,2024-01-01T09:00:00,,,\n"
+    ),
+    "fr_e2": (
+        "Date de début;Organisme;Zas;nom site;type d'implantation;Polluant;valeur;unité de mesure\n"
+        "2024/01/01 00:00:00;ATMO GE;ZAG METZ;Metz-Borny;Urbaine;NO2;12,3;µg-m3\n"
+        "2024/01/01 01:00:00;ATMO GE;ZAG METZ;Metz-Borny;Urbaine;NO2;;\n"
+        "2024/01/01 02:00:00;;ZAG METZ;Metz-Borny;Urbaine;NO2;1;µg-m3\n"
+        "2024/01/01 03:00:00;ATMO GE;ZAG METZ;Metz-Borny;Urbaine;;1;µg-m3\n"
+        "2024/13/01 04:00:00;ATMO GE;ZAG METZ;Metz-Borny;Urbaine;NO2;1;µg-m3\n"
+        "2024/01/01 05:00:00;ATMO GE;ZAG METZ;Metz-Borny;Urbaine;NO2;n/d;µg-m3\n"
+        "2024/01/01 06:00:00;ATMO GE;ZAG METZ;Metz-Borny\n"
+    ),
+    "ind_atmo": (
+        "date_ech,lib_zone,source,code_qual,lib_qual,code_no2,code_pm10,x_wgs84,y_wgs84\n"
+        "2021-01-01,Metz,ATMO GE,2,Moyen,1,2,6.17,49.11\n"
+        "02/01/2021,Nancy,ATMO GE,3,Dégradé,,3,6.18,48.69\n"
+        "2021-01-03,,ATMO GE,2,Moyen,1,2,,\n"
+        "2021-01-04,Metz,ATMO GE,x,Moyen,1,2,,\n"
+        "2021-01-05,Metz,ATMO GE,2,Moyen,1,2,200,95\n"
+        "hier,Metz,ATMO GE,2,Moyen,1,2,,\n"
+    ),
+}
+
+
+def parse(spec, text, parser):
+    reader = importer.open_reader(spec, io.StringIO(text))
+    parsed, errors = [], []
+    for batch, batch_errors in importer.parse_batches(spec, reader, parser=parser):
+        parsed.extend(batch)
+        errors.extend(batch_errors)
+    return parsed, sorted(errors, key=lambda error: error["line"])
+
+
+@pytest.mark.parametrize("dataset", sorted(SAMPLES))
+def test_columnar_parser_matches_rows_parser(dataset, monkeypatch):
+    spec = importer.DATASETS[dataset]
+    # Petits blocs : plusieurs blocs par fichier, numéros de ligne continus
+    monkeypatch.setattr("app.import_columnar.IMPORT_BATCH_ROWS", 4)
+
+    expected = parse(spec, SAMPLES[dataset], "rows")
+    result = parse(spec, SAMPLES[dataset], "columnar")
+
+    assert expected[1], "l'échantillon doit contenir des lignes en erreur"
+    assert result == expected
+
+
+@pytest.mark.parametrize("dataset", sorted(SAMPLES))
+def test_columnar_import_reports_the_same_errors(db, dataset):
+    spec = importer.DATASETS[dataset]
+    reports = [
+        importer.run_import(spec, db, io.StringIO(SAMPLES[dataset]), parser=parser)
+        for parser in ("rows", "columnar")
+    ]
+
+    assert reports[0]["inserted"] > 0
+    assert reports[1] == reports[0]
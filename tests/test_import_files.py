@@ -0,0 +1,124 @@
+import gzip
+import io
+import sys
+import zipfile
+
+import pytest
+
+from app import import_files
+from app.models import Indicator
+
+HEADER = "source_name,zone_name,type,value,unit,timestamp\n"
+
+
+def csv_text(zone, hours, bad_value=False):
+    lines = [f"ATMO,{zone},NO2,{hour + 0.5},µg/m3,2024-01-01T{hour:02d}:00:00\n" for hour in range(hours)]
+    if bad_value:
+        lines.append(f"ATMO,{zone},NO2,abc,µg/m3,2024-01-02T00:00:00\n")
+    return HEADER + "".join(lines)
+
+
+def zip_bytes(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def upload(client, name, data):
+    return client.post("/api/indicators/import_csv", files={"file": (name, data, "application/octet-stream")})
+
+
+def streams(data, filename):
+    return [(name, text.read()) for name, text in import_files.iter_csv_streams(io.BytesIO(data), filename)]
+
+
+def test_gzip_is_detected_by_content(client, db):
+    data = gzip.compress(csv_text("Metz", 3).encode("utf-8"))
+
+    # Reconnu aux premiers octets, pas à l'extension
+    assert streams(data, "mesures.csv") == [("mesures.csv", csv_text("Metz", 3))]
+    response = upload(client, "mesures.csv.gz", data)
+
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 3
+    assert db.query(Indicator).count() == 3
+
+
+def test_zstd_member():
+    zstandard = pytest.importorskip("zstandard")
+    data = zstandard.ZstdCompressor().compress(csv_text("Metz", 2).encode("utf-8"))
+
+    assert streams(data, "mesures.csv.zst") == [("mesures.csv.zst", csv_text("Metz", 2))]
+    archive = zip_bytes({"a.csv.zst": data})
+    assert streams(archive, "lot.zip") == [("a.csv.zst", csv_text("Metz", 2))]
+
+
+def test_zstd_without_the_optional_package(monkeypatch):
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+
+    with pytest.raises(ValueError, match="zstandard"):
+        streams(import_files.ZSTD_MAGIC + b"\x00" * 16, "mesures.csv.zst")
+
+
+def test_zip_members_are_imported_separately(client, db):
+    data = zip_bytes({
+        "a.csv": csv_text("Metz", 2, bad_value=True),
+        "dossier/b.csv.gz": gzip.compress(csv_text("Nancy", 3).encode("utf-8")),
+        "c.csv": "colonne,inconnue\n1,2\n",
+        "lisez-moi.txt": "ignoré",
+        "dossier/": "",
+    })
+
+    assert [name for name, _ in streams(data, "lot.zip")] == ["a.csv", "b.csv.gz", "c.csv"]
+    response = upload(client, "lot.zip", data)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["inserted"] == 5
+    assert [(f["file"], f["inserted"], f["errors"]) for f in body["files"]] == [
+        ("a.csv", 2, 1), ("b.csv.gz", 3, 0), ("c.csv", 0, 0),
+    ]
+    # Le membre refusé (colonnes manquantes) n'empêche pas les autres
+    assert body["files"][2]["rejected"]
+    assert "rejected" not in body["files"][0]
+    assert [(error["file"], error["line"]) for error in body["errors"]] == [("a.csv", 4)]
+    assert db.query(Indicator).count() == 5
+
+
+def test_zip_with_a_single_rejected_member_is_refused(client, db):
+    response = upload(client, "lot.zip", zip_bytes({"c.csv": "colonne,inconnue\n1,2\n"}))
+
+    assert response.status_code == 400
+    assert db.query(Indicator).count() == 0
+
+
+@pytest.mark.parametrize("name, data, detail", [
+    ("vide.zip", zip_bytes({"lisez-moi.txt": "ignoré"}), "Aucun fichier CSV"),
+    ("casse.csv.gz", gzip.compress(csv_text("Metz", 50).encode("utf-8"))[:40], None),
+    ("latin1.csv", (HEADER + "ATMO,Thionville-Métz,NO2,1,µg/m3,2024-01-01T00:00:00\n").encode("latin-1"), None),
+])
+def test_unreadable_files_give_400(client, name, data, detail):
+    response = upload(client, name, data)
+
+    assert response.status_code == 400
+    if detail:
+        assert detail in response.json()["detail"]
+
+
+def test_zip_needs_a_seekable_stream():
+    class Pipe(io.RawIOBase):
+        def __init__(self, data):
+            self._data = io.BytesIO(data)
+
+        def readable(self):
+            return True
+
+        def readinto(self, buffer):
+            chunk = self._data.read(len(buffer))
+            buffer[:len(chunk)] = chunk
+            return len(chunk)
+
+    with pytest.raises(ValueError, match="zip"):
+        list(import_files.iter_csv_streams(Pipe(zip_bytes({"a.csv": HEADER})), "lot.zip"))
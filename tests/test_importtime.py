@@ -0,0 +1,19 @@
+import sys
+
+from conftest import ROOT
+
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import importtime  # noqa: E402
+
+# Même budget par défaut que benchmarks/importtime.py
+BUDGET_MS = 2000
+
+
+def test_app_main_import_is_fast_and_lazy():
+    # measure() importe app.main dans un sous-processus : import à froid
+    runs = [importtime.measure() for _ in range(3)]
+    best = min(runs, key=lambda timings: timings["app.main"])
+
+    assert [name for name in importtime.LAZY_MODULES if name in best] == []
+    assert best["app.main"] / 1000 <= BUDGET_MS
@@ -0,0 +1,150 @@
+import json
+from datetime import datetime
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.exc import OperationalError
+
+from app import crud, schemas
+from app.database import SessionLocal
+from app.ingest_buffer import IngestBuffer
+from app.models import IngestCheckpoint, Indicator
+
+
+def item(seed, value, day=1):
+    return schemas.IndicatorCreate(
+        source_id=seed["source"], zone_id=seed["zones"][0], type="NO2",
+        value=value, unit="µg/m3", timestamp=datetime(2024, 1, day),
+    )
+
+
+def make_buffer(workdir):
+    return IngestBuffer(SessionLocal, wal_path=workdir / "ingest.wal", flush_ms=10, fsync=False)
+
+
+def values(db):
+    return sorted(value for (value,) in db.query(Indicator.value).all())
+
+
+def checkpoint(db, buffer):
+    db.expire_all()
+    return db.query(IngestCheckpoint.seq).filter(IngestCheckpoint.journal == buffer.journal).scalar()
+
+
+def journal_line(seq, entry):
+    return json.dumps({"seq": seq, "item": entry.model_dump(mode="json")}) + "\n"
+
+
+def test_submitted_items_are_committed_and_checkpointed(db, seed, workdir):
+    buffer = make_buffer(workdir)
+    buffer.start()
+    for value in (1.0, 2.0, 3.0):
+        buffer.submit(item(seed, value))
+    buffer.stop()
+
+    assert values(db) == [1.0, 2.0, 3.0]
+    assert buffer.pending == 0
+    assert checkpoint(db, buffer) == 3
+    assert buffer.wal_path.read_bytes() == b""
+
+
+def test_crash_after_commit_does_not_duplicate_rows(db, seed, workdir):
+    buffer = make_buffer(workdir)
+    buffer.start()
+    entries = [item(seed, value) for value in (1.0, 2.0)]
+    for entry in entries:
+        buffer.submit(entry)
+    buffer.stop()
+
+    # Arrêt brutal après le commit, avant la troncature du journal
+    buffer.wal_path.write_text("".join(journal_line(seq, entry) for seq, entry in enumerate(entries, start=1)))
+    restarted = make_buffer(workdir)
+    restarted.recover()
+
+    assert values(db) == [1.0, 2.0]
+    assert restarted.pending == 0
+
+
+def test_checkpoint_is_rolled_back_with_the_batch(db, seed, workdir, monkeypatch):
+    buffer = make_buffer(workdir)
+    buffer.wal_path.write_text(journal_line(1, item(seed, 1.0)))
+
+    def fail(session, seq):
+        raise OperationalError("UPDATE ingest_checkpoints", {}, Exception("disk I/O error"))
+
+    monkeypatch.setattr(buffer, "_save_checkpoint", fail)
+    with pytest.raises(OperationalError):
+        buffer._replay()
+
+    assert values(db) == []
+    assert checkpoint(db, buffer) is None
+
+
+def test_replay_skips_committed_and_invalid_lines(db, seed, workdir):
+    buffer = make_buffer(workdir)
+    lines = [
+        {"seq": 1, "item": item(seed, 1.0).model_dump(mode="json")},  # déjà commitée
+        {"seq": 2, "item": item(seed, 2.0).model_dump(mode="json")},
+        {"seq": 3, "item": dict(item(seed, 3.0).model_dump(mode="json"), value=None)},
+    ]
+    buffer.wal_path.write_text(
+        "".join(json.dumps(line) + "\n" for line in lines) + '{"seq": 4, "item": {"sou'
+    )
+    db.add(IngestCheckpoint(journal=buffer.journal, seq=1))
+    db.commit()
+
+    buffer.recover()
+
+    assert values(db) == [2.0]
+    assert buffer.pending == 0
+    assert checkpoint(db, buffer) == 2
+    assert buffer.wal_path.read_bytes() == b""
+    rejected = buffer.rejected_path.read_text().splitlines()
+    assert len(rejected) == 2
+    assert buffer.rejected == 2
+
+    # Rejouer à nouveau ne réinsère rien
+    make_buffer(workdir).recover()
+    assert values(db) == [2.0]
+
+
+def test_failing_row_is_set_aside_without_blocking_the_batch(db, seed, workdir, monkeypatch):
+    bulk_create = crud.bulk_create_indicators
+
+    def failing_bulk_create(session, items, commit=True):
+        if any(entry.value == 13.0 for _, entry in items):
+            raise ValueError("mesure refusée")
+        return bulk_create(session, items, commit)
+
+    monkeypatch.setattr(crud, "bulk_create_indicators", failing_bulk_create)
+    buffer = make_buffer(workdir)
+    buffer.start()
+    for value in (1.0, 13.0, 3.0):
+        buffer.submit(item(seed, value))
+    buffer.stop()
+
+    assert values(db) == [1.0, 3.0]
+    assert buffer.pending == 0
+    rejected = [json.loads(line) for line in buffer.rejected_path.read_text().splitlines()]
+    assert [json.loads(entry["line"])["seq"] for entry in rejected] == [2]
+    assert checkpoint(db, buffer) == 3
+
+
+def test_rows_refused_at_write_time_are_reported(db, seed, workdir):
+    buffer = make_buffer(workdir)
+    buffer.start()
+    buffer.submit(item(seed, 1.0))
+    buffer.submit(item(seed, 2.0).model_copy(update={"zone_id": 999}))
+    buffer.stop()
+
+    assert values(db) == [1.0]
+    assert buffer.rejected == 1
+    [entry] = [json.loads(line) for line in buffer.rejected_path.read_text().splitlines()]
+    assert entry["error"] == "Zone not found"
+    assert json.loads(entry["line"])["item"]["zone_id"] == 999
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf")])
+def test_non_finite_values_are_rejected_before_the_journal(seed, value):
+    with pytest.raises(ValidationError):
+        item(seed, value)
@@ -0,0 +1,88 @@
+from datetime import datetime
+
+from app import crud, schemas
+from app.models import Indicator, LatestIndicator
+
+
+def insert(db, seed, *measures, zone=0, type="NO2", quality_flag=0):
+    crud.insert_indicator_rows(db, [
+        {
+            "source_id": seed["source"], "zone_id": seed["zones"][zone], "type": type,
+            "value": value, "unit": "µg/m3", "timestamp": timestamp, "quality_flag": quality_flag,
+        }
+        for value, timestamp in measures
+    ])
+    db.commit()
+    db.expire_all()
+
+
+def latest(db, zone_id, type="NO2"):
+    return db.get(LatestIndicator, (zone_id, type))
+
+
+def expected_latest(db, zone_id, type="NO2"):
+    # Référence : date la plus récente, puis id le plus grand
+    return (
+        db.query(Indicator)
+        .filter(Indicator.zone_id == zone_id, Indicator.type == type, Indicator.quality_flag == 0)
+        .order_by(Indicator.timestamp.desc(), Indicator.id.desc())
+        .first()
+    )
+
+
+def test_out_of_order_and_tied_timestamps(db, seed):
+    zone_id = seed["zones"][0]
+    insert(db, seed, (1.0, datetime(2024, 1, 3)), (2.0, datetime(2024, 1, 5)), (3.0, datetime(2024, 1, 5)),
+           (4.0, datetime(2024, 1, 1)))
+    assert latest(db, zone_id).value == 3.0
+
+    # Mesure en retard : ne remplace pas la valeur connue
+    insert(db, seed, (5.0, datetime(2024, 1, 4)))
+    assert latest(db, zone_id).value == 3.0
+
+    # Même date que la valeur connue : la plus récemment insérée l'emporte
+    insert(db, seed, (6.0, datetime(2024, 1, 5)))
+    assert latest(db, zone_id).value == 6.0
+    assert latest(db, zone_id).indicator_id == expected_latest(db, zone_id).id
+
+    insert(db, seed, (7.0, datetime(2024, 1, 6)))
+    assert latest(db, zone_id).value == 7.0
+
+
+def test_many_ties_in_one_batch(db, seed):
+    stamp = datetime(2024, 2, 1)
+    insert(db, seed, *[(float(value), stamp) for value in range(50)], zone=1, type="O3")
+    assert latest(db, seed["zones"][1], "O3").indicator_id == expected_latest(db, seed["zones"][1], "O3").id
+
+
+def test_flagged_measures_are_ignored(db, seed):
+    zone_id = seed["zones"][0]
+    insert(db, seed, (1.0, datetime(2024, 1, 1)))
+    insert(db, seed, (9999.0, datetime(2024, 1, 2)), quality_flag=4)
+    assert latest(db, zone_id).value == 1.0
+
+
+def test_delete_and_update_fall_back_to_previous(db, seed):
+    zone_id = seed["zones"][0]
+    insert(db, seed, (1.0, datetime(2024, 1, 1)), (2.0, datetime(2024, 1, 2)), (3.0, datetime(2024, 1, 2)))
+
+    crud.delete_indicator(db, db.get(Indicator, latest(db, zone_id).indicator_id))
+    db.expire_all()
+    assert latest(db, zone_id).value == 2.0
+
+    current = db.get(Indicator, latest(db, zone_id).indicator_id)
+    crud.update_indicator(db, current, schemas.IndicatorUpdate(timestamp=datetime(2023, 12, 31)))
+    db.expire_all()
+    assert latest(db, zone_id).value == 1.0
+
+
+def test_latest_endpoint(client, db, seed):
+    insert(db, seed, (1.0, datetime(2024, 1, 1)), (2.0, datetime(2024, 1, 2)))
+    insert(db, seed, (5.0, datetime(2024, 1, 1)), zone=1)
+
+    response = client.get("/api/indicators/latest", params={"type": "NO2"})
+
+    assert response.status_code == 200
+    assert [(row["zone_id"], row["value"]) for row in response.json()] == [
+        (seed["zones"][0], 2.0), (seed["zones"][1], 5.0),
+    ]
@@ -0,0 +1,102 @@
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from conftest import DB_DIR, ROOT
+
+from app import cache, config, locks
+
+pytestmark = pytest.mark.skipif(locks.fcntl is None, reason="verrou inter-processus indisponible (fcntl)")
+
+
+def run_in_other_process(code: str, **kwargs) -> subprocess.Popen:
+    # Même base (./ecotrack.db, relatif au répertoire de travail) que le processus des tests
+    return subprocess.Popen(
+        [sys.executable, "-c", f"import sys; sys.path.insert(0, {str(ROOT)!r})\n{code}"],
+        cwd=DB_DIR, text=True, **kwargs,
+    )
+
+
+def test_writes_from_another_process_bump_data_versions(client, seed):
+    etag = client.get("/api/indicators/stats?type=NO2").headers["ETag"]
+    before = {key: cache.data_version(key) for key in ("NO2", "O3", cache.ALL)}
+
+    process = run_in_other_process(
+        "from datetime import datetime\n"
+        "from app import crud\n"
+        "from app.database import SessionLocal\n"
+        "db = SessionLocal()\n"
+        f"crud.insert_indicator_rows(db, [{{'source_id': {seed['source']}, 'zone_id': {seed['zones'][0]},"
+        " 'type': 'NO2', 'value': 1.0, 'unit': 'µg/m3', 'timestamp': datetime(2024, 1, 1)}])\n"
+        "db.commit()\n"
+    )
+    assert process.wait(timeout=60) == 0
+
+    assert cache.data_version("NO2") == before["NO2"] + 1
+    assert cache.data_version(cache.ALL) == before[cache.ALL] + 1
+    assert cache.data_version("O3") == before["O3"]
+    response = client.get("/api/indicators/stats?type=NO2", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["count"] == 1
+
+
+@pytest.fixture
+def multi_worker(tmp_path, monkeypatch):
+    path = tmp_path / "write.lock"
+    monkeypatch.setattr(config, "MULTI_WORKER", True)
+    monkeypatch.setattr(config, "WRITE_LOCK_PATH", path)
+    monkeypatch.setattr(locks, "_lock_file", None)
+    yield path
+    if locks._lock_file is not None:
+        locks._lock_file.close()
+
+
+def test_write_lock_waits_for_another_process(multi_worker):
+    # L'autre processus prend le verrou et le garde jusqu'à la fermeture de stdin
+    holder = run_in_other_process(
+        "import fcntl, sys\n"
+        f"f = open({str(multi_worker)!r}, 'a+')\n"
+        "fcntl.flock(f.fileno(), fcntl.LOCK_EX)\n"
+        "print('locked', flush=True)\n"
+        "sys.stdin.read()\n",
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+    )
+    assert holder.stdout.readline().strip() == "locked"
+
+    acquired = threading.Event()
+
+    def write():
+        with locks.write_lock():
+            acquired.set()
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    try:
+        assert not acquired.wait(0.5)
+    finally:
+        holder.stdin.close()
+        holder.wait(timeout=60)
+    assert acquired.wait(10)
+    thread.join()
+
+
+def test_write_lock_serialises_threads(multi_worker):
+    inside, overlaps = [0], []
+
+    def write():
+        with locks.write_lock():
+            inside[0] += 1
+            overlaps.append(inside[0])
+            time.sleep(0.01)
+            inside[0] -= 1
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert overlaps == [1] * 8
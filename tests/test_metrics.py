@@ -0,0 +1,28 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import metrics
+from app.database import engine
+
+
+def select_count():
+    series = metrics.sql_statement_duration._series.get(("SELECT",))
+    return sum(series[0]) if series else 0
+
+
+def test_failed_statements_do_not_leak_start_times():
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("SELECT * FROM missing_table")
+        assert "query_start" not in conn.info
+
+        before = select_count()
+        assert conn.exec_driver_sql("SELECT 1").scalar() == 1
+        assert select_count() == before + 1
+
+        # Sans contexte d'exécution (curseur DBAPI), une seule valeur par connexion
+        metrics._before_cursor_execute(conn, None, "SELECT 1", (), None, False)
+        metrics._before_cursor_execute(conn, None, "SELECT 1", (), None, False)
+        metrics._after_cursor_execute(conn, None, "SELECT 1", (), None, False)
+        assert "query_start" not in conn.info
@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime
+
+from app import crud, pubsub
+
+
+def measure(seed, zone, value):
+    return {
+        "source_id": seed["source"], "zone_id": seed["zones"][zone], "type": "NO2",
+        "value": value, "unit": "µg/m3", "timestamp": datetime(2024, 1, 1),
+    }
+
+
+def drain(sub):
+    messages = []
+    while not sub.queue.empty():
+        messages.append(sub.queue.get_nowait())
+    return messages
+
+
+class CountingLoop:
+    def __init__(self, loop):
+        self.loop = loop
+        self.calls = 0
+
+    def call_soon_threadsafe(self, callback, *args):
+        self.calls += 1
+        return self.loop.call_soon_threadsafe(callback, *args)
+
+
+def test_large_transaction_is_capped_and_summarised(db, seed, monkeypatch):
+    monkeypatch.setattr(pubsub, "PENDING_MAX_MESSAGES", 5)
+
+    async def scenario():
+        sub = pubsub.broker.subscribe(type="NO2")
+        sub.loop = CountingLoop(sub.loop)
+        try:
+            crud.insert_indicator_rows(db, [measure(seed, 0, float(i)) for i in range(4)])
+            crud.insert_indicator_rows(db, [measure(seed, i % 2, float(i)) for i in range(10)])
+            # Pas plus de PENDING_MAX_MESSAGES messages détaillés en mémoire
+            assert len(db.info["pending_messages"].messages) == 5
+            db.commit()
+            await asyncio.sleep(0)
+            return sub.loop.calls, drain(sub)
+        finally:
+            pubsub.broker.unsubscribe(sub)
+
+    calls, messages = asyncio.run(scenario())
+
+    # Un seul appel à la boucle de l'abonné pour tout le commit
+    assert calls == 1
+    detailed = [m for m in messages if m.get("event") != "summary"]
+    summaries = [m for m in messages if m.get("event") == "summary"]
+    assert [m["value"] for m in detailed] == [0.0, 1.0, 2.0, 3.0, 0.0]
+    assert all("id" in m for m in detailed)
+    assert sum(m["count"] for m in summaries) == 9
+    assert {m["zone_id"] for m in summaries} == set(seed["zones"])
+
+
+def test_no_messages_kept_without_subscribers(db, seed):
+    crud.insert_indicator_rows(db, [measure(seed, 0, 1.0)])
+    assert "pending_messages" not in db.info
+    db.commit()
+
+
+def test_subscriber_filter(db, seed):
+    async def scenario():
+        sub = pubsub.broker.subscribe(zone_id=seed["zones"][1])
+        try:
+            crud.insert_indicator_rows(db, [measure(seed, i % 2, float(i)) for i in range(6)])
+            db.commit()
+            await asyncio.sleep(0)
+            return drain(sub)
+        finally:
+            pubsub.broker.unsubscribe(sub)
+
+    assert [m["value"] for m in asyncio.run(scenario())] == [1.0, 3.0, 5.0]
@@ -0,0 +1,127 @@
+import random
+import statistics
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import crud, quality
+from app.models import Indicator
+from app.quality import QualityControl, RunningStats
+
+
+def test_running_stats_match_statistics_module():
+    rng = random.Random(3)
+    values = [rng.gauss(40, 12) for _ in range(500)]
+    stats = RunningStats()
+    for value in values:
+        stats.push(value)
+
+    assert stats.count == 500
+    assert stats.mean == pytest.approx(statistics.fmean(values))
+    assert stats.std == pytest.approx(statistics.stdev(values))
+
+
+def test_fixed_rules():
+    qc = QualityControl(action="flag")
+    assert qc.check(1, "NO2", 0.0, missing=True) == quality.MISSING_VALUE
+    assert qc.check(1, "NO2", 9999.0) == quality.FILL_VALUE
+    assert qc.check(1, "NO2", -3.0, non_negative=True) == quality.NEGATIVE
+    assert qc.check(1, "TEMP", -3.0) == 0
+    assert qc.flagged == 3
+    # Les mesures signalées n'entrent pas dans les statistiques de la série
+    assert (1, "NO2") not in qc.series
+
+
+def test_outliers_flagged_after_min_samples():
+    qc = QualityControl(action="flag", max_zscore=4, min_samples=30)
+    rng = random.Random(7)
+    for _ in range(29):
+        assert qc.check(1, "NO2", rng.gauss(40, 5)) == 0
+    # Pas encore assez de mesures pour tester l'écart à la moyenne
+    assert qc.check(1, "NO2", 500.0) == 0
+
+    qc = QualityControl(action="flag", max_zscore=4, min_samples=30)
+    for _ in range(100):
+        qc.check(1, "NO2", rng.gauss(40, 5))
+    assert qc.check(1, "NO2", 500.0) == quality.OUTLIER
+    assert qc.check(1, "NO2", 45.0) == 0
+    # Une autre série a ses propres statistiques
+    assert qc.check(2, "NO2", 500.0) == 0
+
+
+def test_outlier_is_clamped_so_a_lasting_level_change_is_accepted():
+    qc = QualityControl(action="flag", max_zscore=3, min_samples=30)
+    rng = random.Random(11)
+    for _ in range(200):
+        qc.check(1, "O3", rng.gauss(40, 5))
+    stats = qc.series[(1, "O3")]
+    std_before = stats.std
+
+    flags = [qc.check(1, "O3", rng.gauss(80, 5)) for _ in range(400)]
+
+    assert flags[0] == quality.OUTLIER
+    assert flags[-50:] == [0] * 50
+    # Un pic isolé n'a pas fait exploser la variance
+    assert stats.std < 10 * std_before
+
+
+def test_unknown_action_is_rejected():
+    with pytest.raises(ValueError):
+        QualityControl(action="drop")
+    assert not QualityControl(action="off").enabled
+    assert QualityControl(action="quarantine").quarantine
+
+
+def daily_csv(values, day="2024-06-16"):
+    lines = ["source_name,zone_name,type,value,unit,timestamp"]
+    lines += [f"ATMO,Metz,NO2,{value},µg/m3,{day}T{hour:02d}:00:00" for hour, value in enumerate(values)]
+    return "\n".join(lines) + "\n"
+
+
+def upload(client, content):
+    response = client.post(
+        "/api/indicators/import_csv",
+        files={"file": ("daily.csv", content.encode("utf-8"), "text/csv")},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_daily_upload_is_checked_against_stored_history(client, db, seed):
+    rng = random.Random(11)
+    crud.insert_indicator_rows(db, [{
+        "source_id": seed["source"], "zone_id": seed["zones"][0], "type": "NO2",
+        "value": round(rng.gauss(40, 5), 2), "unit": "µg/m3", "timestamp": datetime(2024, 6, 1) + timedelta(hours=hour),
+    } for hour in range(200)])
+    db.commit()
+
+    # 24 mesures : sans historique, trop peu pour tester l'écart à la moyenne
+    values = [round(rng.gauss(40, 5), 2) for _ in range(24)]
+    values[12] = 900.0
+    result = upload(client, daily_csv(values))
+
+    assert result["inserted"] == 24
+    assert result["flagged"] == 1
+    flagged = db.query(Indicator).filter(Indicator.quality_flag == quality.OUTLIER).all()
+    assert [row.value for row in flagged] == [900.0]
+
+
+def test_history_ignores_flagged_rows_and_other_series(db, seed):
+    zone_id, other = seed["zones"]
+    crud.insert_indicator_rows(db, [
+        {"source_id": seed["source"], "zone_id": zone_id, "type": "NO2", "value": value,
+         "unit": "µg/m3", "timestamp": datetime(2024, 6, 1, hour), "quality_flag": flag}
+        for hour, (value, flag) in enumerate([(10.0, 0), (9999.0, quality.FILL_VALUE), (20.0, 0), (30.0, 0)])
+    ] + [
+        {"source_id": seed["source"], "zone_id": other, "type": "NO2", "value": 500.0,
+         "unit": "µg/m3", "timestamp": datetime(2024, 6, 1)},
+    ])
+    db.commit()
+
+    assert crud.recent_values(db, zone_id, "NO2", 2) == [30.0, 20.0]
+    assert crud.recent_values(db, zone_id, "O3", 10) == []
+
+    qc = QualityControl(action="flag", db=db)
+    qc.check(zone_id, "NO2", 25.0)
+    assert qc.series[(zone_id, "NO2")].count == 4
+    assert qc.series[(zone_id, "NO2")].mean == pytest.approx(21.25)
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import cache, quality, retention, tiering
+from app.models import Indicator, IndicatorRollup
+
+NOW = datetime(2024, 6, 15, 10)
+
+
+def add_rows(db, seed, rows):
+    from app import crud
+
+    crud.insert_indicator_rows(db, [{
+        "source_id": seed["source"], "zone_id": seed["zones"][0], "type": type_,
+        "value": value, "unit": "µg/m3", "timestamp": timestamp, "quality_flag": flag,
+    } for type_, timestamp, value, flag in rows])
+    db.commit()
+
+
+def rollups(db):
+    return {
+        (r.type, r.day.isoformat()): (r.count, r.min_value, r.max_value, r.sum_value, r.flagged)
+        for r in db.query(IndicatorRollup)
+    }
+
+
+def test_old_rows_are_downsampled_then_deleted(db, seed):
+    day = datetime(2024, 6, 1)
+    add_rows(db, seed, [
+        ("NO2", day + timedelta(hours=1), 10.0, 0),
+        ("NO2", day + timedelta(hours=5), 30.0, 0),
+        ("NO2", day + timedelta(hours=8), 20.0, 0),
+        ("NO2", day + timedelta(days=1, hours=2), 5.0, 0),
+        # Dans la limite : gardées
+        ("NO2", datetime(2024, 6, 10, 12), 50.0, 0),
+        ("atmo_index", day, 2.0, 0),
+    ])
+    rewrites = cache.data_version(cache.REWRITES)
+
+    # Lots de 2 lignes : la journée du 1er est agrégée en deux fois
+    summary = retention.apply_retention(db, policies={"NO2": 10}, now=NOW, batch_size=2)
+
+    assert summary["rows_deleted"] == 4
+    assert summary["per_type"] == {"NO2": {"rows_deleted": 4, "rollups_written": 3}}
+    assert rollups(db) == {
+        ("NO2", "2024-06-01"): (3, 10.0, 30.0, 60.0, 0),
+        ("NO2", "2024-06-02"): (1, 5.0, 5.0, 5.0, 0),
+    }
+    remaining = sorted((row.type, row.value) for row in db.query(Indicator))
+    assert remaining == [("NO2", 50.0), ("atmo_index", 2.0)]
+    assert cache.data_version(cache.REWRITES) > rewrites
+
+    # Relance : rien de plus à agréger
+    assert retention.apply_retention(db, policies={"NO2": 10}, now=NOW)["rows_deleted"] == 0
+
+
+def test_flagged_rows_are_counted_but_not_aggregated(db, seed):
+    day = datetime(2024, 6, 1)
+    add_rows(db, seed, [
+        ("NO2", day + timedelta(hours=1), 10.0, 0),
+        ("NO2", day + timedelta(hours=2), 9999.0, quality.FILL_VALUE),
+        ("NO2", day + timedelta(hours=3), 500.0, quality.OUTLIER),
+        ("NO2", day + timedelta(hours=4), 20.0, 0),
+        ("NO2", day + timedelta(days=1), -4.0, quality.NEGATIVE),
+    ])
+
+    retention.apply_retention(db, policies={"NO2": 10}, now=NOW, batch_size=3)
+
+    assert rollups(db) == {
+        ("NO2", "2024-06-01"): (2, 10.0, 20.0, 30.0, 2),
+        # Aucune mesure valide ce jour-là
+        ("NO2", "2024-06-02"): (0, None, None, 0.0, 1),
+    }
+
+    # Fusion avec un agrégat existant : les min / max vides ne l'emportent pas
+    add_rows(db, seed, [("NO2", datetime(2024, 6, 2, 6), 7.0, 0)])
+    retention.apply_retention(db, policies={"NO2": 10}, now=NOW)
+    assert rollups(db)[("NO2", "2024-06-02")] == (1, 7.0, 7.0, 7.0, 1)
+
+
+def test_cold_partitions_beyond_the_limit_are_reported(db, rows):
+    pytest.importorskip("pyarrow")
+    tiering.archive_cold(db, hot_days=30, now=NOW)
+
+    summary = retention.apply_retention(db, policies={"NO2": 60, "O3": None}, now=NOW)
+
+    assert summary["rows_deleted"] == 0
+    assert set(summary["cold_partitions_skipped"]) == {"NO2"}
+    assert summary["cold_partitions_skipped"]["NO2"] >= 1
@@ -0,0 +1,150 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import crud, quality, rolling
+from app.rolling import RollingWindow
+
+
+def test_window_evicts_points_older_than_window():
+    window = RollingWindow(window_seconds=3600)
+    window.push(0, 10.0)
+    window.push(1800, 30.0)
+    assert window.count == 2
+    assert window.value("mean") == 20.0
+
+    # Fenêtre ]3600 - 3600, 3600] : le point à t=0 sort
+    window.push(3600, 20.0)
+    assert window.count == 2
+    assert window.value("mean") == 25.0
+    assert window.value("max") == 30.0
+    assert window.value("min") == 20.0
+
+    window.push(5400, 5.0)
+    assert window.count == 2
+    assert window.value("max") == 20.0
+    assert window.value("min") == 5.0
+
+
+def test_window_matches_naive_computation():
+    points = [(t * 600, float((t * 37) % 23)) for t in range(200)]
+    window = RollingWindow(window_seconds=3 * 3600)
+    for ts, value in points:
+        window.push(ts, value)
+        inside = [v for t, v in points if ts - window.window_seconds < t <= ts]
+        assert window.count == len(inside)
+        assert abs(window.value("mean") - sum(inside) / len(inside)) < 1e-9
+        assert window.value("max") == max(inside)
+        assert window.value("min") == min(inside)
+
+
+def test_rolling_series_extends_cached_result(db, seed):
+    zone_id = seed["zones"][0]
+
+    def add(hour, value):
+        crud.insert_indicator_rows(db, [{
+            "source_id": seed["source"], "zone_id": zone_id, "type": "O3",
+            "value": value, "unit": "µg/m3", "timestamp": datetime(2024, 1, 1, hour),
+        }])
+        db.commit()
+
+    for hour, value in enumerate([10.0, 20.0, 30.0]):
+        add(hour, value)
+    first = rolling.rolling_series(db, "O3", zone_id, window_seconds=2 * 3600)
+    assert [value for _, value in first] == [10.0, 15.0, 25.0]
+
+    add(3, 50.0)
+    assert [value for _, value in rolling.rolling_series(db, "O3", zone_id, window_seconds=2 * 3600)] == [
+        10.0, 15.0, 25.0, 40.0,
+    ]
+
+    # Mesure arrivée dans le désordre : recalcul complet
+    add(0, 30.0)
+    second = rolling.rolling_series(db, "O3", zone_id, window_seconds=2 * 3600)
+    assert len(second) == 5
+    assert second[-1][1] == 40.0
+
+
+def test_series_cache_is_bounded_by_total_points():
+    from app.cache import LRUCache
+
+    lru = LRUCache(maxsize=10, max_weight=5, weigh=len)
+    lru.set("a", [1, 2])
+    lru.set("b", [1, 2])
+    assert lru.get("a") is not None  # "b" devient la moins récente
+    lru.set("c", [1, 2])
+    assert lru.get("b") is None
+    assert lru.get("a") is not None and lru.get("c") is not None
+
+
+def add_hours(db, seed, values, start=datetime(2024, 1, 1), type="PM10", flags=None):
+    crud.insert_indicator_rows(db, [{
+        "source_id": seed["source"], "zone_id": seed["zones"][0], "type": type,
+        "value": value, "unit": "µg/m3", "timestamp": start + timedelta(hours=hour),
+        "quality_flag": (flags or {}).get(hour, 0),
+    } for hour, value in enumerate(values)])
+    db.commit()
+
+
+@pytest.mark.parametrize("engine", ["sql", "columnar"])
+def test_flagged_rows_are_ignored(db, seed, engine):
+    add_hours(db, seed, [10.0, 9999.0, 20.0], flags={1: quality.FILL_VALUE})
+
+    points = rolling.rolling_series(db, "PM10", seed["zones"][0], window_seconds=3 * 3600, engine=engine)
+
+    assert [value for _, value in points] == [10.0, 15.0]
+
+
+@pytest.mark.parametrize("engine", ["sql", "columnar"])
+def test_window_is_warmed_up_before_date_from(db, seed, engine):
+    add_hours(db, seed, [10.0, 20.0, 30.0, 40.0])
+
+    points = rolling.rolling_series(
+        db, "PM10", seed["zones"][0], window_seconds=2 * 3600,
+        date_from=datetime(2024, 1, 1, 2), engine=engine,
+    )
+
+    # Premier point (2h) : moyenne de 1h et 2h, pas de la seule mesure de 2h
+    assert points == [(1704074400, 25.0), (1704078000, 35.0)]
+
+
+def test_daily_mean_uses_calendar_days(client, db, seed):
+    # Jour 1 : 24 mesures à 40 ; jour 2 : 12 mesures à 80 puis 12 à 10
+    add_hours(db, seed, [40.0] * 24 + [80.0] * 12 + [10.0] * 12)
+
+    response = client.get("/api/indicators/rolling", params={
+        "type": "PM10", "zone_id": seed["zones"][0], "window": "24h", "daily": "mean", "threshold": 50,
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["daily_mean"] == [{"day": "2024-01-01", "value": 40.0}, {"day": "2024-01-02", "value": 45.0}]
+    # Une moyenne glissante de 24h dépasse 50 le 2 au midi ; la moyenne journalière non
+    assert max(day["value"] for day in body["daily_max"]) > 50
+    assert body["exceedance_days"] == 0
+    assert client.get("/api/indicators/rolling", params={
+        "type": "PM10", "zone_id": seed["zones"][0], "daily": "median",
+    }).status_code == 400
+
+
+def test_other_series_are_not_blocked_by_a_computation(db, seed):
+    add_hours(db, seed, [10.0, 20.0])
+    held = ("O3", 1, None, None, None, 3600, "mean")
+    entered, release = threading.Event(), threading.Event()
+
+    def hold():
+        with rolling._key_lock(held):
+            entered.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    try:
+        assert entered.wait(5)
+        # Une autre série se calcule pendant que la première est verrouillée
+        assert len(rolling.rolling_series(db, "PM10", seed["zones"][0], window_seconds=3600)) == 2
+    finally:
+        release.set()
+        thread.join()
+    assert rolling._key_locks == {}
@@ -0,0 +1,41 @@
+import math
+
+import pytest
+
+QUERIES = [
+    {"type": "NO2", "zone_id": 1},
+    {"type": "NO2", "zone_id": 2},
+    {"type": "O3", "zone_id": 1},
+    {"type": "O3"},
+    {"type": "O3", "zone_id": 2, "date_from": "2024-05-01T00:00:00", "date_to": "2024-05-31T23:00:00"},
+    {"zone_id": 1, "date_from": "2024-04-10T06:00:00"},
+    {"type": "CO", "zone_id": 1},
+    {"type": "NO2", "zone_id": 1, "source_id": 1, "exclude_flagged": True},
+]
+
+
+def assert_close(result, expected):
+    assert result["count"] == expected["count"]
+    for key in ("min_value", "max_value", "avg_value"):
+        if expected[key] is None:
+            assert result[key] is None
+        else:
+            assert math.isclose(result[key], expected[key], rel_tol=1e-9)
+
+
+@pytest.mark.parametrize("engine", ["sql", "columnar"])
+def test_batch_matches_single_stats(client, rows, engine):
+    response = client.post("/api/indicators/stats/batch", json={"queries": QUERIES, "engine": engine})
+    assert response.status_code == 200
+    results = response.json()
+    assert len(results) == len(QUERIES)
+
+    for query, result in zip(QUERIES, results):
+        single = client.get("/api/indicators/stats", params=query)
+        assert single.status_code == 200
+        assert_close(result, single.json())
+
+
+def test_batch_rejects_unknown_engine(client):
+    response = client.post("/api/indicators/stats/batch", json={"queries": QUERIES, "engine": "duckdb"})
+    assert response.status_code == 400
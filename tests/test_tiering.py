@@ -0,0 +1,169 @@
+import math
+from datetime import datetime
+
+import pytest
+
+from app import analytics, crud, tiering
+from app.models import ColdPartition, Indicator
+
+NOW = datetime(2024, 6, 15)
+
+
+def test_merge_stats():
+    hot = {"count": 2, "min_value": 1.0, "max_value": 5.0, "avg_value": 3.0}
+    assert tiering.merge_stats(hot, None) is hot
+    assert tiering.merge_stats(hot, (2, 0.0, 4.0, 4.0)) == {
+        "count": 4, "min_value": 0.0, "max_value": 5.0, "avg_value": 2.5,
+    }
+    empty = {"count": 0, "min_value": None, "max_value": None, "avg_value": None}
+    assert tiering.merge_stats(empty, (4, -1.0, 3.0, 6.0)) == {
+        "count": 4, "min_value": -1.0, "max_value": 3.0, "avg_value": 1.5,
+    }
+
+
+def as_dict(row):
+    if isinstance(row, dict):
+        return row
+    return {
+        "id": row.id, "zone_id": row.zone_id, "type": row.type, "value": row.value,
+        "timestamp": row.timestamp, "quality_flag": row.quality_flag,
+    }
+
+
+def listing(db, **filters):
+    return [
+        {key: row[key] for key in ("id", "zone_id", "type", "value", "timestamp", "quality_flag")}
+        for row in map(as_dict, crud.list_indicators(db, limit=100_000, **filters))
+    ]
+
+
+def assert_same_stats(result, expected):
+    assert result["count"] == expected["count"]
+    for key in ("min_value", "max_value", "avg_value"):
+        assert math.isclose(result[key], expected[key], rel_tol=1e-9)
+
+
+@pytest.fixture
+def archived(db, rows):
+    pytest.importorskip("pyarrow")
+    summary = tiering.archive_cold(db, hot_days=30, now=NOW)
+    assert summary["rows_moved"] > 0
+    return summary
+
+
+FILTERS = [
+    {},
+    {"type": "NO2"},
+    {"type": "O3", "zone_id": 2},
+    {"date_from": datetime(2024, 4, 20), "date_to": datetime(2024, 5, 25)},
+]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_hot_and_cold_reads_match_before_archiving(db, rows, filters):
+    pytest.importorskip("pyarrow")
+    expected_rows = sorted(listing(db, **filters), key=lambda row: row["id"])
+    expected_stats = crud.indicator_stats(db, **filters)
+
+    tiering.archive_cold(db, hot_days=30, now=NOW)
+    db.expire_all()
+
+    assert db.query(ColdPartition).count() > 0
+    assert sorted(listing(db, **filters), key=lambda row: row["id"]) == expected_rows
+    assert_same_stats(crud.indicator_stats(db, **filters), expected_stats)
+    assert_same_stats(analytics.indicator_stats(db, **filters), expected_stats)
+
+
+def test_pages_cover_hot_and_cold_rows(db, archived):
+    # Mesures archivées d'abord, puis celles de la table chaude, par id croissant
+    hot = [id_ for (id_,) in db.query(Indicator.id).order_by(Indicator.id)]
+    full = [row["id"] for row in listing(db)]
+    cold = full[:len(full) - len(hot)]
+    assert full[len(cold):] == hot
+    assert cold == sorted(cold) and len(cold) == archived["rows_moved"]
+
+    pages = []
+    for skip in range(0, len(full), 997):
+        pages += [as_dict(row)["id"] for row in crud.list_indicators(db, skip=skip, limit=997)]
+    assert pages == full
+
+
+def test_archived_ids_are_never_reused(db, seed, archived):
+    highest_cold = max(p.max_id for p in db.query(ColdPartition).all())
+    # Toute la table chaude est vidée : SQLite repartirait de 1 sans AUTOINCREMENT
+    db.query(Indicator).delete()
+    db.commit()
+
+    crud.insert_indicator_rows(db, [{
+        "source_id": seed["source"], "zone_id": seed["zones"][0], "type": "NO2",
+        "value": 1.0, "unit": "µg/m3", "timestamp": NOW,
+    }])
+    db.commit()
+
+    assert db.query(Indicator.id).scalar() > highest_cold
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/api/indicators/compare", {"type": "NO2", "zone_ids": "1,2", "bucket": "1w"}),
+    ("/api/indicators/compare", {"type": "O3", "zone_ids": "1,2", "bucket": "1d", "agg": "max"}),
+    ("/api/indicators/series", {"type": "NO2", "zone_id": 1, "max_points": 300}),
+    ("/api/indicators/rolling", {"type": "O3", "zone_id": 2, "window": "8h", "threshold": 60}),
+    ("/api/indicators/stats", {"type": "NO2", "engine": "columnar"}),
+    ("/api/indicators/compare", {"type": "NO2", "zone_ids": "1,2", "bucket": "1d", "engine": "columnar"}),
+    ("/api/indicators/series", {"type": "O3", "zone_id": 2, "max_points": 300, "engine": "columnar"}),
+    ("/api/indicators/rolling", {"type": "NO2", "zone_id": 1, "window": "1d", "engine": "columnar"}),
+])
+def test_series_endpoints_include_cold_rows(client, db, rows, path, params):
+    pytest.importorskip("pyarrow")
+    before = client.get(path, params=params)
+    assert before.status_code == 200
+
+    tiering.archive_cold(db, hot_days=30, now=NOW)
+
+    after = client.get(path, params=params)
+    assert after.status_code == 200
+    assert_json_close(after.json(), before.json())
+
+
+def assert_json_close(result, expected):
+    if isinstance(expected, float):
+        assert math.isclose(result, expected, rel_tol=1e-9, abs_tol=1e-9)
+    elif isinstance(expected, dict):
+        assert result.keys() == expected.keys()
+        for key in expected:
+            assert_json_close(result[key], expected[key])
+    elif isinstance(expected, list):
+        assert len(result) == len(expected)
+        for item, expected_item in zip(result, expected):
+            assert_json_close(item, expected_item)
+    else:
+        assert result == expected
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/api/indicators", {"type": "NO2", "limit": 500}),
+    ("/api/indicators/stats", {"type": "NO2"}),
+    ("/api/indicators/stats", {"type": "NO2", "engine": "columnar"}),
+    ("/api/indicators/series", {"type": "NO2", "zone_id": 1}),
+    ("/api/indicators/compare", {"type": "NO2", "zone_ids": "1,2", "bucket": "1d"}),
+    ("/api/indicators/rolling", {"type": "NO2", "zone_id": 1, "window": "8h"}),
+])
+def test_aware_dates_on_cold_tier(client, archived, path, params):
+    naive = client.get(path, params={**params, "date_from": "2024-04-01T00:00:00", "date_to": "2024-05-20T00:00:00"})
+    aware = client.get(path, params={**params, "date_from": "2024-04-01T00:00:00Z", "date_to": "2024-05-20T02:00:00+02:00"})
+
+    assert naive.status_code == 200
+    assert aware.status_code == 200
+    assert_json_close(aware.json(), naive.json())
+
+
+def test_aware_dates_in_stats_batch(client, archived):
+    queries = [
+        {"type": "NO2", "date_from": "2024-04-01T00:00:00Z"},
+        {"type": "O3", "zone_id": 2, "date_to": "2024-04-30T00:00:00Z"},
+    ]
+    for engine in ("sql", "columnar"):
+        response = client.post("/api/indicators/stats/batch", json={"queries": queries, "engine": engine})
+        assert response.status_code == 200
+        for query, result in zip(queries, response.json()):
+            assert result["count"] == client.get("/api/indicators/stats", params=query).json()["count"]
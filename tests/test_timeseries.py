@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from app.timeseries import lttb_indices
+
+
+@pytest.mark.parametrize("n, threshold", [(10, 3), (1000, 100), (1001, 7), (5000, 4999)])
+def test_lttb_keeps_endpoints_and_threshold(n, threshold):
+    rng = np.random.default_rng(n)
+    x = np.cumsum(rng.integers(1, 600, n)) + 1_700_000_000
+    y = rng.normal(size=n)
+
+    indices = lttb_indices(x, y, threshold)
+
+    assert len(indices) == threshold
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+@pytest.mark.parametrize("threshold", [2, 50, 50_000])
+def test_lttb_returns_everything_when_nothing_to_reduce(threshold):
+    x = np.arange(50)
+    assert np.array_equal(lttb_indices(x, np.sin(x), threshold), np.arange(50))
+
+
+def test_lttb_keeps_isolated_peaks():
+    n = 10_000
+    x = np.arange(n, dtype=np.int64) * 3600
+    y = np.zeros(n)
+    peaks = [1234, 5678, 9000]
+    y[peaks] = [50.0, -40.0, 80.0]
+
+    indices = lttb_indices(x, y, 100)
+
+    assert set(peaks) <= set(indices.tolist())
+
+
+def test_series_endpoint_is_downsampled(client, seed, rows):
+    zone_id = seed["zones"][0]
+    expected = [r for r in rows if r["type"] == "NO2" and r["zone_id"] == zone_id]
+
+    response = client.get("/api/indicators/series", params={"type": "NO2", "zone_id": zone_id, "max_points": 200})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_points"] == len(expected)
+    assert len(body["points"]) == 200
+    stamps = [point["timestamp"] for point in body["points"]]
+    assert stamps == sorted(stamps)
+    assert stamps[0] == min(r["timestamp"] for r in expected).isoformat()
+    assert stamps[-1] == max(r["timestamp"] for r in expected).isoformat()
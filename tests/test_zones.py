@@ -0,0 +1,120 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sa
+
+from app import crud, schemas
+from app.database import engine
+from app.models import Zone
+
+from conftest import ROOT
+
+
+@pytest.fixture
+def variable_limit():
+    """
+    Limite SQLite de paramètres par requête ramenée à 999 (valeur par défaut
+    de nombreuses compilations de SQLite) pour les connexions suivantes.
+    """
+    def set_limit(dbapi_connection, connection_record):
+        dbapi_connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+
+    engine.dispose()
+    sa.event.listen(engine, "connect", set_limit)
+    yield
+    sa.event.remove(engine, "connect", set_limit)
+    engine.dispose()
+
+
+def test_near_with_many_zones_uses_a_subquery(client, db, seed, request):
+    # Plus de zones dans le rayon que de paramètres acceptés par SQLite
+    db.execute(sa.insert(Zone), [
+        {"name": f"Z{i}", "normalized_name": f"z{i}", "latitude": 49.0 + (i % 50) * 1e-3, "longitude": 6.0 + (i // 50) * 1e-3}
+        for i in range(2000)
+    ])
+    near_zone = db.query(Zone.id).filter(Zone.name == "Z1234").scalar()
+    far_zone = crud.create_zone(db, schemas.ZoneCreate(name="Brest", latitude=48.39, longitude=-4.49)).id
+    crud.insert_indicator_rows(db, [
+        {"source_id": seed["source"], "zone_id": zone_id, "type": "NO2", "value": 10.0,
+         "unit": "µg/m3", "timestamp": datetime(2024, 1, 1)}
+        for zone_id in (near_zone, far_zone, seed["zones"][0])
+    ])
+    db.commit()
+    db.close()
+    request.getfixturevalue("variable_limit")
+
+    response = client.get("/api/indicators", params={"near": "49.0,6.0", "radius": 50})
+
+    assert response.status_code == 200
+    assert [row["zone_id"] for row in response.json()] == [near_zone]
+
+
+def test_near_uses_the_exact_distance(client, db, seed):
+    inside = crud.create_zone(db, schemas.ZoneCreate(name="Metz-Nord", latitude=49.0, longitude=6.0)).id
+    # Dans la boîte englobante (coin), mais à plus de 10 km du point
+    corner = crud.create_zone(db, schemas.ZoneCreate(name="Coin", latitude=49.085, longitude=6.13)).id
+    crud.insert_indicator_rows(db, [
+        {"source_id": seed["source"], "zone_id": zone_id, "type": "NO2", "value": 1.0,
+         "unit": "µg/m3", "timestamp": datetime(2024, 1, 1)}
+        for zone_id in (inside, corner)
+    ])
+    db.commit()
+
+    response = client.get("/api/indicators", params={"near": "49.0,6.0", "radius": 10})
+
+    assert [row["zone_id"] for row in response.json()] == [inside]
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("saint eti", ["Saint-Étienne", "Saint-Étienne-du-Rouvray"]),
+    ("ETIENNE", ["Saint-Étienne", "Saint-Étienne-du-Rouvray"]),
+    ("rouv", ["Saint-Étienne-du-Rouvray"]),
+    ("thionvil", ["Thionville"]),
+    ("nancy", []),
+])
+def test_zone_search_ignores_accents_and_matches_prefixes(client, db, q, expected):
+    for name in ("Saint-Étienne-du-Rouvray", "Saint-Étienne", "Thionville", "Saint-Denis"):
+        crud.create_zone(db, schemas.ZoneCreate(name=name))
+
+    response = client.get("/api/zones/search", params={"q": q})
+
+    assert response.status_code == 200
+    assert [zone["name"] for zone in response.json()] == expected
+
+
+@pytest.mark.parametrize("path", ["/api/zones", "/api/sources"])
+def test_duplicate_names_are_rejected(client, path):
+    assert client.post(path, json={"name": "Saint-Étienne"}).status_code == 201
+
+    for name in ("SAINT-ÉTIENNE", "  saint-étienne ", "Saint-Étienne"):
+        response = client.post(path, json={"name": name})
+        assert response.status_code == 400
+
+
+def test_migration_leaves_duplicate_names_empty(tmp_path):
+    from alembic import command
+    from alembic.config import Config
+
+    url = f"sqlite:///{tmp_path / 'migration.db'}"
+    config = Config()
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "d2a7f3b8c1e5")
+
+    engine = sa.create_engine(url)
+    with engine.begin() as conn:
+        for name in ("Metz", "METZ ", "Nancy", "Saint-Étienne"):
+            conn.execute(sa.text("INSERT INTO zones (name) VALUES (:name)"), {"name": name})
+        conn.execute(sa.text("INSERT INTO sources (name) VALUES ('ATMO'), ('atmo')"))
+
+    command.upgrade(config, "e6b1c9d4f2a8")
+
+    with engine.connect() as conn:
+        zones = conn.execute(sa.text("SELECT name, normalized_name FROM zones ORDER BY id")).all()
+        sources = conn.execute(sa.text("SELECT name, normalized_name FROM sources ORDER BY id")).all()
+        found = conn.execute(sa.text("SELECT rowid FROM zone_search WHERE zone_search MATCH 'etienne'")).all()
+    engine.dispose()
+    assert zones == [("Metz", "metz"), ("METZ ", None), ("Nancy", "nancy"), ("Saint-Étienne", "saint-étienne")]
+    assert sources == [("ATMO", "atmo"), ("atmo", None)]
+    assert found == [(4,)]
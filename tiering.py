@@ -0,0 +1,57 @@
+import argparse
+import logging
+from pathlib import Path
+
+from app import config
+from app.database import SessionLocal
+from app.tiering import archive_cold
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Déplace les mesures anciennes de la base vers des fichiers Parquet compressés (stockage froid)."
+    )
+    parser.add_argument(
+        "--hot-days",
+        type=int,
+        default=config.HOT_DAYS,
+        help="mesures gardées dans la base, en jours (défaut : ECOTRACK_HOT_DAYS)",
+    )
+    parser.add_argument(
+        "--cold-dir",
+        type=Path,
+        default=config.COLD_DIR,
+        help="dossier des fichiers Parquet (défaut : ECOTRACK_COLD_DIR)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="liste les partitions à déplacer sans rien écrire")
+    parser.add_argument("--vacuum", action="store_true", help="Lance un VACUUM pour réduire le fichier")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    db = SessionLocal()
+    try:
+        result = archive_cold(
+            db,
+            hot_days=args.hot_days,
+            directory=args.cold_dir,
+            vacuum=args.vacuum,
+            dry_run=args.dry_run,
+        )
+    finally:
+        db.close()
+
+    for partition in result["partitions"]:
+        line = f"[TIERING] {partition['type']} {partition['month']} → {partition['rows']} lignes"
+        if "path" in partition:
+            line += f" ({partition['size_bytes']} octets, {partition['path']})"
+        print(line)
+    verb = "à déplacer" if args.dry_run else "déplacées"
+    print(
+        f"[TIERING] Total : {result['rows_moved']} lignes {verb} (avant le {result['cutoff']:%Y-%m-%d}), "
+        f"{result['bytes_written']} octets écrits, {result['bytes_reclaimed']} octets récupérés"
+    )
+
+
+if __name__ == "__main__":
+    main()